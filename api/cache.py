@@ -0,0 +1,200 @@
+"""
+搜索结果缓存模块
+使用SQLite持久化QQ音乐搜索结果和歌曲详情，避免重复运行时反复请求接口
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from api.defaults import DEFAULT_CACHE_DIR, DEFAULT_TTL_DAYS
+from utils.helpers import normalize_song_name
+
+
+class SearchCache:
+    """
+    基于SQLite的搜索结果缓存
+    
+    以规范化歌曲名 + 请求参数为键，保存原始搜索结果列表；
+    空结果同样会被缓存（负缓存），避免反复查询不存在的歌曲。
+    另以歌曲mid为键保存解析后的歌曲详情（分享链接查询使用）。
+    可被多个线程共享使用。
+    """
+    
+    FILENAME = 'search_cache.sqlite3'
+    
+    def __init__(self, cache_dir: str | Path = DEFAULT_CACHE_DIR,
+                 ttl: float = DEFAULT_TTL_DAYS * 86400, refresh: bool = False):
+        """
+        Args:
+            cache_dir: 缓存目录，数据库文件保存在该目录下
+            ttl: 缓存有效期（秒）
+            refresh: 为True时忽略已有缓存，但仍写入新结果
+        """
+        self.path = Path(cache_dir) / self.FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.refresh = refresh
+        
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                song_name TEXT NOT NULL,
+                results TEXT NOT NULL,
+                found INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )'''
+        )
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS song_detail (
+                song_mid TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )'''
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(song_name: str, params: dict) -> str:
+        """
+        生成缓存键
+        
+        Args:
+            song_name: 歌曲名
+            params: 搜索请求参数（其中的歌曲名字段会被忽略）
+        
+        Returns:
+            缓存键字符串
+        """
+        extra = {k: v for k, v in params.items() if k != 'w'}
+        return normalize_song_name(song_name) + '\x1f' + json.dumps(extra, sort_keys=True)
+    
+    def get(self, song_name: str, params: dict) -> list[dict] | None:
+        """
+        读取缓存的搜索结果
+        
+        Args:
+            song_name: 歌曲名
+            params: 搜索请求参数
+        
+        Returns:
+            搜索结果列表（可能为空列表，表示确认未找到）；未命中或已过期返回None
+        """
+        key = self.make_key(song_name, params)
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute(
+                    'SELECT results, found, created_at FROM search_cache WHERE key = ?', (key,)
+                ).fetchone()
+            
+            if row is None or time.time() - row[2] > self.ttl:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            if not row[1]:
+                self.negative_hits += 1
+        
+        return json.loads(row[0])
+    
+    def set(self, song_name: str, params: dict, songs: list[dict]) -> None:
+        """
+        写入搜索结果
+        
+        Args:
+            song_name: 歌曲名
+            params: 搜索请求参数
+            songs: 搜索结果列表（空列表表示未找到）
+        """
+        key = self.make_key(song_name, params)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO search_cache (key, song_name, results, found, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, song_name, json.dumps(songs, ensure_ascii=False), int(bool(songs)), time.time()),
+            )
+            self._conn.commit()
+    
+    def get_song_detail(self, song_mid: str) -> dict | None:
+        """
+        读取缓存的歌曲详情
+        
+        Args:
+            song_mid: 歌曲mid
+        
+        Returns:
+            歌曲信息字典；未命中或已过期返回None
+        """
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute(
+                    'SELECT info, created_at FROM song_detail WHERE song_mid = ?', (song_mid,)
+                ).fetchone()
+            
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+        
+        return json.loads(row[0])
+    
+    def set_song_detail(self, song_mid: str, info: dict) -> None:
+        """
+        写入歌曲详情
+        
+        Args:
+            song_mid: 歌曲mid
+            info: 歌曲信息字典
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO song_detail (song_mid, info, created_at) VALUES (?, ?, ?)',
+                (song_mid, json.dumps(info, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+    
+    def purge_expired(self) -> int:
+        """
+        删除已过期的缓存条目
+        
+        Returns:
+            删除的条目数
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM search_cache WHERE created_at < ?', (cutoff,)
+            ).rowcount
+            removed += self._conn.execute(
+                'DELETE FROM song_detail WHERE created_at < ?', (cutoff,)
+            ).rowcount
+            self._conn.commit()
+        return removed
+    
+    def stats(self) -> dict:
+        """返回本次运行的命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,284 @@
+"""
+离线曲库模块
+将本地曲库导出文件（CSV/NDJSON）导入SQLite索引，按规范化标题离线查询歌手和专辑
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from api.defaults import DEFAULT_CATALOG_PATH
+from utils.helpers import normalize_title, title_normalizer
+
+
+# 每批写入的记录数
+IMPORT_BATCH_SIZE = 10000
+
+# 导出文件中歌手字段的候选列名
+_ARTIST_FIELDS = ('artists', 'artist', 'singer', 'singers')
+
+# 索引元数据表中记录标题规范化方式的键
+_NORMALIZER_KEY = 'normalizer'
+
+# 曲库表结构，以规范化标题为主键
+_CATALOG_TABLE = '''CREATE TABLE IF NOT EXISTS {name} (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist TEXT,
+    album_mid TEXT
+) WITHOUT ROWID'''
+
+
+class NormalizerMismatch(ValueError):
+    """索引键的标题规范化方式与当前环境不一致（如导入时安装了 opencc、查询时未安装）"""
+
+
+def _join_artists(value) -> str | None:
+    """歌手字段可为列表或字符串（多个歌手以 / 分隔），统一为 "A / B" 形式"""
+    if isinstance(value, list):
+        names = [
+            (item.get('name', '') if isinstance(item, dict) else str(item)).strip()
+            for item in value
+        ]
+    elif value:
+        names = [name.strip() for name in str(value).split('/')]
+    else:
+        names = []
+    names = [name for name in names if name]
+    return ' / '.join(names) if names else None
+
+
+def _to_record(row: dict) -> dict | None:
+    """将导出文件中的一行转换为 title, artist, album_mid，缺少标题时返回None"""
+    title = (row.get('title') or row.get('name') or '').strip()
+    if not title:
+        return None
+    
+    artist = None
+    for field in _ARTIST_FIELDS:
+        if row.get(field):
+            artist = _join_artists(row[field])
+            break
+    
+    album = row.get('album_mid') or row.get('album') or ''
+    if isinstance(album, dict):
+        album = album.get('mid', '')
+    return {'title': title, 'artist': artist, 'album_mid': str(album).strip() or None}
+
+
+def read_catalog(path: str | Path) -> Iterator[dict]:
+    """
+    逐条读取曲库导出文件
+    
+    .csv 需包含表头（title，以及 artists/artist 和 album_mid 列）；
+    其他扩展名按 NDJSON 读取，每行一个JSON对象，artists 可为字符串或列表。
+    
+    Args:
+        path: 导出文件路径
+    
+    Yields:
+        包含 title, artist, album_mid 的字典
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        
+        for row in rows:
+            record = _to_record(row)
+            if record is not None:
+                yield record
+
+
+class CatalogIndex:
+    """
+    基于SQLite的离线曲库索引
+    
+    以规范化标题（统一全半角、繁简体，忽略大小写、标点和空白）为主键，
+    同一标题有多条记录时保留先导入的一条，与在线搜索取首个结果一致。
+    查询为主键查找，可被多个线程共享使用。
+    
+    规范化结果取决于是否安装了 opencc，索引在 meta 表中记录建立时的规范化方式（title_normalizer）：
+    只读打开时与当前环境不一致则拒绝使用，可写打开（导入）时按保存的原始标题重新生成全部键。
+    """
+    
+    def __init__(self, path: str | Path = DEFAULT_CATALOG_PATH, readonly: bool = True):
+        """
+        Args:
+            path: 索引文件路径
+            readonly: 为True时以只读方式打开（索引文件必须存在）
+        
+        Raises:
+            FileNotFoundError: 只读打开时索引文件不存在
+            NormalizerMismatch: 只读打开时索引的规范化方式与当前环境不一致
+        """
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self.rebuilt = 0
+        self._lock = threading.Lock()
+        normalizer = title_normalizer()
+        
+        if readonly:
+            if not self.path.is_file():
+                raise FileNotFoundError(f"曲库索引不存在: {self.path}")
+            self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False)
+            recorded = self._recorded_normalizer()
+            if recorded is not None and recorded != normalizer:
+                self._conn.close()
+                raise NormalizerMismatch(
+                    f"曲库索引的标题按 {recorded} 规范化，与当前环境（{normalizer}）不一致，"
+                    f"请执行 catalog.py --rebuild --index {self.path} 重建索引"
+                )
+            if recorded is None:
+                print(f"[警告] 曲库索引由旧版本建立，未记录标题规范化方式，"
+                      f"建议执行 catalog.py --rebuild --index {self.path}")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_CATALOG_TABLE.format(name='catalog'))
+            self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            if self._recorded_normalizer() != normalizer:
+                self.rebuilt = self._rebuild_keys()
+                if self.rebuilt:
+                    print(f"[警告] 曲库索引的标题规范化方式已变化，已按 {normalizer} 重建 {self.rebuilt} 条索引键")
+                self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                   (_NORMALIZER_KEY, normalizer))
+            self._conn.commit()
+    
+    def _recorded_normalizer(self) -> str | None:
+        """索引中记录的标题规范化方式，旧版本建立的索引没有记录时返回None"""
+        try:
+            row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (_NORMALIZER_KEY,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+    
+    def _rebuild_keys(self) -> int:
+        """
+        按当前的规范化方式重新生成全部索引键（原始标题保存在 title 列中，无需重新导入）
+        
+        规范化后标题重复的记录只保留一条。
+        
+        Returns:
+            重建后的记录数
+        """
+        if self._conn.execute('SELECT 1 FROM catalog LIMIT 1').fetchone() is None:
+            return 0
+        self._conn.create_function('normalize_title', 1, normalize_title, deterministic=True)
+        self._conn.execute('DROP TABLE IF EXISTS catalog_rebuild')
+        self._conn.execute(_CATALOG_TABLE.format(name='catalog_rebuild'))
+        self._conn.execute(
+            'INSERT OR IGNORE INTO catalog_rebuild (key, title, artist, album_mid) '
+            'SELECT normalize_title(title), title, artist, album_mid FROM catalog'
+        )
+        self._conn.execute('DROP TABLE catalog')
+        self._conn.execute('ALTER TABLE catalog_rebuild RENAME TO catalog')
+        return self._conn.execute('SELECT COUNT(*) FROM catalog').fetchone()[0]
+    
+    def import_records(self, records: Iterable[dict]) -> int:
+        """
+        批量导入记录
+        
+        Args:
+            records: 包含 title, artist, album_mid 的字典
+        
+        Returns:
+            新增的记录数（标题已存在的记录被忽略）
+        """
+        added = 0
+        batch = []
+        
+        def flush():
+            nonlocal added
+            with self._lock:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO catalog (key, title, artist, album_mid) VALUES (?, ?, ?, ?)',
+                    batch,
+                )
+                self._conn.commit()
+                added += self._conn.total_changes - before
+            batch.clear()
+        
+        for record in records:
+            batch.append((normalize_title(record['title']), record['title'],
+                          record.get('artist'), record.get('album_mid')))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        return added
+    
+    def lookup(self, song_name: str) -> dict | None:
+        """
+        按歌曲名查询
+        
+        Args:
+            song_name: 歌曲名
+        
+        Returns:
+            与 QQMusicAPI.get_song_info 格式一致的字典（artist, cover_url, album_mid）；
+            曲库中没有该歌曲时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT artist, album_mid FROM catalog WHERE key = ?', (normalize_title(song_name),)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        # 封面URL模板随API层按需加载，导入曲库时无需加载 requests
+        from api.qq_music import QQMusicBase
+        
+        artist, album_mid = row
+        return {
+            'artist': artist,
+            'cover_url': QQMusicBase.COVER_URL.format(album_mid=album_mid) if album_mid else None,
+            'album_mid': album_mid,
+        }
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM catalog').fetchone()[0]
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self) -> 'CatalogIndex':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def import_catalog(sources: Iterable[str | Path], index_path: str | Path = DEFAULT_CATALOG_PATH,
+                   replace: bool = False) -> tuple[int, int]:
+    """
+    将曲库导出文件导入索引
+    
+    Args:
+        sources: 导出文件路径（CSV/NDJSON）
+        index_path: 索引文件路径
+        replace: 为True时先清空已有索引
+    
+    Returns:
+        (新增记录数, 索引总记录数)
+    """
+    index_path = Path(index_path)
+    if replace:
+        index_path.unlink(missing_ok=True)
+    
+    with CatalogIndex(index_path, readonly=False) as index:
+        added = sum(index.import_records(read_catalog(source)) for source in sources)
+        return added, len(index)
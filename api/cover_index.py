@@ -0,0 +1,115 @@
+"""
+封面索引模块
+记录已下载封面的来源URL及缓存校验信息（ETag/Last-Modified），用于条件请求
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+# 常见图片格式的文件头
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',        # JPEG
+    b'\x89PNG\r\n\x1a\n',   # PNG
+    b'GIF8',                # GIF
+    b'RIFF',                # WEBP
+)
+
+
+def is_valid_image(path: str | Path) -> bool:
+    """
+    判断本地文件是否为完整可用的图片（非空且文件头可识别）
+    
+    Args:
+        path: 图片路径
+    
+    Returns:
+        是否有效
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(8)
+    except OSError:
+        return False
+    return any(header.startswith(sig) for sig in IMAGE_SIGNATURES)
+
+
+class CoverIndex:
+    """
+    封面校验信息索引
+    
+    以JSON文件保存在封面目录下，键为封面的绝对路径，值包含:
+        url: 下载来源
+        etag / last_modified: 服务器返回的校验信息
+    可被多个线程共享使用。
+    """
+    
+    FILENAME = '.covers_index.json'
+    
+    def __init__(self, covers_dir: str | Path):
+        """
+        Args:
+            covers_dir: 封面目录，索引文件保存在该目录下
+        """
+        self.path = Path(covers_dir) / self.FILENAME
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[警告] 封面索引损坏，已忽略: {e}")
+    
+    @staticmethod
+    def key(save_path: str | Path) -> str:
+        return str(Path(save_path).resolve())
+    
+    def get(self, save_path: str | Path) -> dict | None:
+        """获取封面的索引记录"""
+        with self._lock:
+            entry = self._entries.get(self.key(save_path))
+            return dict(entry) if entry else None
+    
+    def update(self, save_path: str | Path, url: str, etag: str | None, last_modified: str | None) -> None:
+        """
+        记录封面的来源与校验信息
+        
+        Args:
+            save_path: 封面保存路径
+            url: 下载来源
+            etag: 响应头 ETag
+            last_modified: 响应头 Last-Modified
+        """
+        with self._lock:
+            self._entries[self.key(save_path)] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+            }
+            self._dirty = True
+    
+    def save(self) -> Path:
+        """
+        原子地写入索引文件（无变更时跳过）
+        
+        Returns:
+            索引文件路径
+        """
+        with self._lock:
+            if not self._dirty:
+                return self.path
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        
+        return self.path
@@ -0,0 +1,221 @@
+"""
+封面内容寻址存储模块
+同一专辑的封面只下载一次，按内容哈希保存，歌曲封面通过链接或路径引用
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from api.cover_index import is_valid_image
+from api.defaults import COVER_STORE_MODES
+from api.qq_music import QQMusicAPI, get_thread_api
+from utils.links import place_file
+
+
+class CoverStore:
+    """
+    以专辑mid和内容哈希组织的封面存储
+    
+    目录结构（位于封面目录下）:
+        store/albums.json           专辑mid -> 内容哈希、来源URL、校验信息
+        store/ab/abcdef....jpg      按SHA-256命名的封面文件
+    
+    同一专辑在一次运行中只请求一次，并发请求同一专辑时等待首个请求的结果；
+    下载失败的专辑不记忆结果，之后的歌曲会重新请求。监视模式下每次处理后调用 clear()，
+    下一次处理时重新检查。不同专辑内容相同的封面也只保存一份。可被多个线程共享使用。
+    """
+    
+    DIRNAME = 'store'
+    INDEX_NAME = 'albums.json'
+    
+    def __init__(self, covers_dir: str | Path, mode: str = 'hardlink', refresh: bool = False,
+                 api_factory: Callable[[], QQMusicAPI] | None = None):
+        """
+        Args:
+            covers_dir: 封面目录
+            mode: 歌曲封面的生成方式
+                hardlink / symlink: 在封面目录下创建指向存储文件的 <歌名>.jpg
+                reference: 不生成单独文件，元数据 cover 字段直接引用存储路径
+            refresh: 为True时对已保存的封面发送条件请求检查更新
+            api_factory: 返回当前线程可用API实例的函数，默认 get_thread_api
+        """
+        if mode not in COVER_STORE_MODES or mode == 'off':
+            raise ValueError(f"无效的封面存储模式: {mode}")
+        
+        self.covers_dir = Path(covers_dir)
+        self.mode = mode
+        self.root = self.covers_dir / self.DIRNAME
+        self.index_path = self.root / self.INDEX_NAME
+        self.refresh = refresh
+        self._api_factory = api_factory or get_thread_api
+        
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._albums: dict[str, dict] = {}
+        self._dirty = False
+        
+        self.downloads = 0
+        self.reused = 0
+        
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._albums = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[警告] 封面存储索引损坏，已忽略: {e}")
+    
+    def object_path(self, digest: str) -> Path:
+        """内容哈希对应的封面文件路径"""
+        return self.root / digest[:2] / f"{digest}.jpg"
+    
+    def web_path(self, object_path: Path, prefix: str = '/covers') -> str:
+        """封面文件相对封面目录的网页路径，如 /covers/store/ab/abcd.jpg"""
+        return f"{prefix}/{object_path.relative_to(self.covers_dir).as_posix()}"
+    
+    def get(self, album_mid: str, url: str) -> tuple[Path | None, str]:
+        """
+        获取专辑封面在存储中的路径，必要时下载
+        
+        Args:
+            album_mid: 专辑mid
+            url: 封面URL
+        
+        Returns:
+            (封面文件路径, 状态)，状态为 downloaded / not_modified / skipped / failed，
+            失败时路径为None
+        """
+        with self._lock:
+            future = self._inflight.get(album_mid)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[album_mid] = future
+        
+        if not is_owner:
+            path, status = future.result()
+            if path is not None:
+                with self._lock:
+                    self.reused += 1
+                return path, 'skipped'
+            return path, status
+        
+        try:
+            result = self._fetch(album_mid, url)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[album_mid]
+            future.set_exception(e)
+            raise
+        
+        if result[0] is None:
+            # 失败结果只交给正在等待的请求，之后的请求重新下载
+            with self._lock:
+                del self._inflight[album_mid]
+        future.set_result(result)
+        return result
+    
+    def _fetch(self, album_mid: str, url: str) -> tuple[Path | None, str]:
+        """检查已保存的封面，按需（条件）下载并写入存储"""
+        with self._lock:
+            entry = self._albums.get(album_mid)
+        
+        validators = None
+        if entry and entry.get('url') == url:
+            existing = self.object_path(entry['hash'])
+            if is_valid_image(existing):
+                if not self.refresh:
+                    with self._lock:
+                        self.reused += 1
+                    return existing, 'skipped'
+                validators = entry
+        
+        incoming = self.root / 'incoming' / f"{album_mid}.jpg"
+        try:
+            result = self._api_factory().download_to(url, incoming, validators)
+        except (requests.RequestException, OSError) as e:
+            print(f"[错误] 下载封面失败 '{url}': {e}")
+            return None, 'failed'
+        
+        if result is None:
+            return self.object_path(entry['hash']), 'not_modified'
+        
+        target = self.object_path(result['digest'])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if is_valid_image(target):
+            # 其他专辑已保存过相同内容
+            incoming.unlink(missing_ok=True)
+        else:
+            os.replace(incoming, target)
+        
+        with self._lock:
+            self._albums[album_mid] = {
+                'hash': result['digest'],
+                'url': url,
+                'etag': result['etag'],
+                'last_modified': result['last_modified'],
+            }
+            self._dirty = True
+            self.downloads += 1
+        
+        return target, 'downloaded'
+    
+    def place(self, album_mid: str, url: str, dest: str | Path) -> tuple[str | None, str]:
+        """
+        为单首歌曲准备封面
+        
+        Args:
+            album_mid: 专辑mid
+            url: 封面URL
+            dest: 歌曲封面路径（hardlink/symlink 模式下创建）
+        
+        Returns:
+            (元数据 cover 字段, 状态)；非 reference 模式或失败时 cover 字段为None
+        """
+        path, status = self.get(album_mid, url)
+        if path is None:
+            return None, status
+        
+        if self.mode == 'reference':
+            return self.web_path(path), status
+        
+        # 文件系统不支持链接时退回普通复制
+        try:
+            place_file(path, dest, self.mode)
+        except OSError as e:
+            print(f"[错误] 生成歌曲封面失败 '{dest}': {e}")
+            return None, 'failed'
+        return None, status
+    
+    def clear(self) -> None:
+        """清空本次运行已记忆的专辑结果（进行中的请求不受影响）"""
+        with self._lock:
+            self._inflight = {
+                album_mid: future for album_mid, future in self._inflight.items() if not future.done()
+            }
+    
+    def save(self) -> Path:
+        """
+        原子地写入专辑索引（无变更时跳过）
+        
+        Returns:
+            索引文件路径
+        """
+        with self._lock:
+            if not self._dirty:
+                return self.index_path
+            
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._albums, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        
+        return self.index_path
@@ -0,0 +1,22 @@
+"""
+API层默认配置
+只依赖标准库，命令行入口解析参数时可直接导入，而不必加载 requests 等整个API层
+"""
+
+from pathlib import Path
+
+
+# 搜索缓存默认目录与有效期
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'songmeta'
+DEFAULT_TTL_DAYS = 30.0
+
+# 离线曲库默认索引路径
+DEFAULT_CATALOG_PATH = DEFAULT_CACHE_DIR / 'catalog.sqlite3'
+
+# 默认重试参数
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 30.0
+
+# 歌曲封面的生成方式
+COVER_STORE_MODES = ('off', 'hardlink', 'symlink', 'reference')
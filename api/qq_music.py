@@ -3,27 +3,224 @@ QQ音乐API模块
 负责搜索歌曲、获取歌手信息和下载封面
 """
 
+import hashlib
+import json
+import os
 import re
+import threading
+import uuid
 import requests
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
+from utils.helpers import normalize_song_name
 
-class QQMusicAPI:
-    """QQ音乐API封装类"""
+from api.cover_index import CoverIndex, is_valid_image
+from api.transport import Transport
+
+if TYPE_CHECKING:
+    from api.cache import SearchCache
+    from api.catalog import CatalogIndex
+
+
+# 分享链接中提取songmid的匹配规则
+SONG_MID_PATTERNS = [
+    r'songmid=([a-zA-Z0-9]+)',  # songmid参数
+    r'songDetail/([a-zA-Z0-9]+)',  # songDetail路径
+    r'/song/([a-zA-Z0-9]+)',  # song路径
+]
+
+
+class SearchFailed(Exception):
+    """搜索请求失败（重试耗尽、响应无法解析），区别于搜索成功但没有结果"""
+
+
+def build_search_params(song_name: str, limit: int) -> dict:
+    """构造 client_search_cp 搜索请求参数"""
+    return {
+        'w': song_name,
+        'format': 'json',
+        'p': 1,
+        'n': limit,
+        'aggr': 1,
+        'lossless': 1,
+        'cr': 1,
+        'new_json': 1,
+    }
+
+
+def parse_search_response(text: str) -> list[dict]:
+    """
+    解析搜索接口返回的JSON/JSONP文本
+    
+    Args:
+        text: 响应正文
+    
+    Returns:
+        歌曲列表
+    """
+    text = text.strip()
+    for prefix in ('callback(', 'MusicJsonCallback('):
+        if text.startswith(prefix):
+            text = text[len(prefix):].rstrip(';').rstrip()
+            text = text[:-1]  # 移除结尾的 )
+            break
+    
+    data = json.loads(text)
+    return data.get('data', {}).get('song', {}).get('list', [])
+
+
+def join_artist_names(song: dict) -> Optional[str]:
+    """将歌曲的歌手列表合并为 "A / B" 形式，无歌手时返回None"""
+    singers = song.get('singer', [])
+    artist_names = [s.get('name', '') for s in singers if s.get('name')]
+    return ' / '.join(artist_names) if artist_names else None
+
+
+def match_song_mid(url: str) -> Optional[str]:
+    """从歌曲页面URL中提取songmid"""
+    for pattern in SONG_MID_PATTERNS:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def is_short_link(share_link: str) -> bool:
+    """判断是否为需要跟随重定向的短链接"""
+    return 'c.y.qq.com' in share_link or 'c6.y.qq.com' in share_link
+
+
+class QQMusicBase:
+    """QQ音乐接口公共部分：端点、请求头与响应解析，供同步/异步客户端共用"""
     
     # 搜索API端点
     SEARCH_URL = "https://c.y.qq.com/soso/fcgi-bin/client_search_cp"
     
+    # 歌曲详情API端点
+    SONG_DETAIL_URL = "https://c.y.qq.com/v8/fcg-bin/fcg_play_single_song.fcg"
+    
+    # 专辑封面URL模板（300x300）
+    COVER_URL = "https://y.gtimg.cn/music/photo_new/T002R300x300M000{album_mid}.jpg"
+    
+    # 封面流式下载的分块大小
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    
     # 请求头，模拟浏览器
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Referer': 'https://y.qq.com/',
     }
     
-    def __init__(self):
-        self.session = requests.Session()
+    @classmethod
+    def endpoint_name(cls, url: str) -> str:
+        """
+        请求URL对应的端点名，用于请求指标统计
+        
+        Returns:
+            search / song_detail / cover / share_link / other
+        """
+        if url.startswith(cls.SEARCH_URL):
+            return 'search'
+        if url.startswith(cls.SONG_DETAIL_URL):
+            return 'song_detail'
+        if url.startswith(cls.COVER_URL.split('{', 1)[0]):
+            return 'cover'
+        if is_short_link(url):
+            return 'share_link'
+        return 'other'
+    
+    @classmethod
+    def parse_song_info(cls, songs: list[dict]) -> dict:
+        """
+        从搜索结果中提取歌手和封面URL
+        
+        Args:
+            songs: search_song 返回的搜索结果
+        
+        Returns:
+            包含 artist, cover_url, album_mid 的字典
+        """
+        result = {
+            'artist': None,
+            'cover_url': None,
+            'album_mid': None,
+        }
+        
+        if not songs:
+            return result
+        
+        first_song = songs[0]
+        
+        # 提取歌手
+        result['artist'] = join_artist_names(first_song)
+        
+        # 提取专辑mid和封面URL
+        album_mid = first_song.get('album', {}).get('mid', '')
+        if album_mid:
+            result['album_mid'] = album_mid
+            result['cover_url'] = cls.COVER_URL.format(album_mid=album_mid)
+        
+        return result
+    
+    @classmethod
+    def parse_song_detail(cls, data: dict) -> dict:
+        """
+        解析歌曲详情接口返回的数据
+        
+        Args:
+            data: fcg_play_single_song 返回的JSON对象
+        
+        Returns:
+            包含 title, artist, cover_url, album_mid 的字典
+        """
+        result = {
+            'title': None,
+            'artist': None,
+            'cover_url': None,
+            'album_mid': None,
+        }
+        
+        songs = data.get('data', [])
+        if not songs:
+            return result
+        
+        song = songs[0]
+        result['title'] = song.get('name', '')
+        
+        # 提取歌手
+        result['artist'] = join_artist_names(song)
+        
+        # 提取专辑mid和封面
+        album_mid = song.get('album', {}).get('mid', '')
+        if album_mid:
+            result['album_mid'] = album_mid
+            result['cover_url'] = cls.COVER_URL.format(album_mid=album_mid)
+        
+        return result
+
+
+class QQMusicAPI(QQMusicBase):
+    """QQ音乐API封装类"""
+    
+    def __init__(self, cache: 'SearchCache | None' = None,
+                 cover_index: CoverIndex | None = None, refresh_covers: bool = False,
+                 transport: Transport | None = None):
+        """
+        Args:
+            cache: 可选，搜索结果缓存（可在多个实例间共享）
+            cover_index: 可选，封面校验信息索引；提供时跳过已存在的封面
+            refresh_covers: 为True时对已存在的封面发送条件请求检查更新
+            transport: 可选，请求传输策略（限速、重试、并发上限），可在多个实例间共享；
+                默认每个实例使用独立的默认策略
+        """
+        self.transport = transport or Transport(classify=self.endpoint_name)
+        self.session = self.transport.create_session()
         self.session.headers.update(self.HEADERS)
+        self.cache = cache
+        self.cover_index = cover_index
+        self.refresh_covers = refresh_covers
     
     def search_song(self, song_name: str, limit: int = 10) -> list[dict]:
         """
@@ -34,41 +231,37 @@ class QQMusicAPI:
             limit: 返回结果数量限制
         
         Returns:
-            搜索结果列表
+            搜索结果列表（未找到时为空列表）
+        
+        Raises:
+            SearchFailed: 请求在重试后仍失败或响应无法解析，结果不会被缓存
         """
-        params = {
-            'w': song_name,
-            'format': 'json',
-            'p': 1,
-            'n': limit,
-            'aggr': 1,
-            'lossless': 1,
-            'cr': 1,
-            'new_json': 1,
-        }
+        params = build_search_params(song_name, limit)
+        
+        if self.cache is not None:
+            cached = self.cache.get(song_name, params)
+            if cached is not None:
+                return cached
         
         try:
             response = self.session.get(self.SEARCH_URL, params=params, timeout=10)
             response.raise_for_status()
             
-            # 处理JSONP响应
-            text = response.text
-            if text.startswith('callback('):
-                text = text[9:-1]  # 移除 callback( 和 )
-            elif text.startswith('MusicJsonCallback('):
-                text = text[18:-1]
-            
-            data = response.json() if response.text.startswith('{') else __import__('json').loads(text)
-            
-            songs = data.get('data', {}).get('song', {}).get('list', [])
-            return songs
+            # 兼容JSON与JSONP响应
+            songs = parse_search_response(response.text)
         
         except requests.RequestException as e:
             print(f"[错误] 搜索歌曲失败 '{song_name}': {e}")
-            return []
+            raise SearchFailed(song_name) from e
         except Exception as e:
             print(f"[错误] 解析搜索结果失败: {e}")
-            return []
+            raise SearchFailed(song_name) from e
+        
+        # 仅缓存成功的响应（包括空结果），请求失败不写入
+        if self.cache is not None:
+            self.cache.set(song_name, params, songs)
+        
+        return songs
     
     def get_song_artist(self, song_name: str) -> Optional[str]:
         """
@@ -78,9 +271,12 @@ class QQMusicAPI:
             song_name: 歌曲名
         
         Returns:
-            歌手名，若未找到则返回None
+            歌手名，若未找到或搜索失败则返回None
         """
-        songs = self.search_song(song_name, limit=5)
+        try:
+            songs = self.search_song(song_name, limit=5)
+        except SearchFailed:
+            return None
         
         if not songs:
             return None
@@ -88,14 +284,8 @@ class QQMusicAPI:
         # 取第一个匹配结果的歌手
         first_song = songs[0]
         
-        # 提取歌手信息
-        singers = first_song.get('singer', [])
-        if singers:
-            # 多个歌手用 / 分隔
-            artist_names = [s.get('name', '') for s in singers if s.get('name')]
-            return ' / '.join(artist_names) if artist_names else None
-        
-        return None
+        # 提取歌手信息，多个歌手用 / 分隔
+        return join_artist_names(first_song)
     
     def get_album_cover_url(self, song_name: str) -> Optional[str]:
         """
@@ -105,9 +295,12 @@ class QQMusicAPI:
             song_name: 歌曲名
         
         Returns:
-            封面图片URL
+            封面图片URL，若未找到或搜索失败则返回None
         """
-        songs = self.search_song(song_name, limit=1)
+        try:
+            songs = self.search_song(song_name, limit=1)
+        except SearchFailed:
+            return None
         
         if not songs:
             return None
@@ -118,7 +311,7 @@ class QQMusicAPI:
         album_mid = first_song.get('album', {}).get('mid', '')
         if album_mid:
             # 使用高质量封面URL
-            return f"https://y.gtimg.cn/music/photo_new/T002R300x300M000{album_mid}.jpg"
+            return self.COVER_URL.format(album_mid=album_mid)
         
         # 备用：使用albumid
         album_id = first_song.get('album', {}).get('id', 0)
@@ -127,67 +320,122 @@ class QQMusicAPI:
         
         return None
     
-    def download_cover(self, url: str, save_path: str | Path) -> bool:
+    def download_to(self, url: str, save_path: str | Path,
+                    validators: dict | None = None) -> dict | None:
         """
-        下载封面图片到本地
+        流式下载文件，写入临时文件后原子替换到目标路径
         
         Args:
-            url: 封面图片URL
+            url: 文件URL
             save_path: 保存路径
+            validators: 可选，上次记录的 etag / last_modified，用于条件请求
         
         Returns:
-            是否下载成功
+            包含 etag, last_modified, digest(SHA-256) 的字典；
+            服务器返回304（未修改）时返回None
+        
+        Raises:
+            requests.RequestException: 请求失败
+            OSError: 写入失败
         """
-        try:
-            response = self.session.get(url, timeout=15)
+        save_file = Path(save_path)
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        with self.session.get(url, headers=headers, stream=True, timeout=15) as response:
+            if response.status_code == 304:
+                return None
             response.raise_for_status()
             
-            save_file = Path(save_path)
             save_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = save_file.with_name(f".{save_file.name}.{uuid.uuid4().hex[:8]}.part")
+            digest = hashlib.sha256()
+            try:
+                with open(tmp_file, 'wb') as f:
+                    for chunk in response.iter_content(self.DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                os.replace(tmp_file, save_file)
+            finally:
+                tmp_file.unlink(missing_ok=True)
             
-            with open(save_file, 'wb') as f:
-                f.write(response.content)
-            
-            return True
-        
-        except requests.RequestException as e:
-            print(f"[错误] 下载封面失败 '{url}': {e}")
-            return False
+            return {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'digest': digest.hexdigest(),
+            }
     
-    def get_song_info(self, song_name: str) -> dict:
+    def fetch_cover(self, url: str, save_path: str | Path) -> str:
         """
-        获取歌曲完整信息（歌手、封面URL）
+        下载封面图片到本地，返回下载结果
+        
+        配置了封面索引时，来源相同的有效封面直接跳过，不发起请求；
+        refresh_covers 为True时改为携带 ETag/Last-Modified 发送条件请求。
+        内容流式写入临时文件后再替换，中断时不会留下不完整的封面。
         
         Args:
-            song_name: 歌曲名
+            url: 封面图片URL
+            save_path: 保存路径
         
         Returns:
-            包含 artist 和 cover_url 的字典
+            'downloaded' / 'not_modified' / 'skipped' / 'failed'
         """
-        songs = self.search_song(song_name, limit=1)
+        save_file = Path(save_path)
+        validators = None
         
-        result = {
-            'artist': None,
-            'cover_url': None,
-        }
+        if self.cover_index is not None and is_valid_image(save_file):
+            entry = self.cover_index.get(save_file)
+            same_source = entry is None or entry.get('url') == url
+            if same_source and not self.refresh_covers:
+                return 'skipped'
+            if same_source:
+                validators = entry
         
-        if not songs:
-            return result
+        try:
+            result = self.download_to(url, save_file, validators)
+        except (requests.RequestException, OSError) as e:
+            print(f"[错误] 下载封面失败 '{url}': {e}")
+            return 'failed'
         
-        first_song = songs[0]
+        if result is None:
+            return 'not_modified'
         
-        # 提取歌手
-        singers = first_song.get('singer', [])
-        if singers:
-            artist_names = [s.get('name', '') for s in singers if s.get('name')]
-            result['artist'] = ' / '.join(artist_names) if artist_names else None
+        if self.cover_index is not None:
+            self.cover_index.update(save_file, url, result['etag'], result['last_modified'])
+        return 'downloaded'
+    
+    def download_cover(self, url: str, save_path: str | Path) -> bool:
+        """
+        下载封面图片到本地
         
-        # 提取封面URL
-        album_mid = first_song.get('album', {}).get('mid', '')
-        if album_mid:
-            result['cover_url'] = f"https://y.gtimg.cn/music/photo_new/T002R300x300M000{album_mid}.jpg"
+        Args:
+            url: 封面图片URL
+            save_path: 保存路径
         
-        return result
+        Returns:
+            是否下载成功（已是最新而跳过也视为成功）
+        """
+        return self.fetch_cover(url, save_path) != 'failed'
+    
+    def get_song_info(self, song_name: str) -> dict:
+        """
+        获取歌曲完整信息（歌手、封面URL）
+        
+        Args:
+            song_name: 歌曲名
+        
+        Returns:
+            包含 artist, cover_url, album_mid 的字典
+        
+        Raises:
+            SearchFailed: 搜索失败
+        """
+        songs = self.search_song(song_name, limit=1)
+        return self.parse_song_info(songs)
     
     def parse_share_link(self, share_link: str) -> Optional[str]:
         """
@@ -202,7 +450,7 @@ class QQMusicAPI:
             歌曲mid，若解析失败返回None
         """
         # 处理短链接，需要跟随重定向
-        if 'c.y.qq.com' in share_link or 'c6.y.qq.com' in share_link:
+        if is_short_link(share_link):
             try:
                 response = self.session.get(share_link, allow_redirects=True, timeout=10)
                 share_link = response.url
@@ -211,18 +459,7 @@ class QQMusicAPI:
                 return None
         
         # 从URL中提取songmid
-        patterns = [
-            r'songmid=([a-zA-Z0-9]+)',  # songmid参数
-            r'songDetail/([a-zA-Z0-9]+)',  # songDetail路径
-            r'/song/([a-zA-Z0-9]+)',  # song路径
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, share_link)
-            if match:
-                return match.group(1)
-        
-        return None
+        return match_song_mid(share_link)
     
     def get_song_info_by_mid(self, song_mid: str) -> dict:
         """
@@ -234,48 +471,30 @@ class QQMusicAPI:
         Returns:
             包含 title, artist, cover_url, album_mid 的字典
         """
+        if self.cache is not None:
+            cached = self.cache.get_song_detail(song_mid)
+            if cached is not None:
+                return cached
+        
         # 使用歌曲详情API
-        url = "https://c.y.qq.com/v8/fcg-bin/fcg_play_single_song.fcg"
         params = {
             'songmid': song_mid,
             'format': 'json',
         }
         
-        result = {
-            'title': None,
-            'artist': None,
-            'cover_url': None,
-            'album_mid': None,
-        }
-        
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            songs = data.get('data', [])
-            if not songs:
-                return result
-            
-            song = songs[0]
-            result['title'] = song.get('name', '')
-            
-            # 提取歌手
-            singers = song.get('singer', [])
-            if singers:
-                artist_names = [s.get('name', '') for s in singers if s.get('name')]
-                result['artist'] = ' / '.join(artist_names)
-            
-            # 提取专辑mid和封面
-            album_mid = song.get('album', {}).get('mid', '')
-            if album_mid:
-                result['album_mid'] = album_mid
-                result['cover_url'] = f"https://y.gtimg.cn/music/photo_new/T002R300x300M000{album_mid}.jpg"
-            
-            return result
+            response = self.session.get(self.SONG_DETAIL_URL, params=params, timeout=10)
+            info = self.parse_song_detail(response.json())
         
         except Exception as e:
             print(f"[错误] 获取歌曲信息失败: {e}")
-            return result
+            return self.parse_song_detail({})
+        
+        # 仅缓存查到的歌曲
+        if self.cache is not None and info.get('title'):
+            self.cache.set_song_detail(song_mid, info)
+        
+        return info
     
     def download_cover_from_link(self, share_link: str, save_path: str | Path) -> bool:
         """
@@ -304,19 +523,152 @@ class QQMusicAPI:
         return self.download_cover(song_info['cover_url'], save_path)
 
 
+class SongResolver:
+    """
+    歌曲信息解析层：按规范化歌曲名记忆查询结果，并合并并发的重复查询
+    
+    同一歌曲名（包括大小写/全半角/空白不同的写法）在一次运行中只触发
+    一次搜索请求；其他线程同时查询同一首歌时等待首个请求的结果。
+    解析结果中已包含 cover_url，下载封面时无需再次搜索。
+    
+    指定离线曲库时先查询曲库，只有未命中的歌曲才发起网络请求。
+    """
+    
+    def __init__(self, api_factory: Callable[[], QQMusicAPI] | None = None,
+                 catalog: 'CatalogIndex | None' = None, fallback: bool = True):
+        """
+        Args:
+            api_factory: 返回当前线程可用API实例的函数，默认 get_thread_api
+            catalog: 可选，离线曲库索引
+            fallback: 曲库未命中时是否通过网络查询；为False时视为未找到
+        """
+        self._api_factory = api_factory or get_thread_api
+        self._catalog = catalog
+        self._fallback = fallback
+        self._lock = threading.Lock()
+        self._results: dict[str, Future] = {}
+        
+        self.lookups = 0
+        self.coalesced = 0
+        self.catalog_hits = 0
+    
+    def resolve(self, song_name: str) -> dict:
+        """
+        获取歌曲信息（歌手、封面URL、专辑mid）
+        
+        Args:
+            song_name: 歌曲名
+        
+        Returns:
+            包含 artist, cover_url, album_mid 的字典（副本，可自由修改）
+        
+        Raises:
+            SearchFailed: 搜索失败；失败不做记忆，之后的调用会重新搜索
+        """
+        key = normalize_song_name(song_name)
+        
+        with self._lock:
+            future = self._results.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._results[key] = future
+                self.lookups += 1
+            else:
+                self.coalesced += 1
+        
+        if not is_owner:
+            return dict(future.result())
+        
+        try:
+            info = self._lookup(song_name)
+        except BaseException as e:
+            # 异常不做记忆，后续调用可重试
+            with self._lock:
+                del self._results[key]
+            future.set_exception(e)
+            raise
+        
+        future.set_result(info)
+        return dict(info)
+    
+    def _lookup(self, song_name: str) -> dict:
+        """依次查询离线曲库和QQ音乐"""
+        if self._catalog is not None:
+            info = self._catalog.lookup(song_name)
+            if info is not None:
+                with self._lock:
+                    self.catalog_hits += 1
+                return info
+            if not self._fallback:
+                return QQMusicBase.parse_song_info([])
+        return self._api_factory().get_song_info(song_name)
+    
+    def clear(self) -> None:
+        """清空已记忆的结果"""
+        with self._lock:
+            self._results.clear()
+
+
 # 模块级便捷函数
 _api_instance = None
+_resolver_instance = None
+_api_options: dict = {}
+_api_generation = 0
+_thread_local = threading.local()
+
+def configure_api(**options) -> None:
+    """
+    设置 get_api() / get_thread_api() 创建实例时使用的参数
+    
+    已创建的实例会在下次获取时按新参数重建。
+    
+    Args:
+        **options: 传给 QQMusicAPI 构造函数的关键字参数，如 cache
+    """
+    global _api_instance, _api_options, _api_generation, _resolver_instance
+    _api_options = dict(options)
+    _api_instance = None
+    _resolver_instance = None
+    _api_generation += 1
+
 
 def get_api() -> QQMusicAPI:
     """获取API单例实例"""
     global _api_instance
     if _api_instance is None:
-        _api_instance = QQMusicAPI()
+        _api_instance = QQMusicAPI(**_api_options)
     return _api_instance
 
 
+def get_thread_api() -> QQMusicAPI:
+    """
+    获取当前线程专属的API实例
+    
+    requests.Session 不保证线程安全，并发场景下每个工作线程
+    持有独立的实例（及其连接池），而不是共享 get_api() 单例。
+    
+    Returns:
+        当前线程的 QQMusicAPI 实例
+    """
+    api = getattr(_thread_local, 'api', None)
+    if api is None or _thread_local.generation != _api_generation:
+        api = QQMusicAPI(**_api_options)
+        _thread_local.api = api
+        _thread_local.generation = _api_generation
+    return api
+
+
+def get_resolver() -> SongResolver:
+    """获取模块级歌曲信息解析器实例"""
+    global _resolver_instance
+    if _resolver_instance is None:
+        _resolver_instance = SongResolver()
+    return _resolver_instance
+
+
 def search_song(song_name: str) -> list[dict]:
-    """搜索歌曲"""
+    """搜索歌曲，失败时抛出 SearchFailed"""
     return get_api().search_song(song_name)
 
 
@@ -326,14 +678,27 @@ def get_song_artist(song_name: str) -> Optional[str]:
 
 
 def get_song_info(song_name: str) -> dict:
-    """获取歌曲信息"""
-    return get_api().get_song_info(song_name)
+    """获取歌曲信息（同名歌曲只查询一次），失败时抛出 SearchFailed"""
+    return get_resolver().resolve(song_name)
 
 
-def download_cover(song_name: str, save_path: str | Path) -> bool:
-    """下载歌曲封面"""
-    api = get_api()
-    url = api.get_album_cover_url(song_name)
-    if url:
-        return api.download_cover(url, save_path)
+def download_cover(song_name: str, save_path: str | Path, cover_url: str | None = None) -> bool:
+    """
+    下载歌曲封面
+    
+    Args:
+        song_name: 歌曲名
+        save_path: 保存路径
+        cover_url: 可选，已解析出的封面URL；未提供时复用 get_song_info 的结果
+    
+    Returns:
+        是否下载成功
+    """
+    if not cover_url:
+        try:
+            cover_url = get_resolver().resolve(song_name).get('cover_url')
+        except SearchFailed:
+            return False
+    if cover_url:
+        return get_thread_api().download_cover(cover_url, save_path)
     return False
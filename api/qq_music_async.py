@@ -0,0 +1,224 @@
+"""
+QQ音乐异步API模块
+基于 asyncio + aiohttp，与 QQMusicAPI 接口一致，适合在事件循环中大批量并发查询
+
+用法:
+    async with AsyncQQMusicAPI(concurrency=100) as api:
+        infos = await api.get_many_song_info(['红山果', '晴天'])
+"""
+
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+try:
+    import aiohttp
+except ImportError as e:  # pragma: no cover - 依赖缺失时给出安装提示
+    raise ImportError(
+        "AsyncQQMusicAPI 需要 aiohttp，请执行: uv pip install 'songmeta[async]'"
+    ) from e
+
+from api.qq_music import (
+    QQMusicBase,
+    SearchFailed,
+    build_search_params,
+    is_short_link,
+    match_song_mid,
+    parse_search_response,
+)
+
+
+class AsyncQQMusicAPI(QQMusicBase):
+    """QQ音乐异步API封装类"""
+    
+    def __init__(self, concurrency: int = 50, session: aiohttp.ClientSession | None = None):
+        """
+        Args:
+            concurrency: 同时在途的最大请求数
+            session: 可选，外部传入的 aiohttp 会话（由调用方负责关闭）
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须为正整数")
+        
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = session
+        self._owns_session = session is None
+    
+    async def __aenter__(self) -> 'AsyncQQMusicAPI':
+        self._ensure_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """按需创建会话（需在事件循环中调用）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self._session = aiohttp.ClientSession(headers=self.HEADERS, connector=connector)
+            self._owns_session = True
+        return self._session
+    
+    async def close(self) -> None:
+        """关闭自行创建的会话"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def search_song(self, song_name: str, limit: int = 10) -> list[dict]:
+        """
+        搜索歌曲
+        
+        Args:
+            song_name: 歌曲名
+            limit: 返回结果数量限制
+        
+        Returns:
+            搜索结果列表
+        
+        Raises:
+            SearchFailed: 请求失败或响应无法解析
+        """
+        params = build_search_params(song_name, limit)
+        session = self._ensure_session()
+        
+        try:
+            async with self._semaphore:
+                async with session.get(
+                    self.SEARCH_URL, params=params, timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    response.raise_for_status()
+                    text = await response.text()
+            
+            # 兼容JSON与JSONP响应
+            return parse_search_response(text)
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[错误] 搜索歌曲失败 '{song_name}': {e}")
+            raise SearchFailed(song_name) from e
+        except Exception as e:
+            print(f"[错误] 解析搜索结果失败: {e}")
+            raise SearchFailed(song_name) from e
+    
+    async def get_song_info(self, song_name: str) -> dict:
+        """
+        获取歌曲完整信息（歌手、封面URL）
+        
+        Args:
+            song_name: 歌曲名
+        
+        Returns:
+            包含 artist 和 cover_url 的字典
+        
+        Raises:
+            SearchFailed: 搜索失败
+        """
+        songs = await self.search_song(song_name, limit=1)
+        return self.parse_song_info(songs)
+    
+    async def get_many_song_info(self, song_names: Iterable[str]) -> list[dict]:
+        """
+        并发获取多首歌曲信息，在途请求数受 concurrency 限制
+        
+        Args:
+            song_names: 歌曲名列表
+        
+        Returns:
+            与输入顺序一致的歌曲信息列表，搜索失败的歌曲为 None
+        """
+        async def song_info_or_none(name: str) -> Optional[dict]:
+            try:
+                return await self.get_song_info(name)
+            except SearchFailed:
+                return None
+        
+        return await asyncio.gather(*(song_info_or_none(name) for name in song_names))
+    
+    async def get_song_info_by_mid(self, song_mid: str) -> dict:
+        """
+        通过歌曲mid获取歌曲信息
+        
+        Args:
+            song_mid: 歌曲的mid标识
+        
+        Returns:
+            包含 title, artist, cover_url, album_mid 的字典
+        """
+        params = {
+            'songmid': song_mid,
+            'format': 'json',
+        }
+        session = self._ensure_session()
+        
+        try:
+            async with self._semaphore:
+                async with session.get(
+                    self.SONG_DETAIL_URL, params=params, timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    data = await response.json(content_type=None)
+            return self.parse_song_detail(data)
+        
+        except Exception as e:
+            print(f"[错误] 获取歌曲信息失败: {e}")
+            return self.parse_song_detail({})
+    
+    async def parse_share_link(self, share_link: str) -> Optional[str]:
+        """
+        解析QQ音乐分享链接，提取歌曲mid
+        
+        Args:
+            share_link: QQ音乐分享链接（短链接或歌曲页面链接）
+        
+        Returns:
+            歌曲mid，若解析失败返回None
+        """
+        # 处理短链接，需要跟随重定向
+        if is_short_link(share_link):
+            session = self._ensure_session()
+            try:
+                async with self._semaphore:
+                    async with session.get(
+                        share_link, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=10)
+                    ) as response:
+                        share_link = str(response.url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"[错误] 解析短链接失败: {e}")
+                return None
+        
+        return match_song_mid(share_link)
+    
+    async def download_cover(self, url: str, save_path: str | Path) -> bool:
+        """
+        下载封面图片到本地
+        
+        内容流式写入临时文件后再替换，中断或超时时不会留下不完整的封面。
+        
+        Args:
+            url: 封面图片URL
+            save_path: 保存路径
+        
+        Returns:
+            是否下载成功
+        """
+        session = self._ensure_session()
+        save_file = Path(save_path)
+        tmp_file = save_file.with_name(f".{save_file.name}.{uuid.uuid4().hex[:8]}.part")
+        
+        try:
+            async with self._semaphore:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                    response.raise_for_status()
+                    save_file.parent.mkdir(parents=True, exist_ok=True)
+                    with open(tmp_file, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+            os.replace(tmp_file, save_file)
+            return True
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            print(f"[错误] 下载封面失败 '{url}': {e}")
+            return False
+        finally:
+            tmp_file.unlink(missing_ok=True)
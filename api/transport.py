@@ -0,0 +1,343 @@
+"""
+HTTP传输层模块
+为QQ音乐API请求提供令牌桶限速、失败重试（指数退避+随机抖动）、自适应并发上限
+以及按端点统计的请求指标
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from bisect import bisect_left
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from api.defaults import DEFAULT_BACKOFF_BASE, DEFAULT_BACKOFF_CAP, DEFAULT_MAX_RETRIES
+
+
+# 视为服务端限流/临时故障、需要重试的状态码
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 请求延迟直方图的分桶上界（毫秒），最后一个桶为 +inf
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+    
+    以固定速率补充令牌，桶容量决定允许的突发请求数。可被多个线程共享使用。
+    """
+    
+    def __init__(self, rate: float, burst: int | None = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数（即平均请求速率）
+            burst: 桶容量，默认与 rate 相同（至少为1）
+        """
+        if rate <= 0:
+            raise ValueError(f"无效的速率: {rate}")
+        self.rate = rate
+        self.capacity = max(1, burst if burst is not None else int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """
+        取出一个令牌，令牌不足时阻塞等待
+        
+        Returns:
+            等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveLimiter:
+    """
+    自适应并发上限（加性增、乘性减）
+    
+    最近一批请求的错误率超过阈值时并发上限减半；一整批请求全部成功时上限加一，
+    直至 maximum。可被多个线程共享使用。
+    """
+    
+    def __init__(self, maximum: int, minimum: int = 1, window: int = 20,
+                 error_threshold: float = 0.2):
+        """
+        Args:
+            maximum: 并发上限的最大值（通常为工作线程数）
+            minimum: 并发上限的最小值
+            window: 统计错误率的请求数
+            error_threshold: 触发降低并发的错误率
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = self.maximum
+        self.error_threshold = error_threshold
+        self._outcomes: deque[bool] = deque(maxlen=max(1, window))
+        self._active = 0
+        self._cond = threading.Condition()
+    
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额，名额不足时阻塞等待"""
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+    
+    def record(self, ok: bool) -> None:
+        """
+        记录一次请求结果并按需调整并发上限
+        
+        Args:
+            ok: 请求是否成功（限流、服务端错误、超时均视为失败）
+        """
+        with self._cond:
+            self._outcomes.append(ok)
+            errors = self._outcomes.count(False)
+            
+            if errors and errors / len(self._outcomes) >= self.error_threshold:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._outcomes.clear()
+            elif len(self._outcomes) == self._outcomes.maxlen and not errors:
+                if self.limit < self.maximum:
+                    self.limit += 1
+                    self._cond.notify()
+                self._outcomes.clear()
+
+
+class RequestMetrics:
+    """
+    按端点统计请求次数、状态码和延迟直方图
+    
+    每次实际发出的HTTP请求（包括重试）各记录一次，延迟为收到响应头的耗时。
+    可被多个线程共享使用。
+    """
+    
+    def __init__(self, classify: Callable[[str], str] | None = None):
+        """
+        Args:
+            classify: 将请求URL映射为端点名的函数，默认使用URL的主机名
+        """
+        self._classify = classify or (lambda url: urlparse(url).netloc or 'other')
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict] = {}
+    
+    def record(self, url: str, seconds: float, status: int | None) -> None:
+        """
+        记录一次请求
+        
+        Args:
+            url: 请求URL
+            seconds: 请求耗时（秒）
+            status: 响应状态码，超时或连接失败时为None
+        """
+        endpoint = self._classify(url)
+        bucket = bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        status_key = str(status) if status is not None else 'error'
+        
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'count': 0,
+                    'errors': 0,
+                    'seconds': 0.0,
+                    'max_seconds': 0.0,
+                    'status': {},
+                    'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            entry['status'][status_key] = entry['status'].get(status_key, 0) + 1
+            entry['histogram'][bucket] += 1
+            if status is None or status >= 400:
+                entry['errors'] += 1
+    
+    def to_dict(self) -> dict:
+        """
+        导出统计结果
+        
+        Returns:
+            端点名 -> {count, errors, mean_seconds, max_seconds, status, histogram}，
+            histogram 以分桶上界（毫秒，'+inf' 为最后一桶）为键
+        """
+        labels = [str(bound) for bound in LATENCY_BUCKETS_MS] + ['+inf']
+        with self._lock:
+            return {
+                endpoint: {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'mean_seconds': entry['seconds'] / entry['count'],
+                    'max_seconds': entry['max_seconds'],
+                    'status': dict(entry['status']),
+                    'histogram': dict(zip(labels, entry['histogram'])),
+                }
+                for endpoint, entry in self._endpoints.items()
+            }
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """
+    解析响应头 Retry-After（秒数或HTTP日期）
+    
+    Returns:
+        需要等待的秒数，无法解析时返回None
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Transport:
+    """
+    请求传输策略
+    
+    保存限速器、并发上限和重试参数，由 create_session() 创建的各个会话共享，
+    因此多个工作线程的请求会按同一速率和并发上限调度。
+    """
+    
+    def __init__(self, rate_limit: float | None = None, burst: int | None = None,
+                 max_concurrency: int = 1, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_cap: float = DEFAULT_BACKOFF_CAP,
+                 classify: Callable[[str], str] | None = None):
+        """
+        Args:
+            rate_limit: 每秒最多发起的请求数，None 表示不限速
+            burst: 允许的突发请求数，默认与 rate_limit 相同
+            max_concurrency: 同时进行的请求数上限（出错时自动降低）
+            max_retries: 单个请求的最大重试次数
+            backoff_base: 首次重试的退避时间（秒）
+            backoff_cap: 单次退避时间上限（秒）
+            classify: 统计请求指标时将URL映射为端点名的函数
+        """
+        if max_retries < 0:
+            raise ValueError(f"无效的重试次数: {max_retries}")
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.metrics = RequestMetrics(classify)
+        
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+    
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（指数退避，完全随机抖动）"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+    
+    def create_session(self) -> 'ThrottledSession':
+        """创建使用本传输策略的会话"""
+        return ThrottledSession(self)
+    
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+    
+    def stats(self) -> dict:
+        """返回本次运行的请求统计"""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'failures': self.failures,
+            'concurrency': self.limiter.limit,
+            'endpoints': self.metrics.to_dict(),
+        }
+
+
+class ThrottledSession(requests.Session):
+    """
+    按 Transport 策略限速、限并发并自动重试的会话
+    
+    对 429/5xx 响应、超时和连接错误进行重试，优先遵循 Retry-After；
+    重试耗尽后返回最后一次响应或抛出最后一次异常，由调用方按原有方式处理。
+    每个工作线程持有各自的会话，对同一主机同时只有一个请求，使用默认的连接池即可。
+    """
+    
+    def __init__(self, transport: Transport):
+        super().__init__()
+        self.transport = transport
+    
+    def request(self, method, url, *args, **kwargs):
+        transport = self.transport
+        attempt = 0
+        while True:
+            if transport.bucket is not None:
+                transport.bucket.acquire()
+            
+            response = None
+            error = None
+            with transport.limiter.slot():
+                transport._count('requests')
+                started = time.perf_counter()
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    error = e
+                transport.metrics.record(
+                    url, time.perf_counter() - started,
+                    response.status_code if response is not None else None,
+                )
+            
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            transport.limiter.record(not retryable)
+            if not retryable:
+                return response
+            
+            if response is not None and response.status_code == 429:
+                transport._count('throttled')
+            
+            if attempt >= transport.max_retries:
+                transport._count('failures')
+                if error is not None:
+                    raise error
+                return response
+            
+            delay = retry_after_seconds(response) if response is not None else None
+            if delay is None:
+                delay = transport.backoff(attempt)
+            else:
+                delay = min(delay, transport.backoff_cap)
+            if response is not None:
+                response.close()
+            
+            transport._count('retries')
+            attempt += 1
+            time.sleep(delay)
@@ -0,0 +1,4 @@
+"""
+性能基准测试
+包含合成歌曲目录生成器、本地QQ音乐模拟服务以及按阶段计时的基准运行器
+"""
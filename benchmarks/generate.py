@@ -0,0 +1,91 @@
+"""
+合成歌曲目录生成器
+生成形如 【星瞳】《歌名》.mp3 的假MP3文件及对应的JSON元数据（部分带BW后缀）
+
+用法:
+    uv run python -m benchmarks.generate ./bench_src --count 10000
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+
+# 歌名由以下字符随机组合
+_NAME_CHARS = '星瞳红山果晴天稻香夜曲青花瓷告白气球七里香半岛铁盒听妈妈的话'
+
+# 最小的 MPEG 音频帧头，后接填充字节
+_MP3_HEADER = b'ID3\x03\x00\x00\x00\x00\x00\x00\xff\xfb\x90\x64'
+
+
+def song_title(index: int, rng: random.Random) -> str:
+    """生成不重复的歌名（随机汉字 + 序号）"""
+    length = rng.randint(2, 5)
+    return ''.join(rng.choice(_NAME_CHARS) for _ in range(length)) + str(index)
+
+
+def generate_collection(root: str | Path, count: int, mp3_size: int = 4096,
+                        bw_ratio: float = 0.3, missing_json_ratio: float = 0.05,
+                        comment_count: int = 20, seed: int = 0) -> Path:
+    """
+    生成合成源目录
+    
+    Args:
+        root: 目标目录（不存在时创建）
+        count: MP3文件数
+        mp3_size: 每个MP3文件的字节数
+        bw_ratio: JSON文件名带BW后缀（如 【星瞳】《歌名》BW123.json）的比例
+        missing_json_ratio: 没有JSON元数据的比例
+        comment_count: 每个JSON中附带的嵌套评论数，用于模拟真实文件的体积
+        seed: 随机种子，相同参数生成相同目录
+    
+    Returns:
+        目标目录路径
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    padding = b'\x00' * max(0, mp3_size - len(_MP3_HEADER))
+    
+    for index in range(count):
+        title = song_title(index, rng)
+        stem = f"【星瞳】《{title}》"
+        (root / f"{stem}.mp3").write_bytes(_MP3_HEADER + padding)
+        
+        if rng.random() < missing_json_ratio:
+            continue
+        
+        metadata = {
+            'title': stem,
+            'author': '星瞳_Official',
+            'pubtimestamp': rng.randint(1_600_000_000, 1_750_000_000),
+            'description': f"{title} 翻唱",
+            'comments': [
+                {'title': f"评论{i}", 'content': '好听' * rng.randint(1, 20)}
+                for i in range(comment_count)
+            ],
+        }
+        json_stem = f"{stem}BW{rng.randint(100000, 999999)}" if rng.random() < bw_ratio else stem
+        with open(root / f"{json_stem}.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+    
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成歌曲源目录')
+    parser.add_argument('output', help='目标目录')
+    parser.add_argument('-n', '--count', type=int, default=100, help='MP3文件数（默认: 100）')
+    parser.add_argument('--mp3-size', type=int, default=4096, help='每个MP3文件的字节数（默认: 4096）')
+    parser.add_argument('--bw-ratio', type=float, default=0.3, help='JSON带BW后缀的比例（默认: 0.3）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（默认: 0）')
+    args = parser.parse_args()
+    
+    root = generate_collection(args.output, args.count, mp3_size=args.mp3_size,
+                               bw_ratio=args.bw_ratio, seed=args.seed)
+    print(f"已生成 {args.count} 首歌曲到: {root.resolve()}")
+
+
+if __name__ == '__main__':
+    main()
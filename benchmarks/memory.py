@@ -0,0 +1,208 @@
+"""
+内存占用基准
+在独立进程中构造与一次完整运行相同数量的文件对、歌曲数据和元数据记录并同时保留
+（与合并、分片导出时一致），对比旧的字典表示与 core.records 中的 __slots__ 记录类型的内存峰值
+
+用法:
+    uv run python -m benchmarks.memory --sizes 10000 100000
+    uv run python -m benchmarks.memory --sizes 100000 200000 -o benchmarks/baselines/memory.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.generate import song_title
+from benchmarks.run import DEFAULT_TIMEOUT, BenchmarkFailed, run_isolated
+
+
+RESULTS_VERSION = 1
+
+# 默认规模
+DEFAULT_SIZES = (10_000, 100_000)
+
+# 对比的表示方式
+LAYOUTS = ('dict', 'records')
+
+# 合成数据中不同原唱歌手、发布日期的数量（真实曲库中这些值大量重复）
+ARTIST_POOL = 2000
+DATE_POOL = 1500
+
+# 没有JSON元数据的比例，与 benchmarks.generate 一致
+MISSING_JSON_RATIO = 0.05
+
+
+def _fresh(text: str) -> str:
+    """返回内容相同的新字符串对象，模拟从JSON或API响应中解码出的值"""
+    return text.encode('utf-8').decode('utf-8')
+
+
+def iter_songs(count: int, seed: int):
+    """
+    生成合成歌曲，相同参数在各进程中得到相同的数据
+    
+    Yields:
+        (MP3文件名, JSON文件名或None, 歌名, 原唱歌手, 发布日期)
+    """
+    rng = random.Random(seed)
+    artists = [f"歌手{i}" for i in range(ARTIST_POOL)]
+    dates = [f"20{18 + i // 365 % 8:02d}-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d}" for i in range(DATE_POOL)]
+    for index in range(count):
+        title = song_title(index, rng)
+        stem = f"【星瞳】《{title}》"
+        json_name = None if rng.random() < MISSING_JSON_RATIO else f"{stem}.json"
+        yield f"{stem}.mp3", json_name, title, _fresh(rng.choice(artists)), _fresh(rng.choice(dates))
+
+
+def build_dicts(count: int, seed: int, source: Path) -> tuple[list, list, list]:
+    """按改用记录类型之前的字典结构构造三类数据"""
+    pairs, songs, metadata = [], [], []
+    for mp3_name, json_name, title, subtitle, date in iter_songs(count, seed):
+        pairs.append({
+            'mp3_path': Path(os.path.join(source, mp3_name)),
+            'json_path': Path(os.path.join(source, json_name)) if json_name else None,
+            'song_name': title,
+            'original_name': mp3_name,
+        })
+        songs.append({'title': title, 'subtitle': subtitle, 'date': date})
+        metadata.append({
+            'title': title,
+            'subtitle': subtitle,
+            'artist': "星瞳",
+            'date': date,
+            'cover': f"/covers/{title}.jpg",
+            'audio': f"/audio/{title}.mp3",
+            'tags': ['翻唱'],
+        })
+    return pairs, songs, metadata
+
+
+def build_records(count: int, seed: int, source: Path) -> tuple[list, list, list]:
+    """使用 core.records 的记录类型及 create_song_metadata 构造三类数据"""
+    from core.metadata_generator import create_song_metadata
+    from core.records import Song, SongPair
+    
+    pairs, songs, metadata = [], [], []
+    for mp3_name, json_name, title, subtitle, date in iter_songs(count, seed):
+        pairs.append(SongPair(source, mp3_name, title, json_name))
+        song = Song(title, subtitle, date)
+        songs.append(song)
+        metadata.append(create_song_metadata(song.title, song.subtitle, song.date))
+    return pairs, songs, metadata
+
+
+_BUILDERS = {
+    'dict': build_dicts,
+    'records': build_records,
+}
+
+
+def _run_layout(layout: str, size: int, seed: int, queue) -> None:
+    """在独立进程中构造数据，结果放入队列"""
+    from utils.timing import peak_rss
+    
+    import core.metadata_generator  # noqa: F401  导入开销计入基础内存
+    
+    source = Path('/music/source').resolve()
+    baseline = peak_rss()
+    start = time.perf_counter()
+    data = _BUILDERS[layout](size, seed, source)
+    seconds = time.perf_counter() - start
+    peak = peak_rss()
+    
+    queue.put({
+        'songs': size,
+        'seconds': seconds,
+        'baseline_rss': baseline,
+        'peak_rss': peak,
+        'records_bytes': peak - baseline,
+        'bytes_per_song': (peak - baseline) / size,
+    })
+    del data
+
+
+def run_memory(sizes: list[int], seed: int, timeout: float | None = DEFAULT_TIMEOUT) -> dict:
+    """
+    依次以两种表示方式运行各规模
+    
+    每次运行使用新的进程，内存峰值互不影响。
+    
+    Args:
+        sizes: 歌曲数列表
+        seed: 随机种子
+        timeout: 单次运行的最长秒数，None 表示不限
+    
+    Returns:
+        基准结果
+    
+    Raises:
+        BenchmarkFailed: 某次运行失败或超时
+    """
+    runs = {}
+    for size in sizes:
+        print(f"[内存] {size} 首歌曲...")
+        results = {}
+        for layout in LAYOUTS:
+            try:
+                result = results[layout] = run_isolated(_run_layout, (layout, size, seed), timeout)
+            except BenchmarkFailed as e:
+                raise BenchmarkFailed(f"{size} 首歌曲 / {layout}: {e}") from None
+            print(f"       {layout:<8} 内存峰值 {result['peak_rss'] / 1024 / 1024:.1f} MB，"
+                  f"记录占用 {result['records_bytes'] / 1024 / 1024:.1f} MB"
+                  f"（每首 {result['bytes_per_song']:.0f} 字节），构造耗时 {result['seconds']:.2f}s")
+        
+        before, after = results['dict']['records_bytes'], results['records']['records_bytes']
+        reduction = 1 - after / before if before else 0.0
+        print(f"       记录占用减少 {reduction:.0%}")
+        runs[str(size)] = {**results, 'reduction': reduction}
+    
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'runs': runs,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SongMeta 内存占用基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f'测试的歌曲数（默认: {" ".join(map(str, DEFAULT_SIZES))}）')
+    parser.add_argument('-o', '--output', type=str, default=None, help='结果保存路径（JSON）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（默认: 0）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'单次运行的最长秒数，0 表示不限（默认: {DEFAULT_TIMEOUT:g}）')
+    args = parser.parse_args()
+    if any(size < 1 for size in args.sizes):
+        parser.error('--sizes 必须为正整数')
+    if args.timeout < 0:
+        parser.error('--timeout 不能为负数')
+    return args
+
+
+def main():
+    args = parse_args()
+    try:
+        results = run_memory(args.sizes, args.seed, args.timeout or None)
+    except BenchmarkFailed as e:
+        print(f"[错误] 基准测试失败: {e}")
+        sys.exit(1)
+    
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[完成] 结果已保存到: {output}")
+
+
+if __name__ == '__main__':
+    main()
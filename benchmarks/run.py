@@ -0,0 +1,290 @@
+"""
+基准测试运行器
+对不同规模的合成歌曲目录运行 cli.main，记录各阶段的耗时和内存峰值，
+结果保存为JSON，可与已有基线对比以发现性能回退
+
+用法:
+    uv run python -m benchmarks.run --sizes 100 10000 100000 --output benchmarks/baselines/local.json
+    uv run python -m benchmarks.run --sizes 100 10000 --baseline benchmarks/baselines/local.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import queue as queue_module
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.generate import generate_collection
+
+
+RESULTS_VERSION = 1
+
+# 默认规模
+DEFAULT_SIZES = (100, 10_000, 100_000)
+
+# 对比基线时的默认容差（超出基线的比例）
+DEFAULT_TOLERANCE = 0.25
+
+# 耗时差异小于该秒数时不视为回退（避免小规模测试的计时噪声）
+MIN_REGRESSION_SECONDS = 0.05
+
+# 单个规模的默认超时（秒）
+DEFAULT_TIMEOUT = 3600.0
+
+# 等待子进程结果时检查其是否仍在运行的间隔（秒）
+_POLL_SECONDS = 1.0
+
+
+class BenchmarkFailed(RuntimeError):
+    """子进程异常退出、超时或没有返回结果"""
+
+
+def run_isolated(target, args: tuple, timeout: float | None = DEFAULT_TIMEOUT) -> dict:
+    """
+    在新的 spawn 进程中运行 target(*args, queue) 并取回其放入队列的结果
+    
+    子进程崩溃（异常、被 OOM killer 终止等）时不会一直等待队列，超时时终止子进程。
+    
+    Args:
+        target: 子进程中运行的函数，最后一个参数为结果队列
+        args: 其余参数
+        timeout: 最长等待秒数，None 表示不限
+    
+    Returns:
+        子进程放入队列的结果
+    
+    Raises:
+        BenchmarkFailed: 子进程超时、没有返回结果或退出码非0
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, queue))
+    process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    
+    result = None
+    try:
+        while result is None:
+            try:
+                result = queue.get(timeout=_POLL_SECONDS)
+            except queue_module.Empty:
+                if not process.is_alive():
+                    # 子进程已退出，结果可能仍在管道中
+                    try:
+                        result = queue.get(timeout=_POLL_SECONDS)
+                    except queue_module.Empty:
+                        break
+                elif deadline is not None and time.monotonic() > deadline:
+                    raise BenchmarkFailed(f"超过 {timeout:g}s 仍未完成") from None
+    finally:
+        if process.is_alive() and result is None:
+            process.kill()
+        process.join()
+    
+    if process.exitcode != 0:
+        raise BenchmarkFailed(f"子进程异常退出（退出码 {process.exitcode}）")
+    if result is None:
+        raise BenchmarkFailed("子进程没有返回结果")
+    return result
+
+
+def _run_size(size: int, config: dict, queue) -> None:
+    """在独立进程中生成目录并运行一次 cli.main，结果放入队列"""
+    import cli
+    from benchmarks.stub_server import StubServer
+    from utils.timing import StageTimer
+    
+    with tempfile.TemporaryDirectory(prefix='songmeta-bench-') as tmp:
+        tmp = Path(tmp)
+        generate_start = time.perf_counter()
+        source = generate_collection(tmp / 'source', size, mp3_size=config['mp3_size'], seed=config['seed'])
+        generate_seconds = time.perf_counter() - generate_start
+        
+        argv = [
+            '-s', str(source),
+            '-o', str(tmp / 'output'),
+            '--cache-dir', str(tmp / 'cache'),
+            '--workers', str(config['workers']),
+            '--link-mode', config['link_mode'],
+            '--format', config['format'],
+        ]
+        if config['skip_api']:
+            argv.append('--skip-api')
+        if config['sequential']:
+            argv.append('--sequential')
+        
+        stub = StubServer(latency=config['latency'], error_rate=config['error_rate'],
+                          albums=config['albums'], seed=config['seed'])
+        timer = StageTimer(trace_memory=config['trace_memory'])
+        with stub, contextlib.redirect_stdout(io.StringIO() if config['quiet'] else sys.stdout):
+            start = time.perf_counter()
+            cli.main(argv, timer)
+            total = time.perf_counter() - start
+        
+        queue.put({
+            'songs': size,
+            'generate_seconds': generate_seconds,
+            'total_seconds': total,
+            'peak_rss': max((stage['peak_rss'] for stage in timer.stages.values()), default=0),
+            'stages': timer.stages,
+            'stub_requests': stub.requests,
+            'stub_errors': stub.errors,
+        })
+
+
+def run_benchmarks(sizes: list[int], config: dict, timeout: float | None = DEFAULT_TIMEOUT) -> dict:
+    """
+    依次运行各规模的基准测试
+    
+    每个规模在新的进程中运行，避免前一次运行的内存占用影响峰值统计。
+    
+    Args:
+        sizes: 歌曲数列表
+        config: 运行参数（见 parse_args）
+        timeout: 单个规模的最长运行秒数，None 表示不限
+    
+    Returns:
+        基准结果
+    
+    Raises:
+        BenchmarkFailed: 某个规模的运行失败或超时
+    """
+    runs = {}
+    for size in sizes:
+        print(f"[基准] {size} 首歌曲...")
+        try:
+            result = run_isolated(_run_size, (size, config), timeout)
+        except BenchmarkFailed as e:
+            raise BenchmarkFailed(f"{size} 首歌曲: {e}") from None
+        
+        runs[str(size)] = result
+        stages = ', '.join(f"{name} {stage['seconds']:.2f}s" for name, stage in result['stages'].items())
+        print(f"       总耗时 {result['total_seconds']:.2f}s，内存峰值 {result['peak_rss'] / 1024 / 1024:.1f} MB")
+        print(f"       {stages}")
+    
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'runs': runs,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    与基线对比，找出耗时或内存峰值超出容差的阶段
+    
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+        tolerance: 容差比例，如 0.25 表示超出基线25%视为回退
+    
+    Returns:
+        回退描述列表，为空表示无回退
+    """
+    regressions = []
+    for size, run in results['runs'].items():
+        base_run = baseline.get('runs', {}).get(size)
+        if base_run is None:
+            continue
+        
+        for name, stage in run['stages'].items():
+            base_stage = base_run['stages'].get(name)
+            if base_stage is None:
+                continue
+            
+            seconds, base_seconds = stage['seconds'], base_stage['seconds']
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{size} 首 / {name}: 耗时 {base_seconds:.3f}s -> {seconds:.3f}s")
+            
+            rss, base_rss = stage['peak_rss'], base_stage['peak_rss']
+            if base_rss and rss > base_rss * (1 + tolerance):
+                regressions.append(
+                    f"{size} 首 / {name}: 内存峰值 {base_rss / 1024 / 1024:.1f} MB -> {rss / 1024 / 1024:.1f} MB"
+                )
+    
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SongMeta 性能基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f'测试的歌曲数（默认: {" ".join(map(str, DEFAULT_SIZES))}）')
+    parser.add_argument('-o', '--output', type=str, default=None, help='结果保存路径（JSON）')
+    parser.add_argument('--baseline', type=str, default=None, help='对比的基线结果文件')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'判定回退的容差比例（默认: {DEFAULT_TOLERANCE}）')
+    parser.add_argument('-w', '--workers', type=int, default=8, help='cli.py 的 --workers（默认: 8）')
+    parser.add_argument('--link-mode', type=str, default='copy', help='cli.py 的 --link-mode（默认: copy）')
+    parser.add_argument('--format', type=str, default='js', help='cli.py 的 --format（默认: js）')
+    parser.add_argument('--skip-api', action='store_true', help='跳过QQ音乐查询阶段')
+    parser.add_argument('--sequential', action='store_true', help='以顺序模式运行 cli.py（默认为流水线模式）')
+    parser.add_argument('--latency', type=float, default=0.0, help='模拟服务的请求延迟，单位秒（默认: 0）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟服务的错误率（默认: 0）')
+    parser.add_argument('--albums', type=int, default=1000, help='模拟服务的专辑数（默认: 1000）')
+    parser.add_argument('--mp3-size', type=int, default=4096, help='合成MP3的字节数（默认: 4096）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（默认: 0）')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='额外使用 tracemalloc 记录Python内存分配峰值（有明显开销）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'单个规模的最长运行秒数，0 表示不限（默认: {DEFAULT_TIMEOUT:g}）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示 cli.py 的输出')
+    args = parser.parse_args()
+    if args.timeout < 0:
+        parser.error('--timeout 不能为负数')
+    return args
+
+
+def main():
+    args = parse_args()
+    config = {
+        'workers': args.workers,
+        'link_mode': args.link_mode,
+        'format': args.format,
+        'skip_api': args.skip_api,
+        'sequential': args.sequential,
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'albums': args.albums,
+        'mp3_size': args.mp3_size,
+        'seed': args.seed,
+        'trace_memory': args.trace_memory,
+        'quiet': not args.verbose,
+    }
+    
+    try:
+        results = run_benchmarks(args.sizes, config, args.timeout or None)
+    except BenchmarkFailed as e:
+        print(f"[错误] 基准测试失败: {e}")
+        sys.exit(1)
+    
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[完成] 结果已保存到: {output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[回退] 与基线 {args.baseline} 相比:")
+            for line in regressions:
+                print(f"       {line}")
+            sys.exit(1)
+        print(f"[完成] 与基线 {args.baseline} 相比无回退")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+启动时间基准
+以子进程多次运行各入口脚本，记录冷启动耗时，并通过 -X importtime 统计模块导入耗时，
+检查 --help / --skip-api 等轻量调用是否意外加载了 requests 等重量级依赖
+
+用法:
+    uv run python -m benchmarks.startup --output benchmarks/baselines/startup.json
+    uv run python -m benchmarks.startup --baseline benchmarks/baselines/startup.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.generate import generate_collection
+
+
+RESULTS_VERSION = 1
+
+# 项目根目录（入口脚本所在目录）
+ROOT = Path(__file__).resolve().parent.parent
+
+# 每个入口的默认运行次数
+DEFAULT_REPEAT = 10
+
+# 对比基线时的默认容差（超出基线的比例）
+DEFAULT_TOLERANCE = 0.25
+
+# 耗时差异小于该秒数时不视为回退（避免进程启动的计时噪声）
+MIN_REGRESSION_SECONDS = 0.01
+
+# 需要关注的重量级模块，轻量调用中出现即视为启动开销回退
+HEAVY_MODULES = ('requests', 'urllib3', 'PIL', 'multiprocessing', 'sqlite3', 'cProfile')
+
+# 导入耗时排行中输出的模块数
+TOP_IMPORTS = 10
+
+
+def entry_points(source: Path, output: Path) -> dict[str, list[str]]:
+    """返回 入口名 -> 命令行参数（相对项目根目录）"""
+    return {
+        'cli --help': ['cli.py', '--help'],
+        'cli --skip-api': ['cli.py', '-s', str(source), '-o', str(output), '--skip-api', '--full'],
+        'cover --help': ['cover.py', '--help'],
+        'catalog --help': ['catalog.py', '--help'],
+    }
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    解析 -X importtime 的输出
+    
+    Args:
+        stderr: 子进程的标准错误输出
+    
+    Returns:
+        import_us: 全部顶层导入的累计耗时（微秒）
+        modules: 导入的模块数
+        top: 累计耗时最多的顶层导入 [(模块名, 微秒)]
+        loaded: 导入的全部模块名集合
+    """
+    top_level = {}
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        module = name.strip()
+        loaded.add(module)
+        # 缩进表示嵌套导入，只累计顶层导入以避免重复计算
+        if not name[1:].startswith(' '):
+            top_level[module] = int(cumulative)
+    
+    top = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+    return {
+        'import_us': sum(top_level.values()),
+        'modules': len(loaded),
+        'top': top,
+        'loaded': loaded,
+    }
+
+
+def measure(argv: list[str], repeat: int) -> dict:
+    """
+    多次运行入口并统计启动耗时
+    
+    计时运行不带 -X importtime（其本身有开销），另运行一次用于统计导入耗时。
+    
+    Args:
+        argv: 入口脚本及参数
+        repeat: 计时运行次数
+    
+    Returns:
+        入口的统计结果
+    """
+    command = [sys.executable, *argv]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    
+    traced = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imports = parse_importtime(traced.stderr)
+    
+    return {
+        'argv': argv,
+        'first_seconds': times[0],
+        'min_seconds': min(times),
+        'median_seconds': statistics.median(times),
+        'import_seconds': imports['import_us'] / 1e6,
+        'modules': imports['modules'],
+        'top_imports': [{'module': name, 'seconds': us / 1e6} for name, us in imports['top']],
+        'heavy_modules': sorted(
+            name for name in HEAVY_MODULES
+            if name in imports['loaded']
+        ),
+    }
+
+
+def run_startup(repeat: int) -> dict:
+    """
+    运行全部入口的启动基准
+    
+    Args:
+        repeat: 每个入口的计时运行次数
+    
+    Returns:
+        基准结果
+    """
+    # 解释器本身的启动耗时，作为各入口的参照
+    interpreter = measure(['-c', 'pass'], repeat)
+    entries = {}
+    with tempfile.TemporaryDirectory(prefix='songmeta-startup-') as tmp:
+        tmp = Path(tmp)
+        source = generate_collection(tmp / 'source', 20, mp3_size=1024, seed=0)
+        for name, argv in entry_points(source, tmp / 'output').items():
+            print(f"[启动] {name}...")
+            result = measure(argv, repeat)
+            entries[name] = result
+            heavy = '、'.join(result['heavy_modules']) or '无'
+            print(f"       中位数 {result['median_seconds'] * 1000:.0f}ms"
+                  f"（解释器 {interpreter['median_seconds'] * 1000:.0f}ms），"
+                  f"导入 {result['import_seconds'] * 1000:.0f}ms / {result['modules']} 个模块，重量级模块: {heavy}")
+    
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'interpreter_seconds': interpreter['median_seconds'],
+        'entries': entries,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    与基线对比，找出启动耗时超出容差或新加载了重量级模块的入口
+    
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+        tolerance: 容差比例
+    
+    Returns:
+        回退描述列表，为空表示无回退
+    """
+    regressions = []
+    for name, entry in results['entries'].items():
+        base = baseline.get('entries', {}).get(name)
+        if base is None:
+            continue
+        
+        seconds, base_seconds = entry['median_seconds'], base['median_seconds']
+        if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{name}: 启动耗时 {base_seconds * 1000:.0f}ms -> {seconds * 1000:.0f}ms")
+        
+        added = sorted(set(entry['heavy_modules']) - set(base['heavy_modules']))
+        if added:
+            regressions.append(f"{name}: 新加载了 {'、'.join(added)}")
+    
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SongMeta 启动时间基准')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'每个入口的运行次数（默认: {DEFAULT_REPEAT}）')
+    parser.add_argument('-o', '--output', type=str, default=None, help='结果保存路径（JSON）')
+    parser.add_argument('--baseline', type=str, default=None, help='对比的基线结果文件')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'判定回退的容差比例（默认: {DEFAULT_TOLERANCE}）')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat 必须为正整数')
+    return args
+
+
+def main():
+    args = parse_args()
+    results = run_startup(args.repeat)
+    
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[完成] 结果已保存到: {output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[回退] 与基线 {args.baseline} 相比:")
+            for line in regressions:
+                print(f"       {line}")
+            sys.exit(1)
+        print(f"[完成] 与基线 {args.baseline} 相比无回退")
+
+
+if __name__ == '__main__':
+    main()
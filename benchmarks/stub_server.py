@@ -0,0 +1,230 @@
+"""
+本地QQ音乐模拟服务
+模拟 client_search_cp、fcg_play_single_song 和封面CDN，可注入延迟和错误率
+
+用法:
+    uv run python -m benchmarks.stub_server --port 18080 --latency 0.05 --error-rate 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from api.qq_music import QQMusicBase
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """请求处理器，配置从 server.stub 读取"""
+    
+    protocol_version = 'HTTP/1.1'
+    # 响应头与正文分两次写出，关闭Nagle算法避免与延迟ACK叠加产生约40ms的停顿
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        stub: StubServer = self.server.stub
+        stub.count('requests')
+        
+        if stub.latency:
+            time.sleep(stub.latency)
+        
+        status = stub.injected_error()
+        if status is not None:
+            stub.count('errors')
+            self._send(status, b'', headers={'Retry-After': '0'} if status == 429 else None)
+            return
+        
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith('/client_search_cp'):
+            self._search(stub, query.get('w', [''])[0])
+        elif url.path.endswith('/fcg_play_single_song.fcg'):
+            self._song_detail(stub, query.get('songmid', [''])[0])
+        elif url.path.startswith('/cover/'):
+            self._cover(stub, url.path.rsplit('/', 1)[-1].removesuffix('.jpg'))
+        else:
+            self._send(404, b'')
+    
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json',
+              headers: dict | None = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _search(self, stub: 'StubServer', song_name: str):
+        songs = []
+        if song_name and not stub.is_missing(song_name):
+            songs.append({
+                'name': song_name,
+                'mid': stub.song_mid(song_name),
+                'singer': [{'name': '周杰伦'}],
+                'album': {'mid': stub.album_mid(song_name)},
+            })
+        body = json.dumps({'code': 0, 'data': {'song': {'list': songs}}}, ensure_ascii=False)
+        if stub.jsonp:
+            self._send(200, f"callback({body})".encode('utf-8'), content_type='application/javascript')
+        else:
+            self._send(200, body.encode('utf-8'))
+    
+    def _song_detail(self, stub: 'StubServer', song_mid: str):
+        songs = []
+        if song_mid:
+            songs.append({
+                'name': f"歌曲{song_mid}",
+                'mid': song_mid,
+                'singer': [{'name': '周杰伦'}],
+                'album': {'mid': stub.album_mid(song_mid)},
+            })
+        self._send(200, json.dumps({'code': 0, 'data': songs}, ensure_ascii=False).encode('utf-8'))
+    
+    def _cover(self, stub: 'StubServer', album_mid: str):
+        etag = f'"{album_mid}"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'')
+            return
+        self._send(200, stub.cover_bytes(album_mid), content_type='image/jpeg', headers={'ETag': etag})
+
+
+class StubServer:
+    """
+    在后台线程运行的QQ音乐模拟服务
+    
+    歌曲按名称哈希确定性地分配专辑（albums 个专辑之间共享封面），
+    missing_ratio 比例的歌曲搜索不到；jsonp 为True时搜索接口返回 callback(...) 形式的JSONP。
+    可作为上下文管理器使用，
+    进入时启动服务并把 QQMusicBase 的端点指向本服务，退出时恢复。
+    """
+    
+    def __init__(self, port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, albums: int = 1000, missing_ratio: float = 0.0,
+                 cover_size: int = 30 * 1024, seed: int = 0, jsonp: bool = False):
+        """
+        Args:
+            port: 监听端口，0 表示随机分配
+            latency: 每个请求的固定延迟（秒）
+            error_rate: 随机返回错误状态码的比例
+            error_status: 注入的错误状态码（如 429、503）
+            albums: 专辑数量
+            missing_ratio: 搜索不到的歌曲比例
+            cover_size: 封面图片字节数
+            seed: 错误注入的随机种子
+            jsonp: 搜索接口是否返回JSONP
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.albums = max(1, albums)
+        self.missing_ratio = missing_ratio
+        self.cover_size = cover_size
+        self.jsonp = jsonp
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: threading.Thread | None = None
+        self._saved_urls: dict[str, str] = {}
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+    
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+    
+    def song_mid(self, song_name: str) -> str:
+        return f"S{self._hash(song_name):016x}"[:15]
+    
+    def album_mid(self, key: str) -> str:
+        return f"A{self._hash(key) % self.albums:08d}"
+    
+    def is_missing(self, song_name: str) -> bool:
+        return (self._hash('missing:' + song_name) % 10000) < self.missing_ratio * 10000
+    
+    def cover_bytes(self, album_mid: str) -> bytes:
+        seed = album_mid.encode('ascii')
+        return b'\xff\xd8\xff\xe0' + (seed * (self.cover_size // len(seed) + 1))[:max(0, self.cover_size - 4)]
+    
+    def injected_error(self) -> int | None:
+        """按错误率决定是否返回错误状态码"""
+        if not self.error_rate:
+            return None
+        with self._lock:
+            return self.error_status if self._rng.random() < self.error_rate else None
+    
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+    
+    def start(self) -> 'StubServer':
+        """在后台线程启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def install(self) -> None:
+        """把 QQMusicBase（同步与异步客户端共用）的端点指向本服务"""
+        self._saved_urls = {
+            name: getattr(QQMusicBase, name)
+            for name in ('SEARCH_URL', 'SONG_DETAIL_URL', 'COVER_URL')
+        }
+        QQMusicBase.SEARCH_URL = f"{self.base_url}/soso/fcgi-bin/client_search_cp"
+        QQMusicBase.SONG_DETAIL_URL = f"{self.base_url}/v8/fcg-bin/fcg_play_single_song.fcg"
+        QQMusicBase.COVER_URL = f"{self.base_url}/cover/{{album_mid}}.jpg"
+    
+    def uninstall(self) -> None:
+        """恢复 QQMusicBase 原有的端点"""
+        for name, value in self._saved_urls.items():
+            setattr(QQMusicBase, name, value)
+        self._saved_urls = {}
+    
+    def __enter__(self) -> 'StubServer':
+        self.start()
+        self.install()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地QQ音乐模拟服务')
+    parser.add_argument('--port', type=int, default=18080, help='监听端口（默认: 18080）')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的延迟，单位秒（默认: 0）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='注入错误的比例（默认: 0）')
+    parser.add_argument('--error-status', type=int, default=503, help='注入的错误状态码（默认: 503）')
+    args = parser.parse_args()
+    
+    stub = StubServer(args.port, latency=args.latency, error_rate=args.error_rate,
+                      error_status=args.error_status).start()
+    print(f"模拟服务已启动: {stub.base_url}（Ctrl+C 退出）")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+曲库导入工具 - 将本地曲库导出文件导入离线索引，供 cli.py --catalog 使用
+
+用法:
+    uv run python catalog.py <导出文件>... [--index <索引路径>] [--replace]
+
+示例:
+    uv run python catalog.py catalog.csv
+    uv run python catalog.py part1.ndjson part2.ndjson --index ./catalog.sqlite3
+    uv run python catalog.py catalog.csv --lookup 晴天 --lookup 後來
+    uv run python catalog.py --rebuild --index ./catalog.sqlite3
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from api.catalog import DEFAULT_CATALOG_PATH, CatalogIndex, NormalizerMismatch, import_catalog
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        description='曲库导入工具 - 将曲库导出文件（CSV/NDJSON）导入离线索引',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+导出文件格式:
+  CSV    需包含表头 title,artists,album_mid（多个歌手以 / 分隔）
+  NDJSON 每行一个对象 {"title": ..., "artists": [...] 或 "A / B", "album_mid": ...}
+        '''
+    )
+    
+    parser.add_argument(
+        'sources',
+        nargs='*',
+        help='曲库导出文件（.csv 按CSV读取，其他按NDJSON读取）'
+    )
+    
+    parser.add_argument(
+        '--index',
+        type=str,
+        default=str(DEFAULT_CATALOG_PATH),
+        help=f'索引文件路径（默认: {DEFAULT_CATALOG_PATH}）'
+    )
+    
+    parser.add_argument(
+        '--replace',
+        action='store_true',
+        help='清空已有索引后重新导入；默认追加，已存在的标题保持不变'
+    )
+    
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='按当前环境的标题规范化方式（是否安装 opencc）重建索引键，无需重新导入'
+    )
+    
+    parser.add_argument(
+        '--lookup',
+        action='append',
+        default=[],
+        metavar='TITLE',
+        help='导入后按歌曲名查询索引并输出结果，可重复指定'
+    )
+    
+    args = parser.parse_args()
+    if not args.sources and not args.lookup and not args.rebuild:
+        parser.error('请指定要导入的导出文件、--rebuild 或 --lookup')
+    return args
+
+
+def main():
+    args = parse_args()
+    
+    if args.rebuild and not args.sources:
+        # 导入时同样会在规范化方式变化后重建索引键
+        if not Path(args.index).is_file():
+            print(f"[错误] 曲库索引不存在: {args.index}")
+            sys.exit(1)
+        try:
+            with CatalogIndex(args.index, readonly=False) as index:
+                rebuilt, total = index.rebuilt, len(index)
+        except sqlite3.Error as e:
+            print(f"[错误] 重建索引失败: {e}")
+            sys.exit(1)
+        if rebuilt:
+            print(f"[完成] 已重建 {rebuilt} 条索引键，索引共 {total} 条")
+        else:
+            print(f"[完成] 索引键已是最新，索引共 {total} 条")
+    
+    if args.sources:
+        start = time.perf_counter()
+        try:
+            added, total = import_catalog(args.sources, args.index, replace=args.replace)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"[错误] 导入曲库失败: {e}")
+            sys.exit(1)
+        print(f"[完成] 新增 {added} 条，索引共 {total} 条，耗时 {time.perf_counter() - start:.1f}s")
+        print(f"       索引文件: {Path(args.index).resolve()}")
+    
+    if args.lookup:
+        try:
+            index = CatalogIndex(args.index)
+        except (FileNotFoundError, NormalizerMismatch) as e:
+            print(f"[错误] {e}")
+            sys.exit(1)
+        with index:
+            for title in args.lookup:
+                info = index.lookup(title)
+                if info is None:
+                    print(f"{title}: 未找到")
+                else:
+                    print(f"{title}: {info['artist'] or '未知歌手'}（专辑 {info['album_mid'] or '未知'}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,27 +3,72 @@
 
 用法:
     uv run python cli.py --source <源目录> --output <输出目录>
-    
+
 示例:
     uv run python cli.py --source D:/music/source --output ./output
 """
 
 import argparse
 import sys
+import json
+import os
+import signal
+import time
+from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.file_processor import scan_source_directory, rename_mp3_file, export_song_names
-from core.metadata_parser import extract_date_from_metadata
-from core.metadata_generator import create_song_metadata, export_to_js
-from api.qq_music import get_song_info, download_cover
-from utils.helpers import ensure_directory
+from core.file_processor import (
+    DEFAULT_BUFFER_SIZE, LINK_MODES, SHARED_LINK_MODES, scan_source_directory, stage_file_with_stats, stage_files,
+    staged_mp3_path, export_song_names,
+)
+from core.metadata_parser import PARALLEL_THRESHOLD, extract_date_from_metadata, extract_dates
+from core.metadata_generator import EXPORT_FORMATS, export_metadata, iter_song_metadata
+from core.metadata_merge import MERGE_ORDERS, merge_metadata
+from core.metadata_shards import (
+    DEFAULT_SHARD_SIZE, PRECOMPRESS_FORMATS, SHARD_INDEX_NAME, SHARD_MODES, SHARDS_DIRNAME, check_precompress,
+    export_shards,
+)
+from core.cover_variants import DEFAULT_VARIANT_FORMATS, DEFAULT_VARIANT_SIZES, VARIANT_FORMATS
+from core.id3 import song_frames, write_tags
+from core.manifest import Manifest
+from core.pipeline import Pipeline
+from core.records import Song, SongPair
+from core.watcher import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_SECONDS, DirectoryWatcher, FileSettler
+from api.defaults import COVER_STORE_MODES, DEFAULT_CACHE_DIR, DEFAULT_MAX_RETRIES, DEFAULT_TTL_DAYS
+from utils.helpers import ensure_directory, format_rate, format_size
+from utils.timing import NullTimer, StageTimer
+
+# API层（requests 及其依赖）加载较慢，仅在需要查询QQ音乐时于 main() 中导入，
+# --help 与 --skip-api 运行无需承担这部分启动开销
+if TYPE_CHECKING:
+    from api.cover_store import CoverStore
+    from api.qq_music import SongResolver
+
+
+# 处理流程的六个阶段（与进度输出 [1/6]..[6/6] 对应）
+STAGES = ('scan', 'song_names', 'stage_audio', 'metadata', 'generate', 'export')
 
+# 流水线模式下扫描、暂存、解析、查询重叠执行，计为一个阶段
+PIPELINE_STAGES = ('pipeline', 'song_names', 'generate', 'export')
 
-def parse_args():
-    """解析命令行参数"""
+# 流水线解析阶段每批最多的文件数（进程池中一批只有一次进程间往返）
+PARSE_BATCH_SIZE = 16
+
+
+def parse_args(argv: list[str] | None = None):
+    """
+    解析命令行参数
+    
+    Args:
+        argv: 参数列表，默认使用 sys.argv[1:]
+    """
     parser = argparse.ArgumentParser(
         description='音乐元数据处理器 - 处理MP3文件并生成格式化元数据',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -31,14 +76,24 @@ def parse_args():
 示例:
   uv run python cli.py --source D:/music/source --output ./output
   uv run python cli.py -s ./input -o ./output --covers ./output/covers
+  uv run python cli.py -s ./input -o ./output --workers 8
+  uv run python cli.py -s ./input1 -s ./input2 --recursive -o ./output
+  uv run python cli.py -s ./input -o ./output --refresh
         '''
     )
     
     parser.add_argument(
         '-s', '--source',
         type=str,
+        action='append',
         required=True,
-        help='源文件目录路径（包含MP3和JSON文件）'
+        help='源文件目录路径（包含MP3和JSON文件），可重复指定多个目录'
+    )
+    
+    parser.add_argument(
+        '-r', '--recursive',
+        action='store_true',
+        help='递归扫描源目录的子目录'
     )
     
     parser.add_argument(
@@ -61,119 +116,1161 @@ def parse_args():
         help='不重命名原始MP3文件，仅复制到输出目录'
     )
     
+    parser.add_argument(
+        '--link-mode',
+        choices=LINK_MODES,
+        default='copy',
+        help='音频暂存到输出目录的方式（默认: copy）；auto 依次尝试 reflink、'
+             '内核复制、硬链接、普通复制；目标已是最新时跳过'
+    )
+    
+    parser.add_argument(
+        '--copy-workers',
+        type=int,
+        default=1,
+        help='并发复制音频文件的线程数（默认: 1）'
+    )
+    
+    parser.add_argument(
+        '--copy-buffer',
+        type=int,
+        default=DEFAULT_BUFFER_SIZE // (1024 * 1024),
+        help=f'复制缓冲区大小，单位MB（默认: {DEFAULT_BUFFER_SIZE // (1024 * 1024)}）'
+    )
+    
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help='并行解析JSON元数据的进程数（默认: 0，即CPU核心数；1为顺序解析）'
+    )
+    
     parser.add_argument(
         '--skip-api',
         action='store_true',
         help='跳过QQ音乐API调用（不获取歌手信息和封面）'
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='并发查询QQ音乐/下载封面的线程数（默认: 1，即顺序处理）'
+    )
+    
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=0,
+        help='每秒最多发起的QQ音乐请求数（默认: 0，即不限速）'
+    )
+    
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f'请求遇到限流(429)、服务端错误或超时时的最大重试次数（默认: {DEFAULT_MAX_RETRIES}）'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'搜索结果缓存目录（默认: {DEFAULT_CACHE_DIR}）'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_DAYS,
+        help=f'搜索结果缓存有效期，单位天（默认: {DEFAULT_TTL_DAYS:g}）'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='忽略已有的搜索缓存，重新查询QQ音乐并更新缓存'
+    )
+    
+    parser.add_argument(
+        '--catalog',
+        type=str,
+        default=None,
+        metavar='INDEX',
+        help='离线曲库索引（由 catalog.py 导入），先按规范化标题查询歌手和专辑，未命中时才访问QQ音乐'
+    )
+    
+    parser.add_argument(
+        '--catalog-only',
+        action='store_true',
+        help='曲库未命中的歌曲不再搜索QQ音乐（封面仍按专辑下载）'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=list(EXPORT_FORMATS),
+        default='js',
+        help='元数据导出格式（默认: js）；ndjson 为每行一条JSON记录'
+    )
+    
+    parser.add_argument(
+        '--merge',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='FILE',
+        help='将本次的歌曲按标题合并到已有的元数据文件（JS/JSON/NDJSON），文件中的其他歌曲保持不变；'
+             '不指定 FILE 时合并到输出目录中的元数据文件'
+    )
+    
+    parser.add_argument(
+        '--merge-order',
+        choices=MERGE_ORDERS,
+        default='date',
+        help='合并后的排序方式（默认: date，按日期从早到晚）；date-desc 为从新到旧，title 按标题'
+    )
+    
+    parser.add_argument(
+        '--shards',
+        choices=SHARD_MODES,
+        default=None,
+        help=f'将元数据拆分为文件名带内容哈希的分片并生成索引 {SHARDS_DIRNAME}/{SHARD_INDEX_NAME}，'
+             'size 按年份分组后按固定数量、year 按发布年份拆分；不再输出单个元数据文件'
+    )
+    
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help=f'按数量分片时每个分片的最大歌曲数（默认: {DEFAULT_SHARD_SIZE}）'
+    )
+    
+    parser.add_argument(
+        '--precompress',
+        nargs='+',
+        choices=list(PRECOMPRESS_FORMATS),
+        default=[],
+        help='同时为每个分片写入预压缩文件（.gz / .br），供静态服务器直接返回；br 需要 brotli'
+    )
+    
+    parser.add_argument(
+        '--refresh-covers',
+        action='store_true',
+        help='对已存在的封面发送条件请求（ETag/Last-Modified）检查更新；默认直接跳过'
+    )
+    
+    parser.add_argument(
+        '--cover-store',
+        choices=COVER_STORE_MODES,
+        default='off',
+        help='封面存储方式（默认: off）；开启后同一专辑封面只下载一次并按内容哈希保存，'
+             'hardlink/symlink 为每首歌创建链接，reference 让元数据直接引用共享文件'
+    )
+    
+    parser.add_argument(
+        '--cover-variants',
+        action='store_true',
+        help='为封面生成网页用的缩略图和 WebP/AVIF 变体，并写入元数据的 cover_variants 字段（需要 Pillow）'
+    )
+    
+    parser.add_argument(
+        '--variant-sizes',
+        type=int,
+        nargs='+',
+        default=list(DEFAULT_VARIANT_SIZES),
+        metavar='PX',
+        help=f'封面变体的边长，单位像素（默认: {" ".join(map(str, DEFAULT_VARIANT_SIZES))}）'
+    )
+    
+    parser.add_argument(
+        '--variant-formats',
+        nargs='+',
+        choices=list(VARIANT_FORMATS),
+        default=list(DEFAULT_VARIANT_FORMATS),
+        help=f'封面变体的格式（默认: {" ".join(DEFAULT_VARIANT_FORMATS)}）'
+    )
+    
+    parser.add_argument(
+        '--variant-workers',
+        type=int,
+        default=0,
+        help='生成封面变体的进程数（默认: 0，即CPU核心数）'
+    )
+    
+    parser.add_argument(
+        '--write-tags',
+        action='store_true',
+        help='将标题、歌手、日期和封面写入输出MP3的 ID3v2 标签；复制时即预留标签空间，'
+             '之后只覆盖文件头部，不重写音频数据（不能与 hardlink/symlink 暂存同用）'
+    )
+    
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help='按顺序逐阶段执行（扫描完成后再复制，复制完成后再查询）；默认以流水线方式重叠执行'
+    )
+    
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=64,
+        help='流水线各阶段之间的队列容量（默认: 64）'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        type=str,
+        default=None,
+        help='写入JSON格式的运行指标（各阶段耗时/CPU时间、复制字节数、按端点的请求统计、缓存命中率等）'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='按阶段运行 cProfile 和 tracemalloc，并将结果写入该目录（有明显性能开销）'
+    )
+    
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='忽略输出目录中的清单，重新处理全部文件'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='处理完成后持续监视源目录（inotify，不可用时轮询），新文件写入完成后立即处理并更新元数据和歌名列表；'
+             '按 Ctrl+C 退出'
+    )
+    
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar='SECONDS',
+        help=f'无法使用 inotify 时轮询源目录的间隔秒数（默认: {DEFAULT_POLL_INTERVAL:g}）'
+    )
+    
+    parser.add_argument(
+        '--watch-settle',
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        metavar='SECONDS',
+        help=f'新文件的大小和修改时间保持不变多少秒后视为写入完成（默认: {DEFAULT_SETTLE_SECONDS:g}）'
+    )
+    
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error('--workers 必须为正整数')
+    if args.copy_workers < 1:
+        parser.error('--copy-workers 必须为正整数')
+    if args.parse_workers < 0:
+        parser.error('--parse-workers 不能为负数')
+    if args.queue_size < 1:
+        parser.error('--queue-size 必须为正整数')
+    if args.copy_buffer < 1:
+        parser.error('--copy-buffer 必须为正整数')
+    if args.rate_limit < 0:
+        parser.error('--rate-limit 不能为负数')
+    if args.max_retries < 0:
+        parser.error('--max-retries 不能为负数')
+    if args.cache_ttl < 0:
+        parser.error('--cache-ttl 不能为负数')
+    if args.catalog_only and not args.catalog:
+        parser.error('--catalog-only 需要同时指定 --catalog')
+    if args.catalog and args.skip_api:
+        parser.error('--catalog 不能与 --skip-api 同用')
+    if any(size < 1 for size in args.variant_sizes):
+        parser.error('--variant-sizes 必须为正整数')
+    if args.variant_workers < 0:
+        parser.error('--variant-workers 不能为负数')
+    if args.write_tags and args.link_mode in SHARED_LINK_MODES:
+        parser.error(f'--write-tags 会修改输出文件，不能与 --link-mode {args.link_mode} 同用')
+    if args.shard_size < 1:
+        parser.error('--shard-size 必须为正整数')
+    if args.shards and args.merge is not None:
+        parser.error('--shards 不能与 --merge 同用')
+    if args.precompress and not args.shards:
+        parser.error('--precompress 需要同时指定 --shards')
+    if args.watch_interval <= 0:
+        parser.error('--watch-interval 必须为正数')
+    if args.watch_settle < 0:
+        parser.error('--watch-settle 不能为负数')
+    if args.watch and args.profile:
+        parser.error('--watch 不能与 --profile 同用')
+    return args
+
+
+# 封面下载结果 -> 进度信息
+COVER_MESSAGES = {
+    'downloaded': "已下载封面",
+    'not_modified': "封面未变化",
+    'skipped': "封面已存在，跳过",
+    'failed': "封面下载失败",
+}
+
+
+def process_song(pair: SongPair, date: str, covers_dir: Path,
+                 resolver: 'SongResolver | None',
+                 store: 'CoverStore | None' = None) -> tuple[Song, list[str], str | None, bool]:
+    """
+    处理单首歌曲：获取歌手信息并下载封面
+    
+    可在工作线程中调用，每个线程使用各自的API实例。
+    
+    Args:
+        pair: scan_source_directory 返回的文件对
+        date: 已提取的发布日期
+        covers_dir: 封面保存目录
+        resolver: 歌曲信息解析器，为None时跳过QQ音乐API调用
+        store: 封面存储，为None时每首歌单独下载封面
+    
+    Returns:
+        (歌曲数据, 待输出的进度信息列表, 封面下载结果, 是否已查询成功)；
+        未查询或没有封面时封面下载结果为None；跳过查询或查询失败时不算查询成功，
+        清单中不记录为已查询，下次运行时重试
+    """
+    song_name = pair.song_name
+    messages = []
+    
+    # 获取QQ音乐信息
+    subtitle = ''
+    cover = None
+    status = None
+    if resolver is not None:
+        from api.qq_music import SearchFailed
+        try:
+            song_info = resolver.resolve(song_name)
+        except SearchFailed:
+            messages.append("歌曲信息查询失败，下次运行时重试")
+            return Song(title=song_name, date=date), messages, None, False
+        subtitle = song_info.get('artist', '') or ''
+        messages.append(f"歌手: {subtitle}" if subtitle else "未找到歌手信息")
+        
+        # 下载封面，直接使用已解析的封面URL，无需再次搜索
+        if song_info.get('cover_url'):
+            cover_path = covers_dir / f"{song_name}.jpg"
+            if store is not None and song_info.get('album_mid'):
+                cover, status = store.place(song_info['album_mid'], song_info['cover_url'], cover_path)
+            else:
+                from api.qq_music import get_thread_api
+                status = get_thread_api().fetch_cover(song_info['cover_url'], cover_path)
+            messages.append(COVER_MESSAGES[status])
+    
+    return Song(title=song_name, subtitle=subtitle, date=date, cover=cover), messages, status, resolver is not None
+
+
+def process_all_songs(file_pairs: list[SongPair], dates: list[str], covers_dir: Path,
+                      resolver: 'SongResolver | None', workers: int = 1,
+                      store: 'CoverStore | None' = None,
+                      cover_stats: Counter | None = None,
+                      executor: Executor | None = None) -> tuple[list[Song], list[bool]]:
+    """
+    处理所有歌曲元数据，可选使用线程池并发执行
+    
+    结果顺序与 file_pairs 保持一致，与完成顺序无关。
+    
+    Args:
+        file_pairs: 文件对列表
+        dates: 与 file_pairs 对应的发布日期
+        covers_dir: 封面保存目录
+        resolver: 歌曲信息解析器，为None时跳过QQ音乐API调用
+        workers: 并发线程数
+        store: 封面存储，为None时每首歌单独下载封面
+        cover_stats: 可选，按封面下载结果累计计数
+        executor: 可选，执行查询的常驻线程池（监视模式下复用各线程的API连接）；
+            默认按 workers 临时创建
+    
+    Returns:
+        (歌曲数据列表, 与之对应的是否已查询成功)
+    """
+    total = len(file_pairs)
+    results: list[Song | None] = [None] * total
+    resolved = [False] * total
+    
+    def report(done: int, index: int, messages: list[str], status: str | None):
+        print(f"      [{done}/{total}] {file_pairs[index].song_name}")
+        for message in messages:
+            print(f"            {message}")
+        if cover_stats is not None and status is not None:
+            cover_stats[status] += 1
+    
+    if workers <= 1 and executor is None:
+        for i, pair in enumerate(file_pairs):
+            results[i], messages, status, resolved[i] = process_song(pair, dates[i], covers_dir, resolver, store)
+            report(i + 1, i, messages, status)
+        return results, resolved
+    
+    with nullcontext(executor) if executor is not None else ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_song, pair, dates[i], covers_dir, resolver, store): i
+            for i, pair in enumerate(file_pairs)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i], messages, status, resolved[i] = future.result()
+            report(done, i, messages, status)
+    
+    return results, resolved
+
+
+# 标签写入结果 -> 进度信息
+TAG_MESSAGES = {
+    'in_place': "已写入标签",
+    'rewritten': "已写入标签（重写文件）",
+    'unsupported': "已有标签格式不支持，保留原有标签",
+    'failed': "标签写入失败",
+}
+
+
+def song_cover_path(song: Song, covers_dir: Path) -> Path:
+    """
+    歌曲封面在本地的路径
+    
+    reference 模式下封面为共享文件的网页路径，否则为按歌名保存的文件。
+    """
+    if song.cover:
+        return covers_dir / song.cover.removeprefix('/covers/')
+    return covers_dir / f"{song.title}.jpg"
+
+
+def write_song_tags(mp3_path: Path, song: Song, covers_dir: Path) -> str:
+    """
+    将歌曲信息写入暂存后的MP3标签
+    
+    Args:
+        mp3_path: 输出目录中的MP3路径
+        song: 歌曲数据（title, subtitle, date, 可选 cover）
+        covers_dir: 封面保存目录
+    
+    Returns:
+        'in_place' / 'rewritten' / 'unsupported'（见 write_tags），失败时返回 'failed'
+    """
+    try:
+        cover = song_cover_path(song, covers_dir).read_bytes()
+    except OSError:
+        cover = None
+    
+    frames = song_frames(song.title, song.subtitle, song.date, cover)
+    try:
+        status = write_tags(mp3_path, frames)
+    except OSError as e:
+        print(f"[警告] 写入标签失败 {mp3_path.name}: {e}")
+        return 'failed'
+    if status == 'unsupported':
+        print(f"[警告] 已有标签无法逐帧保留（ID3v2.2 或使用了不支持的特性），未写入标签: {mp3_path.name}")
+    return status
+
+
+def output_options(args) -> dict:
+    """
+    影响单首歌曲输出的运行选项，记录在清单中
+    
+    这些选项变化后，源文件未变化的歌曲也需要重新处理，输出才会按新的方式生成。
+    """
+    return {
+        'link_mode': args.link_mode,
+        'cover_store': args.cover_store,
+        'cover_variants': args.cover_variants,
+        'variant_sizes': sorted(args.variant_sizes),
+        'variant_formats': sorted(args.variant_formats),
+    }
+
+
+def is_pending(args, manifest: Manifest, pair: SongPair, need_api: bool, audio_dir: Path) -> bool:
+    """判断文件对是否需要处理（新增、变化，或暂存的MP3已不存在）"""
+    return (
+        args.full
+        or not manifest.is_unchanged(pair, need_api, need_tags=args.write_tags)
+        or not staged_mp3_path(pair.song_name, audio_dir).exists()
+    )
+
+
+def print_copy_result(done: int, total: int | None, pair: SongPair, result: dict) -> None:
+    """输出单个文件的暂存结果"""
+    detail = result['method']
+    if result['bytes']:
+        detail += f", {format_size(result['bytes'])}, {format_rate(result['bytes'], result['seconds'])}"
+    progress = f"{done}/{total}" if total is not None else str(done)
+    print(f"      [{progress}] {pair.original_name} -> {result['dst'].name} ({detail})")
+
+
+def run_sequential(args, source_dirs: list[Path], output_dir: Path, audio_dir: Path, covers_dir: Path,
+                   manifest: Manifest, resolver: 'SongResolver | None', store: 'CoverStore | None',
+                   timer: StageTimer, pairs: list[SongPair] | None = None, hold: frozenset[str] = frozenset(),
+                   lookup_executor: Executor | None = None) -> dict | None:
+    """
+    按顺序执行前四个阶段：扫描、导出歌名、暂存MP3、处理元数据
+    
+    Args:
+        pairs / hold / lookup_executor: 见 run_pipelined
+    
+    Returns:
+        运行结果（见 run_pipelined），未找到文件且没有需要移除的歌曲时返回None
+    """
+    # 1. 扫描源目录
+    timer.begin('scan')
+    print("[1/6] 扫描源目录...")
+    if pairs is None:
+        pairs = scan_source_directory(source_dirs, recursive=args.recursive, exclude=[output_dir, covers_dir])
+    file_pairs = list(pairs)
+    print(f"      找到 {len(file_pairs)} 个MP3文件")
+    
+    # 对比清单，仅处理新增或变化的文件
+    removed = manifest.prune(file_pairs)
+    # 源目录中的歌曲全部被删除时仍需更新清单并导出空结果
+    if not file_pairs and not removed:
+        return None
+    need_api = resolver is not None
+    pending_pairs = [
+        pair for pair in file_pairs
+        if Manifest.key(pair) not in hold and is_pending(args, manifest, pair, need_api, audio_dir)
+    ]
+    print(f"      新增或变化 {len(pending_pairs)} 个，未变化 {len(file_pairs) - len(pending_pairs)} 个"
+          f"，已移除 {len(removed)} 个")
+    
+    # 2. 提取歌名并导出
+    timer.begin('song_names')
+    print("[2/6] 提取歌曲名...")
+    song_names = [pair.song_name for pair in file_pairs]
+    songs_file = export_song_names(song_names, output_dir / 'songsname.txt')
+    print(f"      已导出歌名列表到: {songs_file}")
+    
+    # 3. 重命名并复制MP3文件
+    timer.begin('stage_audio')
+    print(f"[3/6] 重命名并暂存MP3文件（{args.link_mode}）...")
+    copy_jobs = [
+        (pair.mp3_path, staged_mp3_path(pair.song_name, audio_dir))
+        for pair in pending_pairs
+    ]
+    copied_bytes = 0
+    copy_methods = Counter()
+    copy_start = time.perf_counter()
+    results = stage_files(
+        copy_jobs, args.link_mode,
+        workers=args.copy_workers,
+        buffer_size=args.copy_buffer * 1024 * 1024,
+        reserve_tag=args.write_tags,
+    )
+    for done, result in enumerate(results, 1):
+        print_copy_result(done, len(pending_pairs), pending_pairs[result['index']], result)
+        copied_bytes += result['bytes']
+        copy_methods[result['method']] += 1
+    copy_seconds = time.perf_counter() - copy_start
+    if copied_bytes:
+        print(f"      共复制 {format_size(copied_bytes)}，耗时 {copy_seconds:.1f}s，"
+              f"平均 {format_rate(copied_bytes, copy_seconds)}")
+    
+    # 4. 处理每首歌曲元数据
+    timer.begin('metadata')
+    print("[4/6] 处理歌曲元数据...")
+    if args.workers > 1 and need_api:
+        print(f"      并发线程数: {args.workers}")
+    dates = extract_dates(
+        [pair.json_path for pair in pending_pairs],
+        workers=args.parse_workers or None,
+    )
+    dates = [date or '' for date in dates]
+    cover_stats = Counter()
+    pending_songs, resolved = process_all_songs(
+        pending_pairs, dates, covers_dir, resolver, workers=args.workers, store=store,
+        cover_stats=cover_stats, executor=lookup_executor,
+    )
+    
+    # 写入标签：只覆盖复制时预留的文件头区域，与复制共用I/O线程数
+    tag_statuses = [None] * len(pending_pairs)
+    if args.write_tags:
+        print("      写入ID3标签...")
+        with ThreadPoolExecutor(max_workers=args.copy_workers) as executor:
+            tag_statuses = list(executor.map(
+                lambda job, song: write_song_tags(job[1], song, covers_dir), copy_jobs, pending_songs,
+            ))
+    
+    return {
+        'file_pairs': file_pairs,
+        'pending_pairs': pending_pairs,
+        'pending_songs': pending_songs,
+        'resolved': resolved,
+        'removed': removed,
+        'copy': {
+            'files': len(copy_jobs),
+            'bytes': copied_bytes,
+            'seconds': copy_seconds,
+            'methods': dict(copy_methods),
+        },
+        'covers': cover_stats,
+        'tags': tag_statuses,
+    }
+
+
+@dataclass(slots=True)
+class PipelineItem:
+    """流水线中单个文件对的处理状态，由各阶段依次填写"""
+    
+    pair: SongPair
+    pending: bool
+    copy: dict | None = None
+    date: str = ''
+    fingerprints: dict | None = None
+    song: Song | None = None
+    messages: list[str] | None = None
+    cover_status: str | None = None
+    resolved: bool = False
+    tag_status: str | None = None
+
+
+def run_pipelined(args, source_dirs: list[Path], output_dir: Path, audio_dir: Path, covers_dir: Path,
+                  manifest: Manifest, resolver: 'SongResolver | None', store: 'CoverStore | None',
+                  timer: StageTimer, pairs: list[SongPair] | None = None, hold: frozenset[str] = frozenset(),
+                  lookup_executor: Executor | None = None) -> dict | None:
+    """
+    以流水线方式执行前四个阶段
+    
+    扫描到的每首歌依次经过 对比清单 -> 暂存MP3 -> 解析JSON -> 查询QQ音乐/下载封面
+    （-> 写入标签），
+    各阶段由独立的线程池处理并通过有界队列衔接，因此磁盘与网络可同时忙碌，
+    总耗时接近最慢的阶段而不是各阶段之和。结果按扫描顺序整理，与顺序执行一致。
+    
+    Args:
+        pairs: 可选，已扫描的文件对，默认扫描源目录
+        hold: 暂不处理的文件对（清单键），如监视模式下仍在写入的文件；
+            已在清单中的沿用上次结果
+        lookup_executor: 可选，执行查询的常驻线程池（监视模式下复用各线程的API连接）
+    
+    Returns:
+        运行结果，未找到文件且没有需要移除的歌曲（清单为空）时返回None:
+            file_pairs / pending_pairs / pending_songs / removed: 文件对与处理结果
+            resolved: 与 pending_pairs 对应的是否已通过QQ音乐API查询成功
+            fingerprints: 与 pending_pairs 对应的清单指纹（仅流水线模式）
+            copy: 暂存统计（files, bytes, seconds, methods）
+            covers: 按封面下载结果的计数
+            tags: 与 pending_pairs 对应的标签写入结果（未写入标签时为None）
+            pipeline: 各阶段统计（仅流水线模式）
+    """
+    need_api = resolver is not None
+    buffer_size = args.copy_buffer * 1024 * 1024
+    
+    # 与顺序执行的 extract_dates 一致，JSON 在进程池中解析（解析为纯Python代码，线程间受GIL限制）；
+    # 已知文件较少时（如监视模式下的单个新文件）直接在线程中解析，省去启动进程的开销
+    parse_workers = args.parse_workers or os.cpu_count() or 1
+    parse_pool = None
+    if parse_workers > 1 and (pairs is None or len(pairs) >= PARALLEL_THRESHOLD):
+        from concurrent.futures import ProcessPoolExecutor
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+    
+    def select(pair: SongPair) -> PipelineItem:
+        pending = Manifest.key(pair) not in hold and is_pending(args, manifest, pair, need_api, audio_dir)
+        return PipelineItem(pair, pending)
+    
+    def copy(item: PipelineItem) -> PipelineItem:
+        if item.pending:
+            pair = item.pair
+            item.copy = stage_file_with_stats(
+                pair.mp3_path, staged_mp3_path(pair.song_name, audio_dir),
+                args.link_mode, buffer_size, reserve_tag=args.write_tags,
+            )
+        return item
+    
+    def parse(batch: list[PipelineItem]) -> list[PipelineItem]:
+        pending = [item for item in batch if item.pending]
+        paths = [item.pair.json_path for item in pending if item.pair.json_path is not None]
+        if parse_pool is not None and paths:
+            # 整批作为一个任务提交，每批只有一次进程间往返
+            dates = parse_pool.map(extract_date_from_metadata, paths, chunksize=len(paths))
+        else:
+            dates = map(extract_date_from_metadata, paths)
+        for item in pending:
+            item.date = (next(dates) if item.pair.json_path is not None else None) or ''
+            # 清单指纹需要读取文件内容计算摘要，同样放在工作线程中完成
+            item.fingerprints = manifest.fingerprint(item.pair)
+        return batch
+    
+    def lookup(item: PipelineItem) -> PipelineItem:
+        if item.pending:
+            call = (process_song, item.pair, item.date, covers_dir, resolver, store)
+            if lookup_executor is not None:
+                result = lookup_executor.submit(*call).result()
+            else:
+                result = process_song(*call[1:])
+            item.song, item.messages, item.cover_status, item.resolved = result
+        return item
+    
+    def tag(item: PipelineItem) -> PipelineItem:
+        if item.pending:
+            item.tag_status = write_song_tags(item.copy['dst'], item.song, covers_dir)
+            if item.tag_status != 'failed':
+                item.messages.append(TAG_MESSAGES[item.tag_status])
+        return item
+    
+    pipeline = (
+        Pipeline(queue_size=args.queue_size)
+        .add_stage('select', select)
+        .add_stage('copy', copy, workers=args.copy_workers)
+        # 每个线程同时只等待一批解析任务，线程数即同时使用的进程数
+        .add_stage('parse', parse, workers=parse_workers, batch_size=PARSE_BATCH_SIZE)
+        .add_stage('lookup', lookup, workers=args.workers)
+    )
+    if args.write_tags:
+        # 复制时已预留标签空间，此处只覆盖文件头，与复制共用I/O线程数
+        pipeline.add_stage('tag', tag, workers=args.copy_workers)
+    
+    timer.begin('pipeline')
+    print(f"[1-4/6] 流水线处理：扫描、暂存MP3（{args.link_mode}）、解析元数据"
+          f"{'、查询QQ音乐' if need_api else ''}{'、写入标签' if args.write_tags else ''}...")
+    
+    if pairs is None:
+        pairs = scan_source_directory(source_dirs, recursive=args.recursive, exclude=[output_dir, covers_dir])
+    items: dict[int, PipelineItem] = {}
+    copy_methods = Counter()
+    cover_stats = Counter()
+    copied_bytes = 0
+    copy_seconds = 0.0
+    done = 0
+    try:
+        for index, item in pipeline.run(pairs):
+            items[index] = item
+            if not item.pending:
+                continue
+            
+            done += 1
+            result = item.copy
+            print_copy_result(done, None, item.pair, result)
+            for message in item.messages:
+                print(f"            {message}")
+            copied_bytes += result['bytes']
+            copy_seconds += result['seconds']
+            copy_methods[result['method']] += 1
+            if item.cover_status is not None:
+                cover_stats[item.cover_status] += 1
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+    
+    # 按扫描顺序整理结果
+    ordered = [items[i] for i in range(len(items))]
+    file_pairs = [item.pair for item in ordered]
+    pending = [item for item in ordered if item.pending]
+    removed = manifest.prune(file_pairs)
+    # 源目录中的歌曲全部被删除时仍需更新清单并导出空结果
+    if not file_pairs and not removed:
+        return None
+    
+    print(f"      找到 {len(file_pairs)} 个MP3文件，新增或变化 {len(pending)} 个，"
+          f"未变化 {len(file_pairs) - len(pending)} 个，已移除 {len(removed)} 个")
+    if copied_bytes:
+        print(f"      共复制 {format_size(copied_bytes)}，流水线耗时 {pipeline.wall_seconds:.1f}s")
+    stats = pipeline.stats()
+    busiest = max(stats, key=lambda name: stats[name]['utilization'])
+    print(f"      瓶颈阶段: {busiest}（线程利用率 {stats[busiest]['utilization']:.0%}）")
+    
+    timer.begin('song_names')
+    songs_file = export_song_names([pair.song_name for pair in file_pairs], output_dir / 'songsname.txt')
+    print(f"      已导出歌名列表到: {songs_file}")
+    
+    return {
+        'file_pairs': file_pairs,
+        'pending_pairs': [item.pair for item in pending],
+        'pending_songs': [item.song for item in pending],
+        'resolved': [item.resolved for item in pending],
+        'fingerprints': [item.fingerprints for item in pending],
+        'removed': removed,
+        'copy': {
+            'files': len(pending),
+            'bytes': copied_bytes,
+            'seconds': copy_seconds,
+            'methods': dict(copy_methods),
+        },
+        'covers': cover_stats,
+        'tags': [item.tag_status for item in pending],
+        'pipeline': stats,
+    }
 
 
-def main():
-    """主程序入口"""
-    args = parse_args()
+def watch_source(args, watcher: DirectoryWatcher, source_dirs: list[Path], exclude: list[Path], audio_dir: Path,
+                 manifest: Manifest, need_api: bool, run_batch: Callable[..., None]) -> None:
+    """
+    持续监视源目录，新文件写入完成后处理并重新导出结果
+    
+    每次目录变化后重新扫描并与清单对比，只处理新增或变化的文件，已有歌曲沿用清单中的结果。
+    仍在写入的文件（大小或修改时间在 --watch-settle 秒内有变化）暂缓处理，之后定时复查。
+    
+    Args:
+        args: 命令行参数
+        watcher: 在首次处理之前创建的监视器，首次处理期间的变化同样会被通知
+        source_dirs: 源目录
+        exclude: 扫描时跳过的目录（输出目录、封面目录）
+        audio_dir: 音频输出目录
+        manifest: 源文件清单（与 run_batch 共用）
+        need_api: 是否需要API查询结果
+        run_batch: 处理一次源目录并导出结果，接受 timer, pairs, hold
+    """
+    # 作为服务运行时以 SIGTERM 停止，与 Ctrl+C 一样正常退出
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    
+    settler = FileSettler(args.watch_settle)
+    # 有文件尚未写入完成时的复查间隔
+    recheck = args.watch_settle or args.watch_interval
+    
+    print("-" * 50)
+    print(f"[监视] 正在监视源目录（{watcher.backend}），按 Ctrl+C 退出...")
+    waiting = False
+    while True:
+        if not watcher.wait(recheck if waiting else None) and not waiting:
+            continue
+        
+        pairs = list(scan_source_directory(source_dirs, recursive=args.recursive, exclude=exclude))
+        ready = 0
+        hold = set()
+        for pair in pairs:
+            if not is_pending(args, manifest, pair, need_api, audio_dir):
+                continue
+            if settler.is_ready(pair):
+                ready += 1
+            else:
+                hold.add(Manifest.key(pair))
+        waiting = bool(hold)
+        
+        current = {Manifest.key(pair) for pair in pairs}
+        removed = sum(1 for key in manifest.entries if key not in current)
+        if not ready and not removed:
+            continue
+        
+        # 未写入完成的新文件暂不出现在结果中，已处理过的文件沿用上次结果
+        pairs = [
+            pair for pair in pairs
+            if Manifest.key(pair) not in hold or Manifest.key(pair) in manifest.entries
+        ]
+        print(f"[监视] {time.strftime('%H:%M:%S')} 新增或变化 {ready} 个，已移除 {removed} 个"
+              f"{f'，{len(hold)} 个仍在写入' if hold else ''}")
+        run_batch(StageTimer() if args.metrics_file else NullTimer(), pairs=pairs, hold=frozenset(hold))
+        print("[监视] 继续监视源目录...")
+
+
+def write_metrics(path: str | Path, report: dict) -> Path:
+    """
+    原子地写入运行指标（先写临时文件再替换）
+    
+    Args:
+        path: 指标文件路径
+        report: 指标数据
+    
+    Returns:
+        指标文件路径
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv: list[str] | None = None, timer: StageTimer | None = None):
+    """
+    主程序入口
+    
+    Args:
+        argv: 命令行参数列表，默认使用 sys.argv[1:]
+        timer: 可选，记录各阶段耗时和内存峰值（阶段名见 STAGES / PIPELINE_STAGES；
+            生成封面变体时另有 cover_variants 阶段）
+    """
+    args = parse_args(argv)
+    # 只有输出指标或性能分析时才记录各阶段，普通运行使用不做任何事的计时器
+    if timer is None:
+        timer = StageTimer(profile_dir=args.profile) if args.metrics_file or args.profile else NullTimer()
     
     # 解析路径
-    source_dir = Path(args.source).resolve()
+    source_dirs = [Path(source).resolve() for source in args.source]
     output_dir = Path(args.output).resolve()
     covers_dir = Path(args.covers).resolve() if args.covers else output_dir / 'covers'
     audio_dir = output_dir / 'audio'  # 音频输出目录
     
     # 验证源目录
-    if not source_dir.exists():
-        print(f"[错误] 源目录不存在: {source_dir}")
-        sys.exit(1)
+    for source_dir in source_dirs:
+        if not source_dir.is_dir():
+            print(f"[错误] 源目录不存在: {source_dir}")
+            sys.exit(1)
     
     # 创建输出目录
     ensure_directory(output_dir)
     ensure_directory(covers_dir)
     ensure_directory(audio_dir)
     
-    print(f"源目录: {source_dir}")
+    for source_dir in source_dirs:
+        print(f"源目录: {source_dir}")
     print(f"输出目录: {output_dir}")
     print(f"音频目录: {audio_dir}")
     print(f"封面目录: {covers_dir}")
+    
+    # 初始化搜索缓存，所有工作线程共享
+    cache = None
+    cover_store = None
+    transport = None
+    catalog = None
+    variants = None
+    if args.cover_variants:
+        from core.cover_variants import CoverVariants
+        try:
+            variants = CoverVariants(covers_dir, args.variant_sizes, args.variant_formats,
+                                     workers=args.variant_workers or None)
+        except RuntimeError as e:
+            print(f"[错误] {e}")
+            sys.exit(1)
+    
+    if args.precompress:
+        try:
+            check_precompress(args.precompress)
+        except RuntimeError as e:
+            print(f"[错误] {e}")
+            sys.exit(1)
+    
+    if args.catalog:
+        import sqlite3
+        from api.catalog import CatalogIndex, NormalizerMismatch
+        try:
+            catalog = CatalogIndex(Path(args.catalog).expanduser())
+        except (FileNotFoundError, NormalizerMismatch, sqlite3.Error) as e:
+            print(f"[错误] 无法打开曲库索引: {e}")
+            sys.exit(1)
+        print(f"曲库索引: {catalog.path}（{len(catalog)} 首）")
+    
+    if not args.skip_api:
+        from api.cache import SearchCache
+        from api.cover_index import CoverIndex
+        from api.cover_store import CoverStore
+        from api.qq_music import QQMusicAPI, SongResolver, configure_api
+        from api.transport import Transport
+        
+        cache = SearchCache(
+            Path(args.cache_dir).expanduser(),
+            ttl=args.cache_ttl * 86400,
+            refresh=args.refresh,
+        )
+        cover_index = CoverIndex(covers_dir)
+        # 所有工作线程共享同一传输策略，按统一的速率和并发上限发起请求
+        transport = Transport(
+            rate_limit=args.rate_limit or None,
+            max_concurrency=args.workers,
+            max_retries=args.max_retries,
+            classify=QQMusicAPI.endpoint_name,
+        )
+        configure_api(cache=cache, cover_index=cover_index, refresh_covers=args.refresh_covers,
+                      transport=transport)
+        print(f"搜索缓存: {cache.path}")
+        if args.cover_store != 'off':
+            cover_store = CoverStore(covers_dir, args.cover_store, refresh=args.refresh_covers)
+            print(f"封面存储: {cover_store.root}（{args.cover_store}）")
+    
     print("-" * 50)
     
-    # 1. 扫描源目录
-    print("[1/6] 扫描源目录...")
-    file_pairs = scan_source_directory(source_dir)
-    print(f"      找到 {len(file_pairs)} 个MP3文件")
+    manifest = Manifest.load(output_dir, output_options(args))
+    resolver = None if args.skip_api else SongResolver(catalog=catalog, fallback=not args.catalog_only)
+    runner = run_sequential if args.sequential else run_pipelined
+    need_api = resolver is not None
     
-    if not file_pairs:
-        print("[完成] 未找到符合条件的文件")
-        return
+    # 监视模式下查询在常驻线程池中执行，各线程的API实例（及连接池）在多次处理之间保持可用
+    lookup_executor = None
+    if args.watch and resolver is not None:
+        lookup_executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix='lookup')
     
-    # 2. 提取歌名并导出
-    print("[2/6] 提取歌曲名...")
-    song_names = [pair['song_name'] for pair in file_pairs]
-    songs_file = export_song_names(song_names, output_dir / 'songsname.txt')
-    print(f"      已导出歌名列表到: {songs_file}")
+    def run_batch(timer: StageTimer, **options) -> None:
+        """
+        处理一次源目录并导出结果
+        
+        Args:
+            timer: 阶段计时器
+            **options: 传给 run_sequential / run_pipelined 的 pairs, hold
+        """
+        run = runner(args, source_dirs, output_dir, audio_dir, covers_dir, manifest, resolver, cover_store, timer,
+                     lookup_executor=lookup_executor, **options)
+        if run is None:
+            print("[完成] 未找到符合条件的文件")
+            timer.finish()
+            return
+        
+        file_pairs = run['file_pairs']
+        pending_pairs = run['pending_pairs']
+        pending_songs = run['pending_songs']
+        
+        fingerprints = run.get('fingerprints') or [None] * len(pending_pairs)
+        tag_stats = Counter(status for status in run['tags'] if status is not None)
+        records = zip(pending_pairs, pending_songs, run['resolved'], fingerprints, run['tags'])
+        for pair, song, resolved, fingerprint, tag_status in records:
+            # 查询失败的歌曲不记录为已查询，下次运行时重新查询；
+            # 已有标签格式不支持的文件重试也不会成功，与写入成功同样记录
+            manifest.update(pair, song, api=resolved, fingerprints=fingerprint,
+                            tagged=tag_status in ('in_place', 'rewritten', 'unsupported'))
+        manifest.save()
+        if cache is not None:
+            cover_index.save()
+        if cover_store is not None:
+            cover_store.save()
+            # 监视模式下一次处理时重新检查各专辑封面
+            cover_store.clear()
+        
+        # 按扫描顺序合并本次处理结果与清单中的已有结果
+        processed_songs = [manifest.get_song(pair) for pair in file_pairs]
+        
+        # 封面变体按内容摘要命名，每次运行对全部封面检查，已是最新的变体直接跳过
+        if variants is not None:
+            timer.begin('cover_variants')
+            print(f"[5/6] 生成封面变体（{'/'.join(args.variant_formats)}，"
+                  f"{'/'.join(map(str, variants.sizes))}px）及元数据...")
+            cover_paths = [song_cover_path(song, covers_dir) for song in processed_songs]
+            variant_map = variants.process(cover_paths)
+            for song, cover_path in zip(processed_songs, cover_paths):
+                if cover_path in variant_map:
+                    song.cover_variants = variant_map[cover_path]
+            # 合并到已有元数据时，文件中的其他歌曲仍可能引用旧的变体，不清理
+            pruned = variants.prune() if args.merge is None else 0
+            variants.save()
+            print(f"      生成 {variants.generated} 个，已是最新 {variants.skipped} 个，失败 {variants.failed} 张"
+                  + (f"，清理过期变体 {pruned} 个" if pruned else ""))
+        
+        # 5. 生成元数据
+        # 元数据按需逐条生成，导出时边生成边写入
+        timer.begin('generate')
+        if variants is None:
+            print("[5/6] 生成元数据...")
+        metadata = iter_song_metadata(processed_songs)
+        
+        # 6. 导出
+        timer.begin('export')
+        metadata_file = output_dir / f"songs_metadata{EXPORT_FORMATS[args.format]}"
+        merge_report = None
+        shard_report = None
+        if args.shards:
+            layout = '按年份' if args.shards == 'year' else f'按年份每 {args.shard_size} 首'
+            print(f"[6/6] 导出分片结果（{args.format}，{layout}）...")
+            shard_report = export_shards(
+                metadata, output_dir / SHARDS_DIRNAME, args.format, args.shards,
+                shard_size=args.shard_size, precompress=args.precompress,
+            )
+            metadata_file = shard_report['index']
+            print(f"      {shard_report['shards']} 个分片，写入 {shard_report['written']} 个，"
+                  f"未变化 {shard_report['unchanged']} 个，删除过期文件 {shard_report['removed']} 个，"
+                  f"共 {format_size(shard_report['bytes'])}")
+            print(f"      分片索引: {metadata_file}")
+        elif args.merge is None:
+            print(f"[6/6] 导出结果（{args.format}）...")
+            metadata_file = export_metadata(metadata, metadata_file, args.format)
+            print(f"      已导出元数据到: {metadata_file}")
+        else:
+            # 指定文件时按其扩展名确定格式
+            fmt = None if args.merge else args.format
+            target = Path(args.merge).expanduser().resolve() if args.merge else metadata_file
+            print(f"[6/6] 合并结果到已有元数据（按 {args.merge_order} 排序）...")
+            try:
+                metadata_file, merge_stats, merged_total = merge_metadata(
+                    metadata, target, fmt=fmt, order=args.merge_order,
+                )
+            except (OSError, ValueError) as e:
+                print(f"[错误] 无法读取已有元数据 {target}: {e}")
+                sys.exit(1)
+            print(f"      新增 {merge_stats['added']} 首，更新 {merge_stats['updated']} 首，"
+                  f"未变化 {merge_stats['unchanged']} 首，合并后共 {merged_total} 首: {metadata_file}")
+            merge_report = {**merge_stats, 'total': merged_total}
+        timer.finish()
+        
+        print("-" * 50)
+        print(f"[完成] 成功处理 {len(processed_songs)} 首歌曲")
+        print(f"       歌名列表: {output_dir / 'songsname.txt'}")
+        print(f"       元数据文件: {metadata_file}")
+        print(f"       音频目录: {audio_dir}")
+        print(f"       封面目录: {covers_dir}")
+        
+        if resolver is not None and resolver.coalesced:
+            print(f"       查询去重: {resolver.lookups} 次搜索，合并重复歌名 {resolver.coalesced} 次")
+        
+        if catalog is not None:
+            print(f"       离线曲库: 命中 {catalog.hits} 首，未命中 {catalog.misses} 首"
+                  f"{'（未查询网络）' if args.catalog_only else ''}")
+        
+        if transport is not None and (transport.retries or transport.failures):
+            stats = transport.stats()
+            print(f"       请求重试: {stats['retries']} 次（限流 {stats['throttled']} 次），"
+                  f"最终失败 {stats['failures']} 次，结束时并发上限 {stats['concurrency']}")
+        
+        if tag_stats:
+            print(f"       ID3标签: 原位写入 {tag_stats['in_place']} 个，重写文件 {tag_stats['rewritten']} 个"
+                  f"，保留原有标签 {tag_stats['unsupported']} 个，失败 {tag_stats['failed']} 个")
+        
+        if cover_store is not None:
+            print(f"       封面存储: 下载 {cover_store.downloads} 张，复用 {cover_store.reused} 次")
+        
+        if cache is not None:
+            stats = cache.stats()
+            print(f"       搜索缓存: 命中 {stats['hits']} 次"
+                  f"（未找到 {stats['negative_hits']} 次），未命中 {stats['misses']} 次")
+        
+        if args.metrics_file:
+            report = {
+                'songs': {
+                    'total': len(file_pairs),
+                    'processed': len(pending_pairs),
+                    'removed': len(run['removed']),
+                    'without_artist': sum(1 for song in pending_songs if not song.subtitle) if need_api else 0,
+                    'lookup_failed': run['resolved'].count(False) if need_api else 0,
+                },
+                'total_seconds': timer.total_seconds,
+                'stages': timer.stages,
+                'copy': run['copy'],
+                'covers': dict(run['covers']),
+                'tags': dict(tag_stats),
+                'cover_variants': {
+                    'generated': variants.generated,
+                    'skipped': variants.skipped,
+                    'failed': variants.failed,
+                } if variants is not None else None,
+                'merge': merge_report,
+                'shards': {**shard_report, 'index': str(shard_report['index'])} if shard_report else None,
+                'requests': transport.stats() if transport is not None else None,
+                'cache': cache.stats() if cache is not None else None,
+                'resolver': {
+                    'lookups': resolver.lookups,
+                    'coalesced': resolver.coalesced,
+                    'catalog_hits': resolver.catalog_hits,
+                } if resolver else None,
+            }
+            if 'pipeline' in run:
+                report['pipeline'] = run['pipeline']
+            if cover_store is not None:
+                report['cover_store'] = {'downloads': cover_store.downloads, 'reused': cover_store.reused}
+            print(f"       运行指标: {write_metrics(args.metrics_file, report)}")
     
-    # 3. 重命名并复制MP3文件
-    print("[3/6] 重命名并复制MP3文件...")
-    for i, pair in enumerate(file_pairs, 1):
-        song_name = pair['song_name']
-        new_path = rename_mp3_file(pair['mp3_path'], song_name, audio_dir)
-        print(f"      [{i}/{len(file_pairs)}] {pair['original_name']} -> {new_path.name}")
+    # 监视模式下先开始监视再首次处理，首次处理期间写入的文件不会被遗漏
+    watcher = None
+    if args.watch:
+        watcher = DirectoryWatcher(source_dirs, recursive=args.recursive, exclude=[output_dir, covers_dir],
+                                   poll_interval=args.watch_interval)
     
-    # 4. 处理每首歌曲元数据
-    print("[4/6] 处理歌曲元数据...")
-    processed_songs = []
-    
-    for i, pair in enumerate(file_pairs, 1):
-        song_name = pair['song_name']
-        print(f"      [{i}/{len(file_pairs)}] {song_name}")
-        
-        # 提取日期
-        date = ''
-        if pair['json_path']:
-            date = extract_date_from_metadata(pair['json_path']) or ''
-        
-        # 获取QQ音乐信息
-        subtitle = ''
-        if not args.skip_api:
-            print(f"            正在获取歌手信息...")
-            song_info = get_song_info(song_name)
-            subtitle = song_info.get('artist', '') or ''
-            
-            # 下载封面
-            if song_info.get('cover_url'):
-                cover_path = covers_dir / f"{song_name}.jpg"
-                if download_cover(song_name, cover_path):
-                    print(f"            已下载封面")
-                else:
-                    print(f"            封面下载失败")
-        
-        processed_songs.append({
-            'title': song_name,
-            'subtitle': subtitle,
-            'date': date,
-        })
-    
-    # 5. 生成元数据
-    print("[5/6] 生成元数据...")
-    metadata_list = []
-    for song in processed_songs:
-        metadata = create_song_metadata(
-            title=song['title'],
-            subtitle=song['subtitle'],
-            date=song['date'],
-        )
-        metadata_list.append(metadata)
+    run_batch(timer)
     
-    # 6. 导出
-    print("[6/6] 导出结果...")
-    js_file = export_to_js(metadata_list, output_dir / 'songs_metadata.js')
-    print(f"      已导出元数据到: {js_file}")
+    if watcher is not None:
+        # --full 只作用于首次处理，之后仅处理新增或变化的文件
+        args.full = False
+        try:
+            with watcher:
+                watch_source(args, watcher, source_dirs, [output_dir, covers_dir], audio_dir, manifest,
+                             need_api, run_batch)
+        except KeyboardInterrupt:
+            print("\n[完成] 已停止监视")
+        finally:
+            if lookup_executor is not None:
+                lookup_executor.shutdown()
     
-    print("-" * 50)
-    print(f"[完成] 成功处理 {len(processed_songs)} 首歌曲")
-    print(f"       歌名列表: {output_dir / 'songsname.txt'}")
-    print(f"       元数据文件: {js_file}")
-    print(f"       音频目录: {audio_dir}")
-    print(f"       封面目录: {covers_dir}")
+    if args.profile:
+        print(f"       性能分析: {Path(args.profile).resolve()}")
+    
+    if cache is not None:
+        cache.close()
+    if catalog is not None:
+        catalog.close()
 
 
 if __name__ == '__main__':
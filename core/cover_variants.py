@@ -0,0 +1,301 @@
+"""
+封面变体模块
+将下载的封面转换为适合网页使用的缩略图及 WebP/AVIF 等格式，在进程池中并行处理
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable
+
+from core.manifest import file_fingerprint
+from core.records import CoverVariant
+
+
+# 变体格式 -> (文件扩展名, Pillow格式名)
+VARIANT_FORMATS = {
+    'jpeg': ('.jpg', 'JPEG'),
+    'webp': ('.webp', 'WEBP'),
+    'avif': ('.avif', 'AVIF'),
+}
+
+# 默认生成的边长（像素）和格式
+DEFAULT_VARIANT_SIZES = (64, 150, 300)
+DEFAULT_VARIANT_FORMATS = ('webp',)
+
+# 有损编码质量
+VARIANT_QUALITY = 80
+
+# 变体保存在封面目录下的子目录
+VARIANTS_DIRNAME = 'variants'
+
+# 变体索引格式版本（版本1只记录源封面摘要）
+INDEX_VERSION = 2
+
+
+def check_formats(formats: Iterable[str]) -> None:
+    """
+    检查 Pillow 是否可用并支持指定格式
+    
+    Args:
+        formats: 变体格式列表
+    
+    Raises:
+        RuntimeError: 未安装 Pillow 或不支持某个格式
+    """
+    # Pillow 仅在生成封面变体时导入，不影响其他运行的启动时间
+    try:
+        from PIL import features
+    except ImportError as e:
+        raise RuntimeError("生成封面变体需要 Pillow，请执行: uv pip install 'songmeta[images]'") from e
+    for fmt in formats:
+        if fmt != 'jpeg' and not features.check(fmt):
+            raise RuntimeError(f"当前 Pillow 不支持 {fmt} 编码")
+
+
+def render_variants(source: str, targets: list[tuple[int, str, str]]) -> list[int]:
+    """
+    生成单张封面的全部缺失变体（在工作进程中执行）
+    
+    源图片只解码一次；按比例缩放到不超过指定边长，不放大。
+    每个变体先写入临时文件再替换，失败时不会留下不完整的文件。
+    
+    Args:
+        source: 源封面路径
+        targets: (边长, 格式, 目标路径) 列表
+    
+    Returns:
+        与 targets 对应的变体实际宽度（源图片较小或不是正方形时小于边长）
+    """
+    from PIL import Image
+    
+    widths = []
+    with Image.open(source) as image:
+        image.load()
+        for size, fmt, dest in targets:
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+            if variant.mode not in ('RGB', 'L') and fmt == 'jpeg':
+                variant = variant.convert('RGB')
+            
+            dest = Path(dest)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+            try:
+                variant.save(tmp, VARIANT_FORMATS[fmt][1], quality=VARIANT_QUALITY)
+                os.replace(tmp, dest)
+            finally:
+                tmp.unlink(missing_ok=True)
+            widths.append(variant.width)
+    return widths
+
+
+def read_width(path: str | Path) -> int:
+    """读取已有变体的宽度（只解析文件头，不解码图片）"""
+    from PIL import Image
+    
+    with Image.open(path) as image:
+        return image.width
+
+
+class CoverVariants:
+    """
+    封面变体生成器
+    
+    变体按源封面的内容摘要命名（variants/<摘要前2位>/<摘要>_<边长>.<扩展名>），
+    已存在即视为最新，封面内容变化后自动生成新的变体；共用同一封面的歌曲只处理一次。
+    源封面的摘要按大小和修改时间缓存在索引文件中，未变化的封面无需再次读取；
+    变体的实际宽度同样记录在索引中，元数据中的 width 为实际宽度而非边长上限。
+    """
+    
+    INDEX_NAME = '.variants_index.json'
+    
+    def __init__(self, covers_dir: str | Path, sizes: Iterable[int] = DEFAULT_VARIANT_SIZES,
+                 formats: Iterable[str] = DEFAULT_VARIANT_FORMATS, workers: int | None = None):
+        """
+        Args:
+            covers_dir: 封面目录
+            sizes: 变体边长（像素）
+            formats: 变体格式，见 VARIANT_FORMATS
+            workers: 工作进程数，默认CPU核心数
+        
+        Raises:
+            RuntimeError: 未安装 Pillow 或不支持某个格式
+        """
+        self.covers_dir = Path(covers_dir)
+        self.root = self.covers_dir / VARIANTS_DIRNAME
+        self.sizes = sorted(set(sizes))
+        self.formats = list(dict.fromkeys(formats))
+        self.workers = workers
+        check_formats(self.formats)
+        
+        self.generated = 0
+        self.skipped = 0
+        self.failed = 0
+        
+        self.index_path = self.root / self.INDEX_NAME
+        # 源封面绝对路径 -> 指纹；源封面摘要 -> {边长: 实际宽度}
+        self._index: dict[str, dict] = {}
+        self._widths: dict[str, dict[str, int]] = {}
+        # 本次运行处理过的源封面及其摘要，用于 prune
+        self._used: dict[str, str] = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[警告] 封面变体索引损坏，已忽略: {e}")
+        else:
+            if data.get('version') == INDEX_VERSION:
+                self._index = data.get('covers', {})
+                self._widths = data.get('widths', {})
+            else:
+                # 版本1的索引即源封面指纹表
+                self._index = data
+    
+    def variant_path(self, digest: str, size: int, fmt: str) -> Path:
+        """按源封面摘要、边长和格式返回变体路径"""
+        return self.root / digest[:2] / f"{digest}_{size}{VARIANT_FORMATS[fmt][0]}"
+    
+    def web_path(self, path: Path, prefix: str = '/covers') -> str:
+        """变体在元数据中使用的路径"""
+        return f"{prefix}/{path.relative_to(self.covers_dir).as_posix()}"
+    
+    def _digest(self, cover: Path) -> str:
+        key = str(cover.resolve())
+        fingerprint = file_fingerprint(cover, self._index.get(key))
+        self._index[key] = fingerprint
+        self._used[key] = fingerprint['digest']
+        return fingerprint['digest']
+    
+    def _width(self, digest: str, size: int) -> int:
+        """变体的实际宽度，索引中没有记录（旧版本生成）时读取已有变体的文件头"""
+        widths = self._widths.setdefault(digest, {})
+        width = widths.get(str(size))
+        if width is None:
+            width = read_width(self.variant_path(digest, size, self.formats[0]))
+            widths[str(size)] = width
+        return width
+    
+    def process(self, covers: Iterable[Path]) -> dict[Path, tuple[CoverVariant, ...]]:
+        """
+        为封面生成缺失的变体
+        
+        Args:
+            covers: 封面路径（不存在的路径会被忽略）
+        
+        Returns:
+            封面路径 -> 变体元组（src 为网页路径），内容相同的封面共享同一元组；
+            生成失败的封面不在结果中
+        """
+        digests: dict[Path, str] = {}
+        for cover in dict.fromkeys(covers):
+            try:
+                digests[cover] = self._digest(cover)
+            except OSError:
+                continue
+        
+        # 按摘要合并内容相同的封面，只为缺失的变体提交任务
+        jobs: dict[str, tuple[Path, list]] = {}
+        for cover, digest in digests.items():
+            if digest in jobs:
+                continue
+            targets = []
+            for size in self.sizes:
+                for fmt in self.formats:
+                    path = self.variant_path(digest, size, fmt)
+                    if path.exists():
+                        self.skipped += 1
+                    else:
+                        targets.append((size, fmt, str(path)))
+            jobs[digest] = (cover, targets)
+        
+        failed = set()
+        pending = {digest: job for digest, job in jobs.items() if job[1]}
+        if pending:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(render_variants, str(cover), targets): digest
+                    for digest, (cover, targets) in pending.items()
+                }
+                for future in as_completed(futures):
+                    digest = futures[future]
+                    try:
+                        widths = future.result()
+                    except Exception as e:
+                        print(f"[警告] 生成封面变体失败 {pending[digest][0].name}: {e}")
+                        self.failed += 1
+                        failed.add(digest)
+                        continue
+                    self.generated += len(widths)
+                    recorded = self._widths.setdefault(digest, {})
+                    for (size, _, _), width in zip(pending[digest][1], widths):
+                        recorded[str(size)] = width
+        
+        shared = {}
+        for digest, (cover, _) in jobs.items():
+            if digest in failed:
+                continue
+            try:
+                shared[digest] = tuple(
+                    CoverVariant(self.web_path(self.variant_path(digest, size, fmt)), self._width(digest, size), fmt)
+                    for size in self.sizes
+                    for fmt in self.formats
+                )
+            except OSError as e:
+                print(f"[警告] 读取封面变体失败 {cover.name}: {e}")
+                self.failed += 1
+        return {cover: shared[digest] for cover, digest in digests.items() if digest in shared}
+    
+    def prune(self) -> int:
+        """
+        删除本次运行没有用到的变体文件和索引条目
+        
+        包括已删除或内容已变化的封面的变体，以及不再生成的边长/格式。
+        仅应在 process 收到了全部封面时调用：合并到已有元数据时，文件中的其他歌曲可能仍引用旧的变体。
+        
+        Returns:
+            删除的文件数
+        """
+        digests = set(self._used.values())
+        self._index = {key: value for key, value in self._index.items() if key in self._used}
+        self._widths = {digest: value for digest, value in self._widths.items() if digest in digests}
+        
+        expected = {
+            self.variant_path(digest, size, fmt)
+            for digest in digests
+            for size in self.sizes
+            for fmt in self.formats
+        }
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if path not in expected:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+            if not any(directory.iterdir()):
+                directory.rmdir()
+        return removed
+    
+    def save(self) -> Path:
+        """
+        原子地写入摘要索引（先写临时文件再替换）
+        
+        Returns:
+            索引文件路径
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        data = {'version': INDEX_VERSION, 'covers': self._index, 'widths': self._widths}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+        return self.index_path
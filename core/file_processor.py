@@ -3,78 +3,408 @@
 负责扫描源目录、重命名MP3文件、导出歌名列表
 """
 
+import errno
+import os
 import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from typing import Iterable, Iterator
 
+from core.id3 import DEFAULT_TAG_PADDING, copy_with_tag, same_audio, song_frames
+from core.records import SongPair
 from utils.helpers import extract_song_name, safe_filename
+from utils.links import is_placed, relative_symlink
 
 
-def scan_source_directory(source_dir: str | Path) -> list[dict]:
+# 音频暂存方式
+LINK_MODES = ('copy', 'hardlink', 'symlink', 'reflink', 'auto')
+
+# 分块复制的默认缓冲区大小（8 MiB），对网络存储可适当调大
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# 写入标签时不能与源文件共享数据的暂存方式
+SHARED_LINK_MODES = ('hardlink', 'symlink')
+
+# Linux FICLONE ioctl 请求码，用于在支持写时复制的文件系统上克隆文件
+FICLONE = 0x40049409
+
+
+def _scan_directory(directory: Path, exclude: set[Path]) -> tuple[list[os.DirEntry], dict, list[Path]]:
+    """
+    单次遍历目录，返回MP3条目、JSON索引和子目录
+    
+    JSON索引包含三部分（均为目录内的文件名）:
+        by_stem: 文件名主干 -> 文件名
+        by_song: 文件名中《》内的歌曲名 -> 文件名（同名时取排序靠前者）
+        names: 全部JSON文件名（按名称排序），用于包含歌曲名的模糊匹配
+    """
+    mp3_entries = []
+    json_index = {'by_stem': {}, 'by_song': {}, 'names': []}
+    subdirs = []
+    
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    
+    for entry in entries:
+        if entry.is_dir():
+            path = Path(entry.path)
+            if path.resolve() not in exclude:
+                subdirs.append(path)
+            continue
+        
+        name = entry.name
+        suffix = os.path.splitext(name)[1].lower()
+        if suffix == '.mp3':
+            mp3_entries.append(entry)
+        elif suffix == '.json':
+            json_index['by_stem'][os.path.splitext(name)[0]] = name
+            json_index['names'].append(name)
+            song_name = extract_song_name(name)
+            if song_name:
+                json_index['by_song'].setdefault(song_name, name)
+    
+    return mp3_entries, json_index, subdirs
+
+
+def _find_json(mp3_stem: str, song_name: str, json_index: dict) -> str | None:
+    """
+    按 同名主干 -> 同歌曲名（如带BW后缀） -> 文件名包含歌曲名 的顺序查找JSON，返回文件名
+    
+    最后一步与逐个检查目录内JSON的做法一致，在全部JSON中查找，
+    《》内标题与歌曲名略有不同（如带 "(Live)" 后缀）的JSON也能配对。
+    """
+    json_name = json_index['by_stem'].get(mp3_stem) or json_index['by_song'].get(song_name)
+    if json_name:
+        return json_name
+    
+    for name in json_index['names']:
+        if song_name in name:
+            return name
+    return None
+
+
+def scan_source_directory(source_dir: str | Path | Iterable[str | Path],
+                          recursive: bool = False,
+                          exclude: Iterable[str | Path] = ()) -> Iterator[SongPair]:
     """
     扫描源目录，获取MP3和对应JSON文件对
     
+    每个目录只遍历一次，并建立JSON索引进行匹配；扫描完一个目录即返回
+    该目录下的文件对，下游处理无需等待全部扫描结束。
+    同一目录下的文件对共享该目录的 Path 对象。
+    
     Args:
-        source_dir: 源文件目录路径
+        source_dir: 源文件目录路径，或多个目录组成的列表
+        recursive: 是否递归扫描子目录
+        exclude: 递归时跳过的目录（如位于源目录内的输出目录）
     
-    Returns:
-        文件对列表，每项包含 mp3_path, json_path, song_name
+    Yields:
+        文件对（SongPair），提供 mp3_path, json_path, song_name, original_name
     """
-    source_path = Path(source_dir)
-    file_pairs = []
+    if isinstance(source_dir, (str, Path)):
+        source_dir = [source_dir]
     
-    # 获取所有MP3文件
-    mp3_files = list(source_path.glob('*.mp3'))
+    excluded = {Path(p).resolve() for p in exclude}
+    pending = [Path(p) for p in source_dir]
+    seen = set()
     
-    for mp3_file in mp3_files:
-        # 提取歌曲名
-        song_name = extract_song_name(mp3_file.name)
-        if not song_name:
-            print(f"[跳过] 无法从文件名提取歌曲名: {mp3_file.name}")
+    while pending:
+        directory = pending.pop(0)
+        real_dir = directory.resolve()
+        if real_dir in seen:
             continue
+        seen.add(real_dir)
         
-        # 查找对应的JSON文件（文件名前缀相同）
-        # 文件名格式: 【星瞳】《歌名》.mp3 -> 【星瞳】《歌名》.json
-        json_name = mp3_file.stem + '.json'
-        json_path = source_path / json_name
+        mp3_entries, json_index, subdirs = _scan_directory(directory, excluded)
         
-        # 也尝试其他可能的JSON命名格式
-        if not json_path.exists():
-            # 尝试带BW后缀的格式
-            for json_file in source_path.glob('*.json'):
-                if song_name in json_file.name:
-                    json_path = json_file
-                    break
+        for entry in mp3_entries:
+            # 提取歌曲名
+            song_name = extract_song_name(entry.name)
+            if not song_name:
+                print(f"[跳过] 无法从文件名提取歌曲名: {entry.name}")
+                continue
+            
+            # 查找对应的JSON文件
+            # 文件名格式: 【星瞳】《歌名》.mp3 -> 【星瞳】《歌名》.json 或 【星瞳】《歌名》BVxxx.json
+            mp3_stem = os.path.splitext(entry.name)[0]
+            
+            yield SongPair(
+                directory=directory,
+                original_name=entry.name,
+                song_name=song_name,
+                json_name=_find_json(mp3_stem, song_name, json_index),
+            )
         
-        file_pairs.append({
-            'mp3_path': mp3_file,
-            'json_path': json_path if json_path.exists() else None,
-            'song_name': song_name,
-            'original_name': mp3_file.name
-        })
+        if recursive:
+            pending[0:0] = subdirs
+
+
+def _shares_data(src: Path, dst: Path) -> bool:
+    """目标是否与源文件（或其他文件）共用同一份数据，即为同一文件或存在其他硬链接"""
+    try:
+        return os.path.samefile(src, dst) or os.stat(dst).st_nlink > 1
+    except OSError:
+        return False
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    """通过 FICLONE 克隆文件（btrfs/XFS等），不支持时（包括 Windows 等没有 fcntl 的平台）抛出 OSError"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.ENOTSUP, "当前平台不支持 reflink") from None
+    
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _kernel_copy(src: Path, dst: Path) -> None:
+    """
+    通过 copy_file_range / sendfile 在内核中复制，不支持时抛出 OSError
+    
+    两者都返回0（未能复制任何数据）时同样抛出 OSError，由调用方改用其他方式，
+    不会留下被截断的目标文件。
+    """
+    copy = getattr(os, 'copy_file_range', None)
+    sendfile = getattr(os, 'sendfile', None)
+    if copy is None and sendfile is None:
+        raise OSError(errno.ENOTSUP, "当前平台不支持内核复制")
+    
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while remaining > 0:
+            if copy is not None:
+                try:
+                    sent = copy(fsrc.fileno(), fdst.fileno(), remaining)
+                except OSError:
+                    # 部分文件系统不支持 copy_file_range，改用 sendfile
+                    if offset or sendfile is None:
+                        raise
+                    sent = 0
+                if sent == 0 and offset == 0 and sendfile is not None:
+                    # 部分文件系统（如 procfs、部分网络文件系统）的 copy_file_range 直接返回0
+                    copy = None
+                    continue
+            else:
+                sent = sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+            if sent == 0:
+                raise OSError(errno.EIO, f"内核复制中断，已复制 {offset} 字节，剩余 {remaining} 字节")
+            offset += sent
+            remaining -= sent
+    shutil.copystat(src, dst)
+
+
+def _reflink_with_stat(src: Path, dst: Path) -> None:
+    """克隆文件并保留修改时间等元数据"""
+    _reflink(src, dst)
+    shutil.copystat(src, dst)
+
+
+def chunked_copy(src: str | Path, dst: str | Path, buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """
+    使用大缓冲区分块复制文件，并保留修改时间等元数据
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+        buffer_size: 每次读写的字节数
+    
+    Returns:
+        复制的字节数
+    """
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    copied = 0
+    
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        while n := fsrc.readinto(buffer):
+            written = 0
+            while written < n:
+                written += fdst.write(view[written:n])
+            copied += n
+    
+    shutil.copystat(src, dst)
+    return copied
+
+
+def _stage_strategies(link_mode: str, buffer_size: int, tag_title: str | None = None) -> list:
+    """返回指定暂存方式依次尝试的 (名称, 实现) 列表"""
+    if tag_title is not None:
+        # 复制时在头部写入标题并预留填充，之后的完整标签可原位写入
+        tag_copy = partial(copy_with_tag, frames=song_frames(title=tag_title),
+                           padding=DEFAULT_TAG_PADDING, buffer_size=buffer_size)
+        return [('tag_copy', tag_copy)]
     
-    return file_pairs
+    copy = partial(chunked_copy, buffer_size=buffer_size)
+    strategies = {
+        'copy': [('copy', copy)],
+        'hardlink': [('hardlink', os.link)],
+        'symlink': [('symlink', relative_symlink)],
+        'reflink': [('reflink', _reflink_with_stat)],
+        'auto': [
+            ('reflink', _reflink_with_stat),
+            ('kernel_copy', _kernel_copy),
+            ('hardlink', os.link),
+            ('copy', copy),
+        ],
+    }
+    return strategies[link_mode]
 
 
-def rename_mp3_file(mp3_path: Path, song_name: str, output_dir: Path | None = None) -> Path:
+def stage_file(src: str | Path, dst: str | Path, link_mode: str = 'copy',
+               buffer_size: int = DEFAULT_BUFFER_SIZE, reserve_tag: bool = False) -> str:
+    """
+    将源文件暂存到目标路径
+    
+    目标已存在且内容一致时直接跳过。先写入同目录下的临时文件再替换，
+    失败时不会留下不完整的目标文件。
+    
+    reserve_tag 为True时，复制的同时在文件头写入 ID3v2 标签（标题取目标文件名）
+    并预留填充空间，之后写入完整标签只需覆盖文件头部，无需再次重写音频数据。
+    此时只比较标签之外的音频数据，已一致的目标同样跳过；但目标与源文件为同一文件
+    或带有其他硬链接（如之前以 hardlink 暂存）时总是重新复制，以免写入标签时改动源文件。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+        link_mode: copy / hardlink / symlink / reflink / auto
+            auto 依次尝试 reflink、copy_file_range/sendfile、硬链接、普通复制
+        buffer_size: 普通复制时使用的缓冲区大小
+        reserve_tag: 是否在复制时写入标签并预留填充（不能与 hardlink/symlink 同用）
+    
+    Returns:
+        实际使用的方式（写入标签时为 'tag_copy'），目标已是最新时返回 'skipped'
+    
+    Raises:
+        ValueError: link_mode 无效，或 reserve_tag 与共享源文件的暂存方式同用
+        OSError: 指定方式（非auto）不可用或复制失败
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"无效的暂存方式: {link_mode}")
+    if reserve_tag and link_mode in SHARED_LINK_MODES:
+        raise ValueError(f"写入标签会修改源文件，不能使用 {link_mode} 暂存")
+    
+    src = Path(src)
+    dst = Path(dst)
+    
+    # 仅当已有目标的形式（符号链接与否、链接目标）也符合要求时才跳过
+    if reserve_tag:
+        # 之前以 hardlink 暂存的目标与源文件是同一文件，原位写入标签会改动源文件，需重新复制
+        up_to_date = (dst.exists() and not dst.is_symlink()
+                      and not _shares_data(src, dst) and same_audio(src, dst))
+    else:
+        up_to_date = is_placed(src, dst, link_mode)
+    if up_to_date:
+        return 'skipped'
+    
+    # 临时文件名唯一，避免并发暂存同名目标时互相覆盖
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    strategies = _stage_strategies(link_mode, buffer_size, dst.stem if reserve_tag else None)
+    
+    for i, (name, strategy) in enumerate(strategies):
+        tmp.unlink(missing_ok=True)
+        try:
+            strategy(src, tmp)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            if i == len(strategies) - 1:
+                raise
+            continue
+        os.replace(tmp, dst)
+        return name
+    
+    raise OSError(f"无法暂存文件: {src}")
+
+
+def stage_file_with_stats(src: Path, dst: Path, link_mode: str = 'copy',
+                          buffer_size: int = DEFAULT_BUFFER_SIZE, reserve_tag: bool = False) -> dict:
+    """
+    暂存单个文件并记录写入量和耗时
+    
+    Returns:
+        结果字典: src, dst, method, bytes, seconds
+        （bytes 为实际写入的数据量，链接或跳过时为0）
+    """
+    start = time.perf_counter()
+    method = stage_file(src, dst, link_mode, buffer_size, reserve_tag)
+    if method in ('copy', 'kernel_copy'):
+        copied = os.stat(src).st_size
+    elif method == 'tag_copy':
+        copied = os.stat(dst).st_size
+    else:
+        copied = 0
+    return {
+        'src': src,
+        'dst': dst,
+        'method': method,
+        'bytes': copied,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def stage_files(jobs: list[tuple[Path, Path]], link_mode: str = 'copy', workers: int = 1,
+                buffer_size: int = DEFAULT_BUFFER_SIZE, reserve_tag: bool = False) -> Iterator[dict]:
+    """
+    并发暂存多个文件，按完成顺序逐个返回结果
+    
+    复制以I/O为主，多线程可同时占用多个磁盘/网络请求，适合跨文件系统或NAS。
+    
+    Args:
+        jobs: (源路径, 目标路径) 列表
+        link_mode: 暂存方式，见 stage_file
+        workers: 并发I/O线程数
+        buffer_size: 普通复制时使用的缓冲区大小
+        reserve_tag: 是否在复制时写入标签并预留填充，见 stage_file
+    
+    Yields:
+        每个文件的结果字典: index, src, dst, method, bytes, seconds
+        （bytes 为实际写入的数据量，链接或跳过时为0）
+    """
+    def run(index: int, src: Path, dst: Path) -> dict:
+        return {'index': index, **stage_file_with_stats(src, dst, link_mode, buffer_size, reserve_tag)}
+    
+    if workers <= 1:
+        for i, (src, dst) in enumerate(jobs):
+            yield run(i, Path(src), Path(dst))
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run, i, Path(src), Path(dst))
+            for i, (src, dst) in enumerate(jobs)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def staged_mp3_path(song_name: str, output_dir: Path) -> Path:
+    """返回歌曲暂存到输出目录后的MP3路径"""
+    return output_dir / f"{safe_filename(song_name)}.mp3"
+
+
+def rename_mp3_file(mp3_path: Path, song_name: str, output_dir: Path | None = None,
+                    link_mode: str = 'copy') -> Path:
     """
     重命名MP3文件，使用提取的歌曲名
     
     Args:
         mp3_path: 原始MP3文件路径
         song_name: 新的歌曲名
-        output_dir: 可选，输出目录（若指定则复制而非重命名）
+        output_dir: 可选，输出目录（若指定则暂存到该目录而非重命名）
+        link_mode: 暂存到输出目录的方式，见 stage_file
     
     Returns:
         新文件路径
     """
-    safe_name = safe_filename(song_name)
-    new_filename = f"{safe_name}.mp3"
-    
     if output_dir:
-        new_path = output_dir / new_filename
-        shutil.copy2(mp3_path, new_path)
+        new_path = staged_mp3_path(song_name, output_dir)
+        stage_file(mp3_path, new_path, link_mode)
     else:
-        new_path = mp3_path.parent / new_filename
+        new_path = staged_mp3_path(song_name, mp3_path.parent)
         mp3_path.rename(new_path)
     
     return new_path
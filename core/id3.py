@@ -0,0 +1,320 @@
+"""
+ID3v2 标签模块
+为MP3写入 ID3v2.4 标签（标题、歌手、日期、封面），尽量只改写文件头部的标签区域，
+不重写音频数据
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+
+# 暂存时为标签预留的填充空间，足以容纳常见的300x300封面，
+# 之后写入标签时可直接覆盖该区域
+DEFAULT_TAG_PADDING = 128 * 1024
+
+# 由本模块写入、会被替换的帧
+MANAGED_FRAMES = ('TIT2', 'TPE1', 'TDRC', 'APIC')
+
+# ID3v2.3 中已在 v2.4 废弃的日期类帧，转换时丢弃（由 TDRC 取代）
+_OBSOLETE_FRAMES = frozenset({'TYER', 'TDAT', 'TIME', 'TRDA', 'TORY', 'TSIZ'})
+
+_HEADER_SIZE = 10
+_FLAG_UNSYNC = 0x80
+_FLAG_EXTENDED = 0x40
+_FLAG_FOOTER = 0x10
+
+# 帧标志中表示压缩/加密/分组等需要特殊处理的位（v2.3 与 v2.4 位置不同）
+_FRAME_FORMAT_FLAGS = {3: 0x00E0, 4: 0x004F}
+
+
+class ID3Tag(NamedTuple):
+    """已有标签的信息"""
+    version: int
+    # 标签总字节数（含头部、填充和尾部），即音频数据的起始偏移
+    size: int
+    # (帧ID, 帧内容) 列表；无法安全保留时为None
+    frames: list[tuple[str, bytes]] | None
+
+
+def _synchsafe(value: int) -> bytes:
+    return bytes(((value >> shift) & 0x7F) for shift in (21, 14, 7, 0))
+
+
+def _unsynchsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _parse_frames(data: bytes, version: int) -> list[tuple[str, bytes]] | None:
+    """解析标签中的帧，遇到无法原样保留的帧格式时返回None"""
+    frames = []
+    pos = 0
+    while pos + _HEADER_SIZE <= len(data):
+        frame_id = data[pos:pos + 4]
+        if frame_id[0] == 0:
+            break  # 进入填充区
+        if not frame_id.isalnum():
+            return None
+        
+        raw_size = data[pos + 4:pos + 8]
+        size = _unsynchsafe(raw_size) if version == 4 else int.from_bytes(raw_size, 'big')
+        flags = int.from_bytes(data[pos + 8:pos + 10], 'big')
+        body = data[pos + _HEADER_SIZE:pos + _HEADER_SIZE + size]
+        if len(body) != size or flags & _FRAME_FORMAT_FLAGS[version]:
+            return None
+        
+        frames.append((frame_id.decode('ascii'), body))
+        pos += _HEADER_SIZE + size
+    return frames
+
+
+def read_tag(f: BinaryIO) -> ID3Tag | None:
+    """
+    读取文件开头的 ID3v2 标签
+    
+    Args:
+        f: 以二进制模式打开、位于文件开头的文件对象
+    
+    Returns:
+        标签信息，没有标签时返回None
+    """
+    header = f.read(_HEADER_SIZE)
+    if len(header) < _HEADER_SIZE or not header.startswith(b'ID3') or header[3] not in (2, 3, 4):
+        return None
+    
+    version, flags = header[3], header[5]
+    body_size = _unsynchsafe(header[6:10])
+    size = _HEADER_SIZE + body_size + (_HEADER_SIZE if version == 4 and flags & _FLAG_FOOTER else 0)
+    
+    frames = None
+    if version in (3, 4) and not flags & (_FLAG_UNSYNC | _FLAG_EXTENDED):
+        frames = _parse_frames(f.read(body_size), version)
+        if frames is not None and version == 3:
+            frames = [(frame_id, body) for frame_id, body in frames if frame_id not in _OBSOLETE_FRAMES]
+    
+    return ID3Tag(version, size, frames)
+
+
+def _audio_range(f: BinaryIO) -> tuple[int, int]:
+    """返回文件中音频数据的 (起始偏移, 字节数)"""
+    tag = read_tag(f)
+    offset = tag.size if tag else 0
+    return offset, os.fstat(f.fileno()).st_size - offset
+
+
+def same_audio(src: str | Path, dst: str | Path) -> bool:
+    """
+    判断两个MP3除 ID3v2 标签外的音频数据是否一致
+    
+    先比较音频数据长度，一致时才计算摘要。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+    
+    Returns:
+        音频数据是否一致
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'rb') as fdst:
+            src_offset, src_size = _audio_range(fsrc)
+            dst_offset, dst_size = _audio_range(fdst)
+            if src_size != dst_size:
+                return False
+            
+            digests = []
+            for f, offset in ((fsrc, src_offset), (fdst, dst_offset)):
+                f.seek(offset)
+                digests.append(hashlib.file_digest(f, 'sha256').digest())
+            return digests[0] == digests[1]
+    except OSError:
+        return False
+
+
+def text_frame(text: str) -> bytes:
+    """UTF-8 编码的文本帧内容"""
+    return b'\x03' + text.encode('utf-8')
+
+
+def picture_frame(data: bytes) -> bytes:
+    """封面图片（APIC，类型为封面正面）帧内容"""
+    mime = b'image/png' if data.startswith(b'\x89PNG') else b'image/jpeg'
+    return b'\x03' + mime + b'\x00' + b'\x03' + b'\x00' + data
+
+
+def song_frames(title: str | None = None, artist: str | None = None,
+                date: str | None = None, cover: bytes | None = None) -> dict[str, bytes]:
+    """
+    根据歌曲信息构造帧，空值对应的帧不写入
+    
+    Args:
+        title: 标题（TIT2）
+        artist: 歌手（TPE1）
+        date: 发布日期，如 2025-01-25（TDRC）
+        cover: 封面图片数据（APIC）
+    
+    Returns:
+        帧ID -> 帧内容
+    """
+    frames = {}
+    if title:
+        frames['TIT2'] = text_frame(title)
+    if artist:
+        frames['TPE1'] = text_frame(artist)
+    if date:
+        frames['TDRC'] = text_frame(date)
+    if cover:
+        frames['APIC'] = picture_frame(cover)
+    return frames
+
+
+def _merge_frames(existing: list[tuple[str, bytes]] | None, frames: dict[str, bytes]) -> list[tuple[str, bytes]]:
+    """保留已有帧中不由本次写入替换的部分，再追加新帧"""
+    kept = [(frame_id, body) for frame_id, body in existing or [] if frame_id not in frames]
+    return kept + list(frames.items())
+
+
+def build_tag(frames: list[tuple[str, bytes]], size: int | None = None, padding: int = 0) -> bytes:
+    """
+    生成 ID3v2.4 标签
+    
+    Args:
+        frames: (帧ID, 帧内容) 列表
+        size: 可选，标签总字节数（不足部分以填充补齐），用于原位覆盖已有标签
+        padding: 未指定 size 时追加的填充字节数
+    
+    Returns:
+        标签字节串
+    
+    Raises:
+        ValueError: 帧内容超出指定的 size
+    """
+    body = b''.join(
+        frame_id.encode('ascii') + _synchsafe(len(data)) + b'\x00\x00' + data
+        for frame_id, data in frames
+    )
+    if size is None:
+        size = _HEADER_SIZE + len(body) + padding
+    if _HEADER_SIZE + len(body) > size:
+        raise ValueError("标签内容超出可用空间")
+    
+    body += b'\x00' * (size - _HEADER_SIZE - len(body))
+    return b'ID3\x04\x00\x00' + _synchsafe(len(body)) + body
+
+
+def _copy_range(fsrc: BinaryIO, fdst: BinaryIO, offset: int, buffer_size: int) -> int:
+    """
+    把源文件从 offset 开始的内容追加到目标文件，优先在内核中复制
+    
+    copy_file_range 不可用或首次调用即返回0（部分文件系统如此）时改用普通读写；
+    已复制部分数据后不再有进展时抛出 OSError，不会返回被截断的结果。
+    """
+    remaining = os.fstat(fsrc.fileno()).st_size - offset
+    copied = 0
+    fdst.flush()
+    
+    copy = getattr(os, 'copy_file_range', None)
+    if copy is not None:
+        try:
+            while remaining > 0:
+                sent = copy(fsrc.fileno(), fdst.fileno(), remaining, offset + copied)
+                if sent == 0:
+                    if copied:
+                        raise OSError(errno.EIO, f"内核复制中断，已复制 {copied} 字节，剩余 {remaining} 字节")
+                    break
+                copied += sent
+                remaining -= sent
+        except OSError:
+            if copied:
+                raise
+        if remaining <= 0:
+            return copied
+    
+    fsrc.seek(offset)
+    fdst.seek(0, os.SEEK_END)
+    while remaining > 0 and (chunk := fsrc.read(min(buffer_size, remaining))):
+        fdst.write(chunk)
+        copied += len(chunk)
+        remaining -= len(chunk)
+    return copied
+
+
+def copy_with_tag(src: str | Path, dst: str | Path, frames: dict[str, bytes] | None = None,
+                  padding: int = DEFAULT_TAG_PADDING, buffer_size: int = 8 * 1024 * 1024) -> int:
+    """
+    复制MP3，同时在头部写入新标签并预留填充空间
+    
+    源文件已有的标签帧会被保留（frames 中的同名帧除外），音频数据原样复制，
+    因此复制的开销与普通复制相同，之后 write_tags() 可直接在填充区内原位写入。
+    已有标签无法逐帧保留时（ID3v2.2、非同步化、扩展头部等），整个文件原样复制，不写入新帧。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+        frames: 要写入的帧
+        padding: 预留的填充字节数
+        buffer_size: 不支持内核复制时使用的缓冲区大小
+    
+    Returns:
+        写入目标文件的字节数
+    """
+    with open(src, 'rb') as fsrc:
+        tag = read_tag(fsrc)
+        if tag is not None and tag.frames is None:
+            tag_bytes = b''
+            offset = 0
+        else:
+            tag_bytes = build_tag(_merge_frames(tag.frames if tag else None, frames or {}), padding=padding)
+            offset = tag.size if tag else 0
+        
+        with open(dst, 'wb') as fdst:
+            fdst.write(tag_bytes)
+            copied = _copy_range(fsrc, fdst, offset, buffer_size)
+    
+    shutil.copystat(src, dst)
+    return len(tag_bytes) + copied
+
+
+def write_tags(path: str | Path, frames: dict[str, bytes], padding: int = DEFAULT_TAG_PADDING) -> str:
+    """
+    写入或更新MP3的 ID3v2 标签
+    
+    已有标签（含填充）足以容纳新内容时，只覆盖文件头部的标签区域；
+    否则重写整个文件并预留新的填充空间。
+    已有标签无法逐帧保留时（ID3v2.2、非同步化、扩展头部等）不修改文件，以免丢失其中的帧。
+    
+    Args:
+        path: MP3文件路径
+        frames: 要写入的帧，同名帧会被替换
+        padding: 需要重写文件时预留的填充字节数
+    
+    Returns:
+        'in_place'（原位写入）、'rewritten'（重写了文件）或 'unsupported'（未修改）
+    """
+    path = Path(path)
+    with open(path, 'r+b') as f:
+        tag = read_tag(f)
+        if tag is not None and tag.frames is None:
+            return 'unsupported'
+        if tag is not None:
+            merged = _merge_frames(tag.frames, frames)
+            try:
+                data = build_tag(merged, size=tag.size)
+            except ValueError:
+                pass
+            else:
+                f.seek(0)
+                f.write(data)
+                return 'in_place'
+    
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        copy_with_tag(path, tmp, frames, padding=padding)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return 'rewritten'
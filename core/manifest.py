@@ -0,0 +1,256 @@
+"""
+源文件清单模块
+记录每个源MP3/JSON的大小、修改时间、内容摘要及解析结果，用于增量处理
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from core.records import Song, SongPair
+from utils.helpers import file_digest
+
+
+# 清单文件名（保存在输出目录下）
+MANIFEST_NAME = '.songmeta_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_fingerprint(path: str | Path, previous: dict | None = None) -> dict:
+    """
+    获取文件指纹（大小、修改时间、内容摘要）
+    
+    若大小和修改时间与上次记录一致，直接复用上次的摘要，不再读取文件内容。
+    
+    Args:
+        path: 文件路径
+        previous: 上次记录的指纹
+    
+    Returns:
+        包含 size, mtime_ns, digest 的字典
+    """
+    st = os.stat(path)
+    if previous and previous.get('size') == st.st_size and previous.get('mtime_ns') == st.st_mtime_ns:
+        return dict(previous)
+    
+    return {
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'digest': file_digest(path),
+    }
+
+
+def options_digest(options: dict | None) -> str | None:
+    """
+    影响输出的运行选项的摘要（与键顺序无关）
+    
+    Args:
+        options: 选项名 -> 值（可JSON序列化）
+    
+    Returns:
+        16位十六进制摘要，未指定选项时为None
+    """
+    if options is None:
+        return None
+    data = json.dumps(options, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _stat_matches(path: Path | None, recorded: dict | None) -> bool:
+    """判断文件的大小和修改时间是否与记录一致"""
+    if path is None or recorded is None:
+        return path is None and recorded is None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return st.st_size == recorded.get('size') and st.st_mtime_ns == recorded.get('mtime_ns')
+
+
+def _content_matches(path: Path | None, recorded: dict | None) -> bool:
+    """大小或修改时间变化时，通过内容摘要判断文件是否真正改变"""
+    if path is None or recorded is None:
+        return path is None and recorded is None
+    try:
+        return os.stat(path).st_size == recorded.get('size') and file_digest(path) == recorded.get('digest')
+    except OSError:
+        return False
+
+
+class Manifest:
+    """
+    源文件清单
+    
+    以源MP3的绝对路径为键，每项记录:
+        mp3 / json: 源文件指纹
+        json_path: 对应的JSON文件路径
+        song: 解析结果（title, subtitle, date）
+        api: 是否已通过QQ音乐API查询
+        tagged: 输出MP3是否已写入 ID3 标签
+        options: 处理时影响输出的运行选项的摘要（见 options_digest）
+    """
+    
+    def __init__(self, path: str | Path, entries: dict[str, dict] | None = None,
+                 options: dict | None = None):
+        """
+        Args:
+            path: 清单文件路径
+            entries: 已有条目
+            options: 本次运行影响输出的选项（如音频暂存方式、封面存储模式），
+                     与条目记录的不一致时该条目需要重新处理
+        """
+        self.path = Path(path)
+        self.entries: dict[str, dict] = entries or {}
+        self.options = options_digest(options)
+    
+    @classmethod
+    def load(cls, output_dir: str | Path, options: dict | None = None) -> 'Manifest':
+        """
+        从输出目录加载清单，文件不存在或格式不兼容时返回空清单
+        
+        Args:
+            output_dir: 输出目录
+            options: 本次运行影响输出的选项，见 __init__
+        
+        Returns:
+            Manifest 实例
+        """
+        path = Path(output_dir) / MANIFEST_NAME
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path, options=options)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[警告] 清单文件损坏，将重新处理全部文件: {e}")
+            return cls(path, options=options)
+        
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path, options=options)
+        return cls(path, data.get('entries', {}), options=options)
+    
+    @staticmethod
+    def key(pair: SongPair) -> str:
+        """文件对在清单中的键"""
+        return str(pair.mp3_path.resolve())
+    
+    def is_unchanged(self, pair: SongPair, need_api: bool, need_tags: bool = False) -> bool:
+        """
+        判断文件对自上次处理后是否未发生变化
+        
+        大小和修改时间一致视为未变化；否则比较内容摘要，
+        摘要一致（如仅被touch）时更新记录的修改时间。
+        影响输出的运行选项与上次处理时不同（包括未记录选项的旧条目）时视为变化。
+        
+        Args:
+            pair: scan_source_directory 返回的文件对
+            need_api: 本次运行是否需要API查询结果
+            need_tags: 本次运行是否需要输出MP3带有标签
+        
+        Returns:
+            是否可以直接复用清单中的结果
+        """
+        entry = self.entries.get(self.key(pair))
+        if entry is None:
+            return False
+        if need_api and not entry.get('api'):
+            return False
+        if need_tags and not entry.get('tagged'):
+            return False
+        if entry.get('options') != self.options:
+            return False
+        
+        json_path = pair.json_path
+        recorded_json = Path(entry['json_path']) if entry.get('json_path') else None
+        if json_path != recorded_json:
+            return False
+        
+        for path, field in ((pair.mp3_path, 'mp3'), (json_path, 'json')):
+            recorded = entry.get(field)
+            if _stat_matches(path, recorded):
+                continue
+            if not _content_matches(path, recorded):
+                return False
+            entry[field] = file_fingerprint(path)
+        
+        return True
+    
+    def get_song(self, pair: SongPair) -> Song:
+        """获取清单中记录的解析结果"""
+        return Song.from_dict(self.entries[self.key(pair)]['song'])
+    
+    def fingerprint(self, pair: SongPair) -> dict:
+        """
+        计算文件对的指纹（可在工作线程中提前计算，再传给 update）
+        
+        Args:
+            pair: 文件对
+        
+        Returns:
+            包含 mp3, json 指纹的字典（无JSON时 json 为None）
+        """
+        previous = self.entries.get(self.key(pair), {})
+        json_path = pair.json_path
+        return {
+            'mp3': file_fingerprint(pair.mp3_path, previous.get('mp3')),
+            'json': file_fingerprint(json_path, previous.get('json')) if json_path else None,
+        }
+    
+    def update(self, pair: SongPair, song: Song, api: bool, fingerprints: dict | None = None,
+               tagged: bool = False) -> None:
+        """
+        记录文件对的最新指纹和解析结果
+        
+        Args:
+            pair: 文件对
+            song: 解析结果（title, subtitle, date）
+            api: 是否已通过QQ音乐API查询
+            fingerprints: 可选，fingerprint() 的结果，默认在此计算
+            tagged: 输出MP3是否已写入标签
+        """
+        if fingerprints is None:
+            fingerprints = self.fingerprint(pair)
+        json_path = pair.json_path
+        
+        self.entries[self.key(pair)] = {
+            'song_name': pair.song_name,
+            'mp3': fingerprints['mp3'],
+            'json_path': str(json_path) if json_path else None,
+            'json': fingerprints['json'],
+            'song': song.to_dict(),
+            'api': api,
+            'tagged': tagged,
+            'options': self.options,
+        }
+    
+    def prune(self, pairs: list[SongPair]) -> list[str]:
+        """
+        删除源目录中已不存在的条目
+        
+        Args:
+            pairs: 本次扫描到的全部文件对
+        
+        Returns:
+            被删除条目的歌曲名列表
+        """
+        current = {self.key(pair) for pair in pairs}
+        removed = [key for key in self.entries if key not in current]
+        return [self.entries.pop(key)['song_name'] for key in removed]
+    
+    def save(self) -> Path:
+        """
+        原子地写入清单文件（先写临时文件再替换）
+        
+        Returns:
+            清单文件路径
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        
+        return self.path
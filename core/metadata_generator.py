@@ -3,72 +3,189 @@
 负责生成格式化的歌曲元数据并导出
 """
 
+import io
+import json
+import os
+import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, TextIO
+
+from core.records import (
+    DEFAULT_ARTIST, DEFAULT_AUDIO_PREFIX, DEFAULT_COVER_PREFIX, CoverVariant, Song, SongMetadata, intern_tags,
+    intern_text,
+)
+
+
+# 导出格式 -> 默认文件扩展名
+EXPORT_FORMATS = {
+    'js': '.js',
+    'json': '.json',
+    'ndjson': '.ndjson',
+}
+
+# JS单引号字符串中需要转义的字符
+_JS_ESCAPES = {
+    '\\': '\\\\',
+    "'": "\\'",
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029',
+}
+_JS_ESCAPE_TABLE = str.maketrans(_JS_ESCAPES)
+
+# 不需要加引号的对象键
+_JS_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*', re.ASCII)
 
 
 def create_song_metadata(
     title: str,
     subtitle: str,
     date: str,
-    artist: str = "星瞳",
-    tags: list[str] | None = None,
-    cover_path: str = "/covers",
-    audio_path: str = "/audio"
-) -> dict:
+    artist: str = DEFAULT_ARTIST,
+    tags: Iterable[str] | None = None,
+    cover_path: str = DEFAULT_COVER_PREFIX,
+    audio_path: str = DEFAULT_AUDIO_PREFIX,
+    cover: str | None = None,
+    cover_variants: Iterable[CoverVariant] | None = None
+) -> SongMetadata:
     """
     创建单首歌曲的元数据对象
     
+    歌手、标签和路径前缀为所有歌曲共享的实例，封面和音频路径在导出时拼接。
+    
     Args:
         title: 歌曲名
         subtitle: 原唱歌手
         date: 发布日期 YYYY-MM-DD
         artist: 翻唱歌手，默认 "星瞳"
-        tags: 标签列表，默认 ['翻唱']
+        tags: 标签列表，默认 ('翻唱',)
         cover_path: 封面路径前缀
         audio_path: 音频路径前缀
+        cover: 可选，完整的封面路径（如封面存储中的共享文件），
+            默认为 <cover_path>/<title>.jpg
+        cover_variants: 可选，封面的缩略图/WebP等变体
     
     Returns:
-        格式化的元数据字典
+        元数据记录
+    """
+    return SongMetadata(
+        title=title,
+        subtitle=intern_text(subtitle),
+        date=intern_text(date),
+        artist=intern_text(artist),
+        tags=intern_tags(tags),
+        cover_variants=tuple(cover_variants or ()),
+        cover_prefix=intern_text(cover_path),
+        audio_prefix=intern_text(audio_path),
+        custom_cover=cover if cover and cover != f"{cover_path}/{title}.jpg" else None,
+    )
+
+
+def iter_song_metadata(songs_data: Iterable[Song]) -> Iterator[SongMetadata]:
     """
-    if tags is None:
-        tags = ['翻唱']
+    逐条生成歌曲元数据，不在内存中保存完整列表
+    
+    Args:
+        songs_data: 歌曲数据
     
-    return {
-        'title': title,
-        'subtitle': subtitle or '',
-        'artist': artist,
-        'date': date,
-        'cover': f"{cover_path}/{title}.jpg",
-        'audio': f"{audio_path}/{title}.mp3",
-        'tags': tags,
-    }
+    Yields:
+        元数据记录
+    """
+    for song in songs_data:
+        yield create_song_metadata(
+            title=song.title,
+            subtitle=song.subtitle,
+            date=song.date,
+            cover=song.cover,
+            cover_variants=song.cover_variants,
+        )
 
 
-def generate_all_metadata(songs_data: list[dict]) -> list[dict]:
+def generate_all_metadata(songs_data: list[Song]) -> list[SongMetadata]:
     """
     批量生成所有歌曲元数据
     
     Args:
-        songs_data: 歌曲数据列表，每项包含 title, subtitle, date
+        songs_data: 歌曲数据列表
     
     Returns:
         元数据列表
     """
-    metadata_list = []
+    return list(iter_song_metadata(songs_data))
+
+
+def js_string(value: Any) -> str:
+    """
+    将值格式化为单引号包裹的JavaScript字符串字面量
     
-    for song in songs_data:
-        metadata = create_song_metadata(
-            title=song.get('title', ''),
-            subtitle=song.get('subtitle', ''),
-            date=song.get('date', ''),
-        )
-        metadata_list.append(metadata)
+    Args:
+        value: 字符串值（None 视为空字符串）
     
-    return metadata_list
+    Returns:
+        转义后的字面量，如 It's -> 'It\\'s'
+    """
+    text = '' if value is None else str(value)
+    return "'" + text.translate(_JS_ESCAPE_TABLE) + "'"
 
 
-def format_metadata_as_js(metadata_list: list[dict]) -> str:
+def js_value(value: Any) -> str:
+    """
+    将JSON兼容的值格式化为JavaScript字面量（字符串使用单引号，其余与JSON相同）
+    
+    Args:
+        value: 字符串、数字、布尔值、None 或由它们组成的列表/字典
+    
+    Returns:
+        JavaScript字面量
+    """
+    if isinstance(value, str):
+        return js_string(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def js_key(key: str) -> str:
+    """对象键：合法的标识符不加引号，否则格式化为字符串字面量"""
+    return key if _JS_IDENTIFIER.fullmatch(key) else js_string(key)
+
+
+def format_song_as_js(item: SongMetadata) -> str:
+    """
+    将单首歌曲元数据格式化为JavaScript对象字面量
+    
+    已有元数据文件中的其他字段（extra）附加在末尾，缺少的字段（omitted）不输出。
+    
+    Args:
+        item: 元数据记录
+    
+    Returns:
+        多行JavaScript代码（不含末尾换行）
+    """
+    omitted = item.omitted
+    lines = ["  {", f"    title: {js_string(item.title)},"]
+    for key in ('subtitle', 'artist', 'date', 'cover'):
+        if key not in omitted:
+            lines.append(f"    {key}: {js_string(getattr(item, key))},")
+    if item.cover_variants:
+        lines.append("    cover_variants: [")
+        lines.extend(
+            f"      {{ src: {js_string(v.src)}, width: {v.width}, format: {js_string(v.format)} }},"
+            for v in item.cover_variants
+        )
+        lines.append("    ],")
+    if 'audio' not in omitted:
+        lines.append(f"    audio: {js_string(item.audio)},")
+    if 'tags' not in omitted:
+        tags = ', '.join(js_string(tag) for tag in item.tags)
+        lines.append(f"    tags: [{tags}],")
+    if item.extra:
+        lines.extend(f"    {js_key(key)}: {js_value(value)}," for key, value in item.extra.items())
+    lines.append("  },")
+    return "\n".join(lines)
+
+
+def format_metadata_as_js(metadata_list: Iterable[SongMetadata]) -> str:
     """
     将元数据列表格式化为JavaScript数组格式
     
@@ -78,63 +195,164 @@ def format_metadata_as_js(metadata_list: list[dict]) -> str:
     Returns:
         JavaScript代码字符串
     """
-    lines = ["export const songs = ["]
+    return format_metadata(metadata_list, 'js')
+
+
+def write_metadata_js(metadata: Iterable[SongMetadata], f: TextIO) -> int:
+    """
+    将元数据逐条写入JavaScript文件对象
     
-    for item in metadata_list:
-        lines.append("  {")
-        lines.append(f"    title: '{item['title']}',")
-        lines.append(f"    subtitle: '{item['subtitle']}',")
-        lines.append(f"    artist: '{item['artist']}',")
-        lines.append(f"    date: '{item['date']}',")
-        lines.append(f"    cover: '{item['cover']}',")
-        lines.append(f"    audio: '{item['audio']}',")
-        lines.append(f"    tags: {item['tags']},")
-        lines.append("  },")
+    Args:
+        metadata: 元数据迭代器
+        f: 已打开的文本文件对象
     
-    lines.append("];")
+    Returns:
+        写入的歌曲数
+    """
+    count = 0
+    f.write("export const songs = [")
+    for item in metadata:
+        f.write("\n")
+        f.write(format_song_as_js(item))
+        count += 1
+    f.write("\n];")
+    return count
+
+
+def write_metadata_json(metadata: Iterable[SongMetadata], f: TextIO) -> int:
+    """
+    将元数据逐条写入JSON数组，输出与 json.dump(indent=2) 一致
     
-    return "\n".join(lines)
+    Args:
+        metadata: 元数据迭代器
+        f: 已打开的文本文件对象
+    
+    Returns:
+        写入的歌曲数
+    """
+    count = 0
+    for item in metadata:
+        f.write("[\n  " if count == 0 else ",\n  ")
+        f.write(json.dumps(item.to_dict(), ensure_ascii=False, indent=2).replace("\n", "\n  "))
+        count += 1
+    f.write("\n]" if count else "[]")
+    return count
 
 
-def export_to_js(metadata_list: list[dict], output_path: str | Path) -> Path:
+def write_metadata_ndjson(metadata: Iterable[SongMetadata], f: TextIO) -> int:
     """
-    将元数据导出为JavaScript文件
+    将元数据写为NDJSON（每行一个JSON对象）
     
     Args:
-        metadata_list: 元数据列表
+        metadata: 元数据迭代器
+        f: 已打开的文本文件对象
+    
+    Returns:
+        写入的歌曲数
+    """
+    count = 0
+    for item in metadata:
+        f.write(json.dumps(item.to_dict(), ensure_ascii=False, separators=(',', ':')))
+        f.write("\n")
+        count += 1
+    return count
+
+
+# 导出格式 -> 写入函数
+_WRITERS = {
+    'js': write_metadata_js,
+    'json': write_metadata_json,
+    'ndjson': write_metadata_ndjson,
+}
+
+
+def format_metadata(metadata: Iterable[SongMetadata], fmt: str = 'js') -> str:
+    """
+    将元数据按指定格式渲染为字符串
+    
+    Args:
+        metadata: 元数据列表或迭代器
+        fmt: 导出格式，js / json / ndjson
+    
+    Returns:
+        文件内容
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    
+    buffer = io.StringIO()
+    _WRITERS[fmt](metadata, buffer)
+    return buffer.getvalue()
+
+
+def export_metadata(metadata: Iterable[SongMetadata], output_path: str | Path, fmt: str = 'js') -> Path:
+    """
+    按指定格式流式导出元数据，内存占用与歌曲数量无关
+    
+    先写入临时文件再替换，写入过程中网站读取到的始终是完整的旧文件或新文件。
+    
+    Args:
+        metadata: 元数据列表或迭代器
         output_path: 输出文件路径
+        fmt: 导出格式，js / json / ndjson
     
     Returns:
         输出文件路径
     """
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    js_content = format_metadata_as_js(metadata_list)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(js_content)
+    tmp_path = output_file.with_name(output_file.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            _WRITERS[fmt](metadata, f)
+        os.replace(tmp_path, output_file)
+    finally:
+        tmp_path.unlink(missing_ok=True)
     
     return output_file
 
 
-def export_to_json(metadata_list: list[dict], output_path: str | Path) -> Path:
+def export_to_js(metadata_list: Iterable[SongMetadata], output_path: str | Path) -> Path:
     """
-    将元数据导出为JSON文件
+    将元数据导出为JavaScript文件
     
     Args:
-        metadata_list: 元数据列表
+        metadata_list: 元数据列表或迭代器
         output_path: 输出文件路径
     
     Returns:
         输出文件路径
     """
-    import json
+    return export_metadata(metadata_list, output_path, 'js')
+
+
+def export_to_json(metadata_list: Iterable[SongMetadata], output_path: str | Path) -> Path:
+    """
+    将元数据导出为JSON文件
     
-    output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+    Args:
+        metadata_list: 元数据列表或迭代器
+        output_path: 输出文件路径
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata_list, f, ensure_ascii=False, indent=2)
+    Returns:
+        输出文件路径
+    """
+    return export_metadata(metadata_list, output_path, 'json')
+
+
+def export_to_ndjson(metadata_list: Iterable[SongMetadata], output_path: str | Path) -> Path:
+    """
+    将元数据导出为NDJSON文件（每行一条记录）
     
-    return output_file
+    Args:
+        metadata_list: 元数据列表或迭代器
+        output_path: 输出文件路径
+    
+    Returns:
+        输出文件路径
+    """
+    return export_metadata(metadata_list, output_path, 'ndjson')
@@ -0,0 +1,356 @@
+"""
+元数据合并模块
+读取已有的元数据文件（JS/JSON/NDJSON），按标题建立有序索引，将本次处理的歌曲合并进去
+"""
+
+import bisect
+import dataclasses
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from core.metadata_generator import EXPORT_FORMATS, export_metadata
+from core.records import SongMetadata
+
+
+# 合并后的排序方式
+MERGE_ORDERS = ('date', 'date-desc', 'title')
+
+# JS字符串中的转义字符
+_JS_UNESCAPES = {
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+    'b': '\b',
+    'f': '\f',
+    'v': '\v',
+    '0': '\0',
+}
+
+# 空白和注释（未结束的块注释留给后续解析报错）
+_JS_SKIP = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+
+# 字符串中不需要特殊处理的连续字符
+_JS_STRING_CHUNK = {
+    "'": re.compile(r"[^'\\\n]*"),
+    '"': re.compile(r'[^"\\\n]*'),
+}
+
+_JS_NUMBER = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+_JS_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+
+
+class _JSLiteralParser:
+    """
+    解析 JavaScript 字面量（对象、数组、字符串、数字、true/false/null）
+    
+    支持 write_metadata_js 生成的格式以及常见的手工编辑：单/双引号字符串、
+    不加引号的键、末尾逗号和注释。不支持表达式、模板字符串等。
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+    
+    def error(self, message: str) -> ValueError:
+        line = self.text.count('\n', 0, self.pos) + 1
+        return ValueError(f"{message}（第 {line} 行）")
+    
+    def peek(self) -> str:
+        """跳过空白和注释，返回下一个字符（已到末尾时为空字符串）"""
+        char = self.text[self.pos:self.pos + 1]
+        if char.isspace() or char == '/':
+            self.pos = _JS_SKIP.match(self.text, self.pos).end()
+            char = self.text[self.pos:self.pos + 1]
+        return char
+    
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"应为 {char!r}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        char = self.peek()
+        if char == '{':
+            return self.object()
+        if char == '[':
+            return self.array()
+        if char in ('"', "'"):
+            return self.string()
+        
+        match = _JS_NUMBER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            number = match.group()
+            return float(number) if any(c in number for c in '.eE') else int(number)
+        
+        match = _JS_IDENTIFIER.match(self.text, self.pos)
+        if match and match.group() in ('true', 'false', 'null', 'undefined'):
+            self.pos = match.end()
+            return {'true': True, 'false': False}.get(match.group())
+        raise self.error("无法解析的值")
+    
+    def object(self) -> dict:
+        self.expect('{')
+        result = {}
+        while self.peek() != '}':
+            if self.peek() in ('"', "'"):
+                key = self.string()
+            else:
+                match = _JS_IDENTIFIER.match(self.text, self.pos)
+                if not match:
+                    raise self.error("无法解析的键")
+                key = match.group()
+                self.pos = match.end()
+            self.expect(':')
+            result[key] = self.value()
+            if self.peek() != ',':
+                break
+            self.pos += 1
+        self.expect('}')
+        return result
+    
+    def array(self) -> list:
+        self.expect('[')
+        result = []
+        while self.peek() != ']':
+            result.append(self.value())
+            if self.peek() != ',':
+                break
+            self.pos += 1
+        self.expect(']')
+        return result
+    
+    def string(self) -> str:
+        text = self.text
+        quote = text[self.pos]
+        chunk = _JS_STRING_CHUNK[quote]
+        self.pos += 1
+        parts = []
+        while True:
+            end = chunk.match(text, self.pos).end()
+            parts.append(text[self.pos:end])
+            self.pos = end
+            char = text[end:end + 1]
+            if char == quote:
+                self.pos += 1
+                return ''.join(parts)
+            if char != '\\':
+                raise self.error("字符串未结束")
+            
+            escape = text[self.pos + 1:self.pos + 2]
+            if escape in ('u', 'x'):
+                width = 4 if escape == 'u' else 2
+                digits = text[self.pos + 2:self.pos + 2 + width]
+                try:
+                    parts.append(chr(int(digits, 16)))
+                except ValueError:
+                    raise self.error("无效的转义序列") from None
+                self.pos += 2 + width
+            elif escape == '\n':
+                self.pos += 2
+            else:
+                parts.append(_JS_UNESCAPES.get(escape, escape))
+                self.pos += 2
+
+
+def parse_metadata_js(text: str) -> list[dict]:
+    """
+    解析 JavaScript 元数据文件（如 export const songs = [...];）
+    
+    Args:
+        text: 文件内容
+    
+    Returns:
+        元数据列表
+    
+    Raises:
+        ValueError: 找不到数组或内容无法解析
+    """
+    parser = _JSLiteralParser(text)
+    # 跳过 export const songs = 等声明，从第一个数组开始解析
+    match = re.search(r'=\s*\[|^\s*\[', text, re.MULTILINE)
+    if match is None:
+        raise ValueError("未找到元数据数组")
+    parser.pos = match.end() - 1
+    items = parser.array()
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError("元数据数组中包含非对象的元素")
+    return items
+
+
+def load_metadata(path: str | Path) -> list[dict]:
+    """
+    读取已有的元数据文件，按扩展名识别格式（.js / .json / .ndjson）
+    
+    Args:
+        path: 元数据文件路径
+    
+    Returns:
+        元数据列表
+    
+    Raises:
+        OSError: 无法读取文件
+        ValueError: 内容无法解析
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8-sig')
+    suffix = path.suffix.lower()
+    if suffix == '.js':
+        return parse_metadata_js(text)
+    if suffix == '.ndjson':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("元数据文件应为JSON数组")
+    return items
+
+
+class _Descending(str):
+    """按相反顺序比较的字符串，用于降序排列的键"""
+    
+    def __lt__(self, other: str) -> bool:
+        return str.__gt__(self, other)
+    
+    def __gt__(self, other: str) -> bool:
+        return str.__lt__(self, other)
+
+
+def sort_key(item: SongMetadata, order: str = 'date') -> tuple:
+    """
+    元数据的排序键，无日期的歌曲始终排在最后，同日期按标题排列
+    
+    Args:
+        item: 元数据记录
+        order: 排序方式，见 MERGE_ORDERS
+    
+    Returns:
+        可比较的排序键
+    """
+    title = item.title
+    date = item.date
+    if order == 'title':
+        return (title,)
+    if order == 'date-desc':
+        return (not date, _Descending(date), title)
+    return (not date, date, title)
+
+
+class MetadataIndex:
+    """
+    按标题索引、按排序键有序的元数据集合
+    
+    标题 -> 记录的字典用于查找，并行的有序键列表用于二分插入：
+    合并 N 首歌曲只需 N 次 O(log M) 的查找，无需重新排序或重新处理已有的 M 首。
+    已有文件通常本身有序，载入时的排序为线性时间。
+    读取的字典逐条转换为 SongMetadata，不保留原始字典。
+    """
+    
+    def __init__(self, items: Iterable[SongMetadata | dict] = (), order: str = 'date'):
+        """
+        Args:
+            items: 已有的元数据记录或字典（标题重复时保留最后一条）
+            order: 排序方式，见 MERGE_ORDERS
+        
+        Raises:
+            ValueError: 排序方式无效或字典中的字段无效
+        """
+        if order not in MERGE_ORDERS:
+            raise ValueError(f"不支持的排序方式: {order}")
+        self.order = order
+        self._by_title: dict[str, SongMetadata] = {}
+        for item in items:
+            if isinstance(item, dict):
+                item = SongMetadata.from_dict(item)
+            self._by_title[item.title] = item
+        self._items = sorted(self._by_title.values(), key=self._key)
+        self._keys = [self._key(item) for item in self._items]
+    
+    def _key(self, item: SongMetadata) -> tuple:
+        return sort_key(item, self.order)
+    
+    def _position(self, item: SongMetadata) -> int:
+        """已有记录在有序列表中的位置"""
+        key = self._key(item)
+        index = bisect.bisect_left(self._keys, key)
+        while self._items[index] is not item:
+            index += 1
+        return index
+    
+    def upsert(self, item: SongMetadata) -> str:
+        """
+        新增或更新一条记录
+        
+        更新已有标题时只覆盖生成的字段：已有记录中的其他字段（extra）和缺少的字段（omitted）
+        保留到新记录中。
+        
+        Args:
+            item: 元数据记录
+        
+        Returns:
+            'added' / 'updated' / 'unchanged'
+        """
+        title = item.title
+        existing = self._by_title.get(title)
+        if existing is not None:
+            if existing.extra or existing.omitted:
+                item = dataclasses.replace(
+                    item,
+                    extra={**(existing.extra or {}), **(item.extra or {})} or None,
+                    omitted=tuple(dict.fromkeys(existing.omitted + item.omitted)),
+                )
+            # 按导出内容比较，路径前缀等内部表示不同但输出相同的记录视为未变化
+            if existing.to_dict() == item.to_dict():
+                return 'unchanged'
+            index = self._position(existing)
+            del self._items[index]
+            del self._keys[index]
+        
+        key = self._key(item)
+        index = bisect.bisect_right(self._keys, key)
+        self._items.insert(index, item)
+        self._keys.insert(index, key)
+        self._by_title[title] = item
+        return 'added' if existing is None else 'updated'
+    
+    def get(self, title: str) -> SongMetadata | None:
+        """按标题查找记录"""
+        return self._by_title.get(title)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[SongMetadata]:
+        return iter(self._items)
+
+
+def merge_metadata(metadata: Iterable[SongMetadata], path: str | Path, fmt: str | None = None,
+                   order: str = 'date') -> tuple[Path, Counter, int]:
+    """
+    将元数据合并到已有文件：按标题新增或更新，其余记录保持不变，结果按 order 排序后原子地写回
+    
+    Args:
+        metadata: 本次的元数据
+        path: 目标文件（不存在时新建）
+        fmt: 导出格式，默认按扩展名判断（与 load_metadata 一致，无法判断时为 json）
+        order: 排序方式，见 MERGE_ORDERS
+    
+    Returns:
+        (目标文件路径, 按 'added' / 'updated' / 'unchanged' 的计数, 合并后的总数)
+    
+    Raises:
+        OSError: 无法读取已有文件
+        ValueError: 已有文件无法解析
+    """
+    path = Path(path)
+    # 不保留读取到的字典列表，转换为记录后即可释放
+    index = MetadataIndex(load_metadata(path) if path.exists() else [], order)
+    stats = Counter(index.upsert(item) for item in metadata)
+    
+    if fmt is None:
+        formats = {suffix: name for name, suffix in EXPORT_FORMATS.items()}
+        fmt = formats.get(path.suffix.lower(), 'json')
+    return export_metadata(index, path, fmt), stats, len(index)
@@ -4,11 +4,130 @@
 """
 
 import json
+import mmap
+import os
+import re
 from pathlib import Path
 
 from utils.helpers import timestamp_to_date
 
 
+# 需要从JSON元数据中读取的顶层字段
+METADATA_KEYS = ('pubtimestamp', 'title', 'author', 'description')
+
+# 文件数少于该值时不启用进程池（进程启动开销大于收益）
+PARALLEL_THRESHOLD = 32
+
+# 快速扫描的最大字节数，超过后仍未找到全部字段则改为完整解析，
+# 避免字段位于大段嵌套内容之后时逐个扫描反而比完整解析更慢
+SCAN_BUDGET = 64 * 1024
+
+# 结构扫描：完整字符串或括号
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN_RE = re.compile(_STRING + rb'|[{}\[\]]', re.DOTALL)
+# 空白与键之后的冒号
+_WS_RE = re.compile(rb'\s*')
+_COLON_RE = re.compile(rb'\s*:\s*')
+# 可直接解码的标量值：字符串、数字、true/false/null
+_SCALAR_RE = re.compile(
+    _STRING + rb'|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null',
+    re.DOTALL,
+)
+
+
+class _FallbackRequired(Exception):
+    """快速路径无法处理，需要完整解析"""
+
+
+def _scan_top_level(buf, keys: frozenset[bytes]) -> dict:
+    """
+    在不构建完整对象的情况下，从JSON文本中读取指定的顶层标量字段
+    
+    仅扫描字符串和括号以跟踪嵌套深度，深度为1的字符串后紧跟冒号即为顶层键；
+    所需字段全部找到后立即停止，不再扫描后面的评论、弹幕等大段内容。
+    扫描超过 SCAN_BUDGET 仍未结束时抛出 _FallbackRequired。
+    """
+    start = 3 if buf[:3] == b'\xef\xbb\xbf' else 0
+    first = _WS_RE.match(buf, start).end()
+    if buf[first:first + 1] != b'{':
+        raise _FallbackRequired
+    
+    found = {}
+    depth = 0
+    pos = first
+    
+    while len(found) < len(keys):
+        if pos - first > SCAN_BUDGET:
+            raise _FallbackRequired
+        match = _TOKEN_RE.search(buf, pos)
+        if match is None:
+            break
+        token = match.group()
+        pos = match.end()
+        
+        if token[0] == 0x22:  # 字符串
+            if depth != 1:
+                continue
+            colon = _COLON_RE.match(buf, pos)
+            if colon is None:
+                continue  # 字符串值，而非键
+            key = token[1:-1]
+            if b'\\' in key:
+                raise _FallbackRequired
+            if key not in keys:
+                continue
+            value = _SCALAR_RE.match(buf, colon.end())
+            if value is None:
+                # 值为对象或数组，交由完整解析处理
+                raise _FallbackRequired
+            found[key.decode('utf-8')] = json.loads(value.group())
+            pos = value.end()
+        elif token in (b'{', b'['):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                break
+    
+    return found
+
+
+def read_top_level_fields(json_path: str | Path, keys=METADATA_KEYS) -> dict:
+    """
+    读取JSON文件中的指定顶层字段
+    
+    优先通过内存映射扫描，只解码所需字段；遇到无法处理的情况
+    （非对象、字段值为对象/数组、含转义的键等）时回退到完整解析。
+    
+    Args:
+        json_path: JSON文件路径
+        keys: 需要读取的顶层字段名
+    
+    Returns:
+        字段名 -> 值 的字典（不包含缺失的字段）
+    
+    Raises:
+        OSError: 文件读取失败
+        json.JSONDecodeError: 完整解析失败
+    """
+    wanted = frozenset(key.encode('utf-8') for key in keys)
+    
+    try:
+        with open(json_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise _FallbackRequired
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _scan_top_level(buf, wanted)
+    except (_FallbackRequired, ValueError):
+        pass
+    
+    with open(json_path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        return {}
+    return {key: data[key] for key in keys if key in data}
+
+
 def parse_json_metadata(json_path: str | Path) -> dict | None:
     """
     解析JSON元数据文件
@@ -25,8 +144,7 @@ def parse_json_metadata(json_path: str | Path) -> dict | None:
         return None
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_top_level_fields(json_file)
         
         result = {}
         
@@ -42,7 +160,7 @@ def parse_json_metadata(json_path: str | Path) -> dict | None:
         
         return result
     
-    except (json.JSONDecodeError, IOError) as e:
+    except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
         print(f"[错误] 解析JSON文件失败 {json_path}: {e}")
         return None
 
@@ -57,5 +175,46 @@ def extract_date_from_metadata(json_path: str | Path) -> str | None:
     Returns:
         YYYY-MM-DD 格式的日期字符串，或None
     """
-    metadata = parse_json_metadata(json_path)
-    return metadata.get('date') if metadata else None
+    json_file = Path(json_path)
+    if not json_file.exists():
+        return None
+    
+    try:
+        data = read_top_level_fields(json_file, keys=('pubtimestamp',))
+        if 'pubtimestamp' in data:
+            return timestamp_to_date(data['pubtimestamp'])
+        return None
+    except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+        print(f"[错误] 解析JSON文件失败 {json_path}: {e}")
+        return None
+    except (TypeError, ValueError, OverflowError) as e:
+        print(f"[错误] 无效的发布时间戳 {json_path}: {e}")
+        return None
+
+
+def extract_dates(json_paths: list[str | Path | None], workers: int | None = None) -> list[str | None]:
+    """
+    批量提取日期，文件较多时使用进程池并行解析
+    
+    Args:
+        json_paths: JSON文件路径列表（可包含None）
+        workers: 进程数，默认为CPU核心数；为1时顺序处理
+    
+    Returns:
+        与输入顺序一致的日期列表，无JSON或解析失败时为None
+    """
+    paths = [p for p in json_paths if p]
+    workers = workers or os.cpu_count() or 1
+    
+    if workers <= 1 or len(paths) < PARALLEL_THRESHOLD:
+        dates = [extract_date_from_metadata(p) for p in paths]
+    else:
+        # 进程池依赖 multiprocessing，仅在需要并行时导入以缩短启动时间
+        from concurrent.futures import ProcessPoolExecutor
+        
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            dates = list(executor.map(extract_date_from_metadata, paths, chunksize=chunksize))
+    
+    it = iter(dates)
+    return [next(it) if p else None for p in json_paths]
@@ -0,0 +1,242 @@
+"""
+分片元数据模块
+将元数据按年份（及年份内的固定数量）拆分为多个文件名带内容哈希的分片，并生成索引清单，
+供前端按需加载；可选同时写入 gzip/brotli 预压缩文件
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable
+
+from core.metadata_generator import EXPORT_FORMATS, format_metadata
+from core.metadata_merge import sort_key
+from core.records import SongMetadata
+
+
+# 分片方式
+SHARD_MODES = ('size', 'year')
+
+# 按数量分片时每个分片的默认歌曲数
+DEFAULT_SHARD_SIZE = 500
+
+# 预压缩格式 -> 文件扩展名
+PRECOMPRESS_FORMATS = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+# 分片目录及其中的索引清单
+SHARDS_DIRNAME = 'songs_metadata'
+SHARD_INDEX_NAME = 'index.json'
+SHARD_INDEX_VERSION = 1
+
+# 文件名中内容哈希的长度（十六进制字符）
+SHARD_HASH_LENGTH = 16
+
+# 分片文件名: songs.<分片键>.<哈希><扩展名>[.gz|.br]
+_SHARD_FILE = re.compile(r'^songs\.[^.]+\.[0-9a-f]+\.\w+(?:\.gz|\.br)?$')
+
+_YEAR = re.compile(r'^\d{4}')
+
+
+def check_precompress(formats: Iterable[str]) -> None:
+    """
+    检查预压缩格式是否可用
+    
+    Args:
+        formats: 预压缩格式列表
+    
+    Raises:
+        RuntimeError: 需要 brotli 但未安装
+    """
+    if 'br' in formats:
+        try:
+            import brotli  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("brotli 预压缩需要 brotli，请执行: uv pip install 'songmeta[brotli]'") from e
+
+
+def compress(data: bytes, fmt: str) -> bytes:
+    """
+    以最高压缩率压缩数据，相同输入总得到相同输出
+    
+    Args:
+        data: 原始数据
+        fmt: 'gzip' 或 'br'
+    
+    Returns:
+        压缩后的数据
+    """
+    if fmt == 'gzip':
+        # 固定 mtime，使压缩结果只由内容决定
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    import brotli
+    return brotli.compress(data, quality=11)
+
+
+def split_shards(metadata: Iterable[SongMetadata], mode: str = 'size',
+                 shard_size: int = DEFAULT_SHARD_SIZE) -> list[tuple[str, list[SongMetadata]]]:
+    """
+    按日期排序后拆分元数据
+    
+    先按发布年份分组（无日期的归入 unknown），分片边界不跨年份：补录一首较早的歌曲时，
+    只有该年份的分片会变化，其他年份的分片文件名不变。
+    按数量拆分时，歌曲数超过 shard_size 的年份再按日期顺序拆成多个分片，
+    补录的歌曲会使同一年份中其后的分片边界整体后移。
+    
+    Args:
+        metadata: 元数据
+        mode: 'size' 按年份分组后按固定数量拆分，'year' 按发布年份拆分
+        shard_size: 按数量拆分时每个分片的最大歌曲数
+    
+    Returns:
+        (分片键, 元数据列表) 列表；按年份拆分时分片键为年份，
+        按数量拆分时为年份加从0开始的三位序号（如 2024-000）
+    """
+    years: dict[str, list[SongMetadata]] = {}
+    for item in sorted(metadata, key=sort_key):
+        match = _YEAR.match(item.date)
+        years.setdefault(match.group() if match else 'unknown', []).append(item)
+    if mode == 'year':
+        return list(years.items())
+    
+    return [
+        (f"{year}-{i // shard_size:03d}", items[i:i + shard_size])
+        for year, items in years.items()
+        for i in range(0, len(items), shard_size)
+    ]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _read_index(path: Path) -> dict | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[警告] 分片索引损坏，已忽略: {e}")
+        return None
+
+
+def _index_files(index: dict | None) -> set[str]:
+    """索引引用的全部文件名（含预压缩文件）"""
+    if not index:
+        return set()
+    files = set()
+    for shard in index.get('shards', []):
+        files.add(shard['file'])
+        for fmt in shard.get('encodings', []):
+            files.add(shard['file'] + PRECOMPRESS_FORMATS.get(fmt, ''))
+    return files
+
+
+def export_shards(metadata: Iterable[SongMetadata], output_dir: str | Path, fmt: str = 'js', mode: str = 'size',
+                  shard_size: int = DEFAULT_SHARD_SIZE, precompress: Iterable[str] = ()) -> dict:
+    """
+    导出分片元数据和索引清单
+    
+    分片文件名包含内容哈希，内容不变的分片保持同一文件名且不会被重写，可长期缓存；
+    索引清单使用固定文件名，最后原子地替换。
+    上一版索引引用的分片保留一个版本，加载旧索引的页面仍可取到分片，更早的分片被删除。
+    
+    Args:
+        metadata: 元数据
+        output_dir: 分片目录
+        fmt: 分片格式，js / json / ndjson
+        mode: 分片方式，见 SHARD_MODES 和 split_shards
+        shard_size: 按数量分片时每个分片的最大歌曲数
+        precompress: 预压缩格式，见 PRECOMPRESS_FORMATS
+    
+    Returns:
+        统计信息:
+            index: 索引清单路径
+            shards: 分片数
+            written: 本次写入的分片数
+            unchanged: 内容未变、直接复用的分片数
+            removed: 删除的过期文件数
+            bytes: 全部分片的总字节数
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    if mode not in SHARD_MODES:
+        raise ValueError(f"不支持的分片方式: {mode}")
+    precompress = list(dict.fromkeys(precompress))
+    check_precompress(precompress)
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / SHARD_INDEX_NAME
+    previous = _read_index(index_path)
+    
+    entries = []
+    written = 0
+    total_bytes = 0
+    total = 0
+    for key, items in split_shards(metadata, mode, shard_size):
+        data = format_metadata(items, fmt).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"songs.{key}.{digest[:SHARD_HASH_LENGTH]}{EXPORT_FORMATS[fmt]}"
+        path = output_dir / name
+        
+        # 文件名由内容决定，已存在即内容相同，不重写以保留修改时间和缓存
+        if not path.exists():
+            _write_atomic(path, data)
+            written += 1
+        for encoding in precompress:
+            compressed = path.with_name(path.name + PRECOMPRESS_FORMATS[encoding])
+            if not compressed.exists():
+                _write_atomic(compressed, compress(data, encoding))
+        
+        dates = [item.date for item in items if item.date]
+        entries.append({
+            'key': key,
+            'file': name,
+            'count': len(items),
+            'bytes': len(data),
+            'sha256': digest,
+            'first_date': min(dates) if dates else None,
+            'last_date': max(dates) if dates else None,
+            'encodings': precompress,
+        })
+        total += len(items)
+        total_bytes += len(data)
+    
+    index = {
+        'version': SHARD_INDEX_VERSION,
+        'format': fmt,
+        'mode': mode,
+        'shard_size': shard_size if mode == 'size' else None,
+        'total': total,
+        'shards': entries,
+    }
+    _write_atomic(index_path, json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8'))
+    
+    # 删除当前和上一版索引都不再引用的分片
+    keep = _index_files(index) | _index_files(previous)
+    removed = 0
+    for path in output_dir.iterdir():
+        if _SHARD_FILE.match(path.name) and path.name not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    
+    return {
+        'index': index_path,
+        'shards': len(entries),
+        'written': written,
+        'unchanged': len(entries) - written,
+        'removed': removed,
+        'bytes': total_bytes,
+    }
@@ -0,0 +1,207 @@
+"""
+流水线执行模块
+以有界队列串联多个工作线程池，使扫描、复制、解析、查询等阶段按歌曲重叠执行
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+
+# 队列中表示输入结束的标记
+_DONE = object()
+
+
+class _Stage:
+    """流水线中的一个阶段"""
+    
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int, batch_size: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.lock = threading.Lock()
+        self.remaining = self.workers
+
+
+class Pipeline:
+    """
+    有界队列流水线
+    
+    每个阶段由若干工作线程从上一阶段的队列取出条目、处理后放入下一阶段的队列。
+    队列有容量上限，下游处理不过来时上游会阻塞等待（背压），内存占用与总条目数无关。
+    条目按完成顺序输出，并附带输入时的序号，调用方可据此恢复确定的顺序。
+    
+    任一阶段抛出异常时，流水线停止接收新条目，丢弃剩余条目，
+    并在 run() 结束时重新抛出第一个异常。
+    """
+    
+    def __init__(self, queue_size: int = 64):
+        """
+        Args:
+            queue_size: 每个阶段输入队列的容量
+        """
+        self.queue_size = max(1, queue_size)
+        self.stages: list[_Stage] = []
+        self.wall_seconds = 0.0
+        self._error: BaseException | None = None
+        self._error_lock = threading.Lock()
+        self._abort = threading.Event()
+    
+    def add_stage(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                  batch_size: int = 1) -> 'Pipeline':
+        """
+        追加一个阶段
+        
+        Args:
+            name: 阶段名（用于统计）
+            func: 处理函数，接收上一阶段的输出并返回本阶段的输出；可在多个线程中并发调用
+            workers: 工作线程数
+            batch_size: 大于1时 func 接收条目列表并返回等长的结果列表；
+                每次取出队列中已有的最多 batch_size 个条目，不等待后续条目到达
+        
+        Returns:
+            self，便于链式调用
+        """
+        self.stages.append(_Stage(name, func, workers, batch_size))
+        return self
+    
+    def _fail(self, error: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._abort.set()
+    
+    def _produce(self, items: Iterable, out_q: queue.Queue, workers: int) -> None:
+        try:
+            for index, item in enumerate(items):
+                if self._abort.is_set():
+                    break
+                out_q.put((index, item))
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(workers):
+                out_q.put(_DONE)
+    
+    @staticmethod
+    def _take(stage: _Stage, in_q: queue.Queue) -> tuple[list, bool]:
+        """取出一批条目（阻塞等待第一条），返回 (条目列表, 是否已取到结束标记)"""
+        entry = in_q.get()
+        if entry is _DONE:
+            return [], True
+        batch = [entry]
+        while len(batch) < stage.batch_size:
+            try:
+                entry = in_q.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _DONE:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+    
+    def _work(self, stage: _Stage, in_q: queue.Queue, out_q: queue.Queue, next_workers: int) -> None:
+        finished = False
+        while not finished:
+            batch, finished = self._take(stage, in_q)
+            if not batch or self._abort.is_set():
+                continue
+            
+            items = [item for _, item in batch]
+            start = time.perf_counter()
+            try:
+                results = stage.func(items) if stage.batch_size > 1 else [stage.func(items[0])]
+            except BaseException as e:
+                self._fail(e)
+                continue
+            elapsed = time.perf_counter() - start
+            
+            with stage.lock:
+                stage.items += len(batch)
+                stage.busy_seconds += elapsed
+            for (index, _), result in zip(batch, results):
+                out_q.put((index, result))
+        
+        # 本阶段最后一个退出的线程通知下游结束
+        with stage.lock:
+            stage.remaining -= 1
+            last = stage.remaining == 0
+        if last:
+            for _ in range(next_workers):
+                out_q.put(_DONE)
+    
+    def run(self, items: Iterable) -> Iterator[tuple[int, Any]]:
+        """
+        运行流水线
+        
+        Args:
+            items: 输入条目（可为生成器，在独立线程中迭代）
+        
+        Yields:
+            (输入序号, 最后一个阶段的输出)，按完成顺序
+        
+        Raises:
+            任一阶段或输入迭代中抛出的第一个异常
+        """
+        if not self.stages:
+            raise ValueError("流水线至少需要一个阶段")
+        
+        start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        # 输出队列只由调用方消费，不限容量，避免调用方处理较慢时反向阻塞
+        queues.append(queue.Queue())
+        
+        threads = [threading.Thread(
+            target=self._produce, args=(items, queues[0], self.stages[0].workers),
+            name='pipeline-source', daemon=True,
+        )]
+        for i, stage in enumerate(self.stages):
+            next_workers = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, queues[i], queues[i + 1], next_workers),
+                    name=f"pipeline-{stage.name}-{n}", daemon=True,
+                ))
+        
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while True:
+                entry = queues[-1].get()
+                if entry is _DONE:
+                    break
+                if not self._abort.is_set():
+                    yield entry
+        finally:
+            # 调用方提前退出时同样停止流水线
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+            self.wall_seconds = time.perf_counter() - start
+        
+        if self._error is not None:
+            raise self._error
+    
+    def stats(self) -> dict:
+        """
+        返回各阶段的统计
+        
+        Returns:
+            阶段名 -> {workers, items, busy_seconds, utilization}；
+            utilization 为工作线程忙碌时间占 总时长×线程数 的比例，最接近1的阶段即瓶颈
+        """
+        return {
+            stage.name: {
+                'workers': stage.workers,
+                'items': stage.items,
+                'busy_seconds': stage.busy_seconds,
+                'utilization': (stage.busy_seconds / (self.wall_seconds * stage.workers)
+                                if self.wall_seconds else 0.0),
+            }
+            for stage in self.stages
+        }
@@ -0,0 +1,252 @@
+"""
+记录类型模块
+定义流水线各阶段之间传递的文件对、歌曲数据和元数据记录
+
+大型曲库中每首歌曲都会产生多条记录，使用 __slots__ 数据类代替字典以减少内存占用；
+歌手、标签、路径前缀、所在目录等在大量记录间重复的值只保存一份，由各记录共享。
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+
+# 默认翻唱歌手
+DEFAULT_ARTIST = sys.intern('星瞳')
+
+# 默认标签（元组在所有记录间共享，不可修改）
+DEFAULT_TAGS = (sys.intern('翻唱'),)
+
+# 封面和音频在元数据中的默认路径前缀
+DEFAULT_COVER_PREFIX = sys.intern('/covers')
+DEFAULT_AUDIO_PREFIX = sys.intern('/audio')
+
+# 元数据中由 SongMetadata 字段表示的键（其余键保存在 extra 中）
+METADATA_KEYS = ('title', 'subtitle', 'artist', 'date', 'cover', 'audio', 'tags', 'cover_variants')
+
+# 已有元数据文件中可以缺少、缺少时导出同样省略的键（cover_variants 为空时本就不导出）
+OPTIONAL_KEYS = ('subtitle', 'artist', 'date', 'cover', 'audio', 'tags')
+
+# 标签元组 -> 共享实例
+_shared_tags: dict[tuple[str, ...], tuple[str, ...]] = {DEFAULT_TAGS: DEFAULT_TAGS}
+
+
+def intern_text(value: Any) -> str:
+    """
+    返回字符串的共享实例（None 视为空字符串）
+    
+    原唱歌手、发布日期等在曲库中大量重复，驻留后相同的值只保存一份。
+    """
+    if not value:
+        return ''
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+def intern_tags(tags: Iterable[str] | None) -> tuple[str, ...]:
+    """
+    返回标签元组的共享实例
+    
+    Args:
+        tags: 标签列表，None 表示默认标签
+    
+    Returns:
+        与其他记录共享的不可变元组
+    """
+    if tags is None:
+        return DEFAULT_TAGS
+    tags = tuple(intern_text(tag) for tag in tags)
+    return _shared_tags.setdefault(tags, tags)
+
+
+@dataclass(slots=True)
+class SongPair:
+    """
+    源目录中的MP3及对应的JSON文件
+    
+    同一目录下的文件对共享同一个目录 Path 对象，只保存各自的文件名，
+    完整路径按需拼接。
+    """
+    
+    directory: Path
+    original_name: str
+    song_name: str
+    json_name: str | None = None
+    
+    @property
+    def mp3_path(self) -> Path:
+        """源MP3路径"""
+        return self.directory / self.original_name
+    
+    @property
+    def json_path(self) -> Path | None:
+        """对应的JSON路径，没有JSON时为None"""
+        return self.directory / self.json_name if self.json_name else None
+
+
+@dataclass(slots=True, frozen=True)
+class CoverVariant:
+    """封面的一个缩略图/WebP变体，同一封面的变体元组由使用该封面的歌曲共享"""
+    
+    src: str
+    width: int
+    format: str
+    
+    def to_dict(self) -> dict:
+        return {'src': self.src, 'width': self.width, 'format': self.format}
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CoverVariant':
+        """
+        Raises:
+            ValueError: 缺少字段或宽度不是整数
+        """
+        try:
+            return cls(data['src'], int(data['width']), intern_text(data['format']))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"无效的封面变体: {data!r}") from e
+
+
+def _variants_from_list(variants: Any) -> tuple[CoverVariant, ...]:
+    if not variants:
+        return ()
+    return tuple(v if isinstance(v, CoverVariant) else CoverVariant.from_dict(v) for v in variants)
+
+
+@dataclass(slots=True)
+class Song:
+    """
+    单首歌曲的解析结果
+    
+    Attributes:
+        title: 歌曲名
+        subtitle: 原唱歌手
+        date: 发布日期 YYYY-MM-DD
+        cover: 可选，封面存储中共享封面的网页路径，默认为按歌名保存的封面
+        cover_variants: 封面变体
+    """
+    
+    title: str
+    subtitle: str = ''
+    date: str = ''
+    cover: str | None = None
+    cover_variants: tuple[CoverVariant, ...] = ()
+    
+    def __post_init__(self):
+        self.subtitle = intern_text(self.subtitle)
+        self.date = intern_text(self.date)
+    
+    def to_dict(self) -> dict:
+        """转换为清单中保存的字典"""
+        data = {'title': self.title, 'subtitle': self.subtitle, 'date': self.date}
+        if self.cover:
+            data['cover'] = self.cover
+        if self.cover_variants:
+            data['cover_variants'] = [v.to_dict() for v in self.cover_variants]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Song':
+        """从清单中保存的字典还原"""
+        return cls(
+            title=data.get('title', ''),
+            subtitle=data.get('subtitle', ''),
+            date=data.get('date', ''),
+            cover=data.get('cover') or None,
+            cover_variants=_variants_from_list(data.get('cover_variants')),
+        )
+
+
+@dataclass(slots=True)
+class SongMetadata:
+    """
+    单首歌曲的导出元数据
+    
+    封面和音频路径默认由共享的路径前缀和歌曲名拼接得到，不为每首歌单独保存；
+    与默认规则不同的路径（如封面存储中的共享封面）保存在 custom_cover / custom_audio 中。
+    
+    Attributes:
+        title: 歌曲名
+        subtitle: 原唱歌手
+        date: 发布日期 YYYY-MM-DD
+        artist: 翻唱歌手
+        tags: 标签
+        cover_variants: 封面变体
+        cover_prefix / audio_prefix: 封面/音频路径前缀
+        custom_cover / custom_audio: 可选，完整的封面/音频路径
+        extra: 可选，已有元数据文件中的其他字段，合并时原样保留
+        omitted: 已有元数据文件中缺少的字段（见 OPTIONAL_KEYS），导出时同样省略
+    """
+    
+    title: str
+    subtitle: str = ''
+    date: str = ''
+    artist: str = DEFAULT_ARTIST
+    tags: tuple[str, ...] = DEFAULT_TAGS
+    cover_variants: tuple[CoverVariant, ...] = ()
+    cover_prefix: str = DEFAULT_COVER_PREFIX
+    audio_prefix: str = DEFAULT_AUDIO_PREFIX
+    custom_cover: str | None = None
+    custom_audio: str | None = None
+    extra: dict | None = None
+    omitted: tuple[str, ...] = ()
+    
+    @property
+    def cover(self) -> str:
+        """封面路径"""
+        return self.custom_cover or f"{self.cover_prefix}/{self.title}.jpg"
+    
+    @property
+    def audio(self) -> str:
+        """音频路径"""
+        return self.custom_audio or f"{self.audio_prefix}/{self.title}.mp3"
+    
+    def to_dict(self) -> dict:
+        """转换为导出格式的字典（键顺序与导出文件一致）"""
+        data = {
+            'title': self.title,
+            'subtitle': self.subtitle,
+            'artist': self.artist,
+            'date': self.date,
+            'cover': self.cover,
+            'audio': self.audio,
+            'tags': list(self.tags),
+        }
+        if self.cover_variants:
+            data['cover_variants'] = [v.to_dict() for v in self.cover_variants]
+        for key in self.omitted:
+            del data[key]
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SongMetadata':
+        """
+        从导出格式的字典还原（如读取已有的元数据文件）
+        
+        符合默认规则的封面/音频路径不单独保存，与本次生成的记录比较时结果一致；
+        缺少的字段记录在 omitted 中，导出时不会补上默认值。
+        
+        Raises:
+            ValueError: 字段类型无效
+        """
+        title = data.get('title') or ''
+        if not isinstance(title, str):
+            raise ValueError(f"无效的歌曲名: {title!r}")
+        tags = data.get('tags')
+        cover = data.get('cover')
+        audio = data.get('audio')
+        extra = {key: value for key, value in data.items() if key not in METADATA_KEYS}
+        return cls(
+            title=title,
+            subtitle=intern_text(data.get('subtitle')),
+            date=intern_text(data.get('date')),
+            artist=intern_text(data.get('artist')),
+            tags=intern_tags(tags if isinstance(tags, list) else [] if tags is None else [tags]),
+            cover_variants=_variants_from_list(data.get('cover_variants')),
+            custom_cover=cover if cover and cover != f"{DEFAULT_COVER_PREFIX}/{title}.jpg" else None,
+            custom_audio=audio if audio and audio != f"{DEFAULT_AUDIO_PREFIX}/{title}.mp3" else None,
+            extra=extra or None,
+            omitted=tuple(key for key in OPTIONAL_KEYS if key not in data),
+        )
@@ -0,0 +1,345 @@
+"""
+目录监视模块
+监视源目录中MP3/JSON文件的新增、修改和删除，并判断新文件是否已写入完成
+Linux 下使用 inotify，其他平台或 inotify 不可用时改为定时轮询
+"""
+
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Iterable
+
+from core.records import SongPair
+
+
+# 需要关注的文件类型
+WATCHED_SUFFIXES = ('.mp3', '.json')
+
+# 轮询方式的默认间隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 文件大小和修改时间保持不变多久后视为写入完成（秒）
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# MP3写入完成后等待对应JSON的最长时间（秒），超时后按无JSON处理
+DEFAULT_PAIR_WAIT_SECONDS = 30.0
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# 不订阅 IN_MODIFY：大文件写入过程中会持续产生该事件，写入完成以 IN_CLOSE_WRITE 为准
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+# struct inotify_event 的定长部分: wd, mask, cookie, len
+_EVENT = struct.Struct('iIII')
+
+# 每次读取事件的缓冲区大小
+_EVENT_BUFFER_SIZE = 64 * 1024
+
+
+def _is_watched(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in WATCHED_SUFFIXES
+
+
+def _walk_dirs(roots: Iterable[Path], recursive: bool, exclude: set[Path]) -> list[Path]:
+    """列出需要监视的目录（递归时包含子目录，跳过排除的目录）"""
+    dirs = []
+    pending = list(roots)
+    seen = set()
+    while pending:
+        directory = pending.pop(0)
+        real_dir = directory.resolve()
+        if real_dir in seen or real_dir in exclude:
+            continue
+        seen.add(real_dir)
+        dirs.append(directory)
+        if not recursive:
+            continue
+        try:
+            with os.scandir(directory) as it:
+                pending.extend(Path(entry.path) for entry in it if entry.is_dir())
+        except OSError:
+            continue
+    return dirs
+
+
+class _Inotify:
+    """基于 ctypes 调用的最小 inotify 封装"""
+    
+    def __init__(self):
+        """
+        Raises:
+            OSError: 当前平台不支持 inotify
+        """
+        # ctypes 仅在监视模式下导入
+        import ctypes
+        import ctypes.util
+        
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("未找到 libc")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("libc 不支持 inotify")
+        
+        self._libc = libc
+        self._get_errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches: dict[int, Path] = {}
+    
+    def add_watch(self, path: Path) -> None:
+        """
+        监视目录
+        
+        Raises:
+            OSError: 添加失败（如超出 max_user_watches 限制）
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        self.watches[wd] = path
+    
+    def read_events(self) -> list[tuple[Path | None, int, str]]:
+        """读取全部待处理事件，返回 (所在目录, 掩码, 文件名) 列表"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _EVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                events.append((self.watches.get(wd), mask, name))
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+    
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    源目录监视器
+    
+    wait() 阻塞直到源目录中的MP3/JSON文件（或子目录）发生变化，或超时。
+    不记录具体变化了哪些文件，调用方收到通知后重新扫描目录即可——
+    扫描结果与清单对比就能得出需要处理的文件，监视器只负责避免无意义的轮询扫描。
+    """
+    
+    def __init__(self, source_dirs: Iterable[str | Path], recursive: bool = False,
+                 exclude: Iterable[str | Path] = (), poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Args:
+            source_dirs: 源目录
+            recursive: 是否监视子目录
+            exclude: 递归时跳过的目录（如位于源目录内的输出目录）
+            poll_interval: 轮询方式的扫描间隔（秒）
+        """
+        self.source_dirs = [Path(p) for p in source_dirs]
+        self.recursive = recursive
+        self.exclude = {Path(p).resolve() for p in exclude}
+        self.poll_interval = poll_interval
+        self._inotify = None
+        self._snapshot = None
+        
+        try:
+            self._inotify = _Inotify()
+            for directory in _walk_dirs(self.source_dirs, recursive, self.exclude):
+                self._inotify.add_watch(directory)
+        except OSError as e:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            print(f"[警告] 无法使用 inotify（{e}），改为每 {poll_interval:g}s 轮询一次")
+            self._snapshot = self._take_snapshot()
+    
+    @property
+    def backend(self) -> str:
+        """当前使用的监视方式: 'inotify' 或 'polling'"""
+        return 'inotify' if self._inotify is not None else 'polling'
+    
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        等待源目录发生变化
+        
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+        
+        Returns:
+            是否发生了变化（超时返回False）
+        """
+        if self._inotify is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_polling(timeout)
+    
+    def _wait_inotify(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._inotify.fd], [], [], remaining)
+            if not readable:
+                return False
+            if self._handle_events(self._inotify.read_events()):
+                return True
+    
+    def _handle_events(self, events: list[tuple[Path | None, int, str]]) -> bool:
+        """处理事件，为新建的子目录添加监视；返回是否有需要关注的变化"""
+        changed = False
+        for directory, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出时无法得知丢失了哪些事件，按有变化处理
+                changed = True
+                continue
+            if directory is None:
+                continue
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    # 新目录中可能已有文件，添加监视后按有变化处理
+                    for subdir in _walk_dirs([directory / name], True, self.exclude):
+                        try:
+                            self._inotify.add_watch(subdir)
+                        except OSError as e:
+                            print(f"[警告] 无法监视目录 {subdir}: {e}")
+                    changed = True
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changed = True
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF) or _is_watched(name):
+                changed = True
+        return changed
+    
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """记录监视目录中全部MP3/JSON文件的大小和修改时间"""
+        snapshot = {}
+        for directory in _walk_dirs(self.source_dirs, self.recursive, self.exclude):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if _is_watched(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+    
+    def _wait_polling(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            interval = self.poll_interval
+            if deadline is not None:
+                interval = min(interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(interval)
+            snapshot = self._take_snapshot()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+    
+    def close(self) -> None:
+        """停止监视"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+    
+    def __enter__(self) -> 'DirectoryWatcher':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FileSettler:
+    """
+    判断文件是否已写入完成（防抖）
+    
+    文件的大小和修改时间在连续观察中保持 settle_seconds 不变才视为完成，
+    正在复制或上传的文件会被推迟到下一次检查。
+    """
+    
+    def __init__(self, settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 pair_wait_seconds: float = DEFAULT_PAIR_WAIT_SECONDS):
+        """
+        Args:
+            settle_seconds: 文件保持不变多久后视为写入完成（秒）
+            pair_wait_seconds: MP3写入完成后等待对应JSON的最长时间（秒）
+        """
+        self.settle_seconds = settle_seconds
+        self.pair_wait_seconds = pair_wait_seconds
+        # 路径 -> (大小, 修改时间, 首次观察到该状态的时间)
+        self._observed: dict[Path, tuple[int, int, float]] = {}
+    
+    def _stable_for(self, path: Path, now: float) -> float | None:
+        """文件保持当前状态的时长（秒），文件不存在时返回None"""
+        try:
+            stat = path.stat()
+        except OSError:
+            self._observed.pop(path, None)
+            return None
+        
+        state = (stat.st_size, stat.st_mtime_ns)
+        observed = self._observed.get(path)
+        if observed is None or observed[:2] != state:
+            self._observed[path] = (*state, now)
+            return 0.0
+        return now - observed[2]
+    
+    def is_ready(self, pair: SongPair) -> bool:
+        """
+        判断文件对是否可以处理
+        
+        MP3和JSON都需写入完成；尚无JSON时，等待 pair_wait_seconds 后按无JSON处理，
+        与非监视模式一致。
+        
+        Args:
+            pair: scan_source_directory 返回的文件对
+        
+        Returns:
+            是否可以处理
+        """
+        now = time.monotonic()
+        mp3_path = pair.mp3_path
+        json_path = pair.json_path
+        # 两个文件同时开始观察，等待时间不叠加
+        mp3_stable = self._stable_for(mp3_path, now)
+        json_stable = self._stable_for(json_path, now) if json_path is not None else None
+        if mp3_stable is None and json_path is not None:
+            self._observed.pop(json_path, None)
+        if mp3_stable is None or mp3_stable < self.settle_seconds:
+            return False
+        
+        if json_path is not None:
+            if json_stable is None or json_stable < self.settle_seconds:
+                return False
+            self._observed.pop(json_path, None)
+        elif mp3_stable < self.pair_wait_seconds:
+            return False
+        
+        self._observed.pop(mp3_path, None)
+        return True
+    
+    @property
+    def pending(self) -> int:
+        """正在等待写入完成的文件数"""
+        return len(self._observed)
@@ -3,31 +3,139 @@
 
 用法:
     uv run python cover.py <分享链接> [保存路径]
-    
+    uv run python cover.py --input links.txt [--output-dir ./covers] [--workers 8]
+
 示例:
     uv run python cover.py "https://c.y.qq.com/base/fcgi-bin/u?__=xxx"
     uv run python cover.py "https://y.qq.com/n/ryqq/songDetail/xxx" ./cover.jpg
+    uv run python cover.py -i links.txt -o ./covers
+    cat links.txt | uv run python cover.py -i - -o ./covers
 """
 
+import argparse
+import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from api.qq_music import get_api
+from api.defaults import DEFAULT_CACHE_DIR, DEFAULT_MAX_RETRIES, DEFAULT_TTL_DAYS
+from utils.helpers import ensure_directory, safe_filename
 
+# API层（requests 及其依赖）在实际下载时才导入，--help 和参数错误无需承担其启动开销
 
-def main():
-    if len(sys.argv) < 2:
-        print("用法: uv run python cover.py <QQ音乐分享链接> [保存路径]")
-        print()
-        print("示例:")
-        print('  uv run python cover.py "https://c.y.qq.com/base/fcgi-bin/u?__=xxx"')
-        print('  uv run python cover.py "https://y.qq.com/n/ryqq/songDetail/xxx" ./cover.jpg')
-        sys.exit(1)
+
+# 批量模式的报告文件名（保存在输出目录下）
+REPORT_NAME = 'cover_report.json'
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        description='封面下载器 - 从QQ音乐分享链接下载封面',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例:
+  uv run python cover.py "https://c.y.qq.com/base/fcgi-bin/u?__=xxx"
+  uv run python cover.py "https://y.qq.com/n/ryqq/songDetail/xxx" ./cover.jpg
+  uv run python cover.py -i links.txt -o ./covers --workers 8
+  cat links.txt | uv run python cover.py -i - -o ./covers
+        '''
+    )
+    
+    parser.add_argument(
+        'link',
+        nargs='?',
+        help='QQ音乐分享链接（单个下载）'
+    )
+    
+    parser.add_argument(
+        'save_path',
+        nargs='?',
+        help='封面保存路径（默认: ./<歌名>.jpg）'
+    )
+    
+    parser.add_argument(
+        '-i', '--input',
+        type=str,
+        default=None,
+        help='批量模式：从文件读取分享链接，每行一个，- 表示标准输入；空行和 # 开头的行会被忽略'
+    )
+    
+    parser.add_argument(
+        '-o', '--output-dir',
+        type=str,
+        default='.',
+        help='批量模式的封面保存目录（默认: 当前目录）'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=8,
+        help='批量模式下并发解析链接/下载封面的线程数（默认: 8）'
+    )
+    
+    parser.add_argument(
+        '--report',
+        type=str,
+        default=None,
+        help=f'批量模式的报告文件路径（默认: <output-dir>/{REPORT_NAME}）'
+    )
+    
+    parser.add_argument(
+        '--refresh-covers',
+        action='store_true',
+        help='批量模式下对已存在的封面发送条件请求检查更新；默认直接跳过'
+    )
+    
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=0,
+        help='每秒最多发起的QQ音乐请求数（默认: 0，即不限速）'
+    )
+    
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f'请求遇到限流、服务端错误或超时时的最大重试次数（默认: {DEFAULT_MAX_RETRIES}）'
+    )
     
-    share_link = sys.argv[1]
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'歌曲详情缓存目录（默认: {DEFAULT_CACHE_DIR}）'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='忽略已缓存的歌曲详情，重新查询并更新缓存'
+    )
+    
+    args = parser.parse_args()
+    if args.input is None and args.link is None:
+        parser.error('请提供分享链接，或使用 --input 指定链接列表')
+    if args.input is not None and args.link is not None:
+        parser.error('--input 不能与单个分享链接同时使用')
+    if args.workers < 1:
+        parser.error('--workers 必须为正整数')
+    if args.rate_limit < 0:
+        parser.error('--rate-limit 不能为负数')
+    if args.max_retries < 0:
+        parser.error('--max-retries 不能为负数')
+    return args
+
+
+def download_single(share_link: str, save_path: str | None) -> None:
+    """下载单个分享链接对应的封面，失败时以非零状态退出"""
+    from api.qq_music import get_api
     
     # 获取API实例
     api = get_api()
@@ -56,8 +164,8 @@ def main():
     print(f"歌手: {artist}")
     
     # 确定保存路径
-    if len(sys.argv) >= 3:
-        save_path = Path(sys.argv[2])
+    if save_path:
+        save_path = Path(save_path)
     else:
         save_path = Path(f"./{title}.jpg")
     
@@ -74,5 +182,208 @@ def main():
         sys.exit(1)
 
 
+def read_links(source: str) -> list[str]:
+    """
+    读取分享链接列表
+    
+    Args:
+        source: 链接文件路径，- 表示标准输入
+    
+    Returns:
+        链接列表（已去除空行、注释和完全相同的重复链接，保持原有顺序）
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    links = (line.strip() for line in lines)
+    return list(dict.fromkeys(link for link in links if link and not link.startswith('#')))
+
+
+def assign_cover_paths(songs: dict[str, dict], output_dir: Path) -> dict[str, Path]:
+    """
+    为每首歌曲分配封面文件名
+    
+    默认使用 <歌名>.jpg；不同歌曲重名时追加歌曲mid以免互相覆盖。
+    
+    Args:
+        songs: 歌曲mid -> 歌曲信息
+        output_dir: 封面保存目录
+    
+    Returns:
+        歌曲mid -> 封面保存路径
+    """
+    names: dict[str, list[str]] = {}
+    for song_mid, info in songs.items():
+        names.setdefault(safe_filename(info['title']), []).append(song_mid)
+    
+    paths = {}
+    for name, mids in names.items():
+        for song_mid in mids:
+            filename = f"{name}.jpg" if len(mids) == 1 else f"{name}_{song_mid}.jpg"
+            paths[song_mid] = output_dir / filename
+    return paths
+
+
+def download_batch(links: list[str], output_dir: Path, workers: int) -> list[dict]:
+    """
+    批量下载分享链接对应的封面
+    
+    依次并发完成三个阶段：解析链接得到歌曲mid、按mid查询歌曲信息、下载封面；
+    指向同一首歌的链接只查询和下载一次。
+    
+    Args:
+        links: 分享链接列表
+        output_dir: 封面保存目录
+        workers: 并发线程数
+    
+    Returns:
+        每个链接的处理结果，顺序与 links 一致
+    """
+    from api.qq_music import get_thread_api
+    
+    def resolve(link: str) -> str | None:
+        return get_thread_api().parse_share_link(link)
+    
+    def lookup(song_mid: str) -> dict:
+        return get_thread_api().get_song_info_by_mid(song_mid)
+    
+    def fetch(song_mid: str) -> str:
+        return get_thread_api().fetch_cover(songs[song_mid]['cover_url'], cover_paths[song_mid])
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # 1. 解析链接（短链接需要跟随重定向）
+        print(f"[1/3] 解析 {len(links)} 个链接...")
+        link_mids = dict(zip(links, executor.map(resolve, links)))
+        
+        # 2. 查询歌曲信息，同一首歌只查询一次
+        unique_mids = list(dict.fromkeys(mid for mid in link_mids.values() if mid))
+        print(f"[2/3] 查询 {len(unique_mids)} 首歌曲信息...")
+        infos = dict(zip(unique_mids, executor.map(lookup, unique_mids)))
+        songs = {mid: info for mid, info in infos.items() if info.get('title') and info.get('cover_url')}
+        
+        # 3. 下载封面
+        cover_paths = assign_cover_paths(songs, output_dir)
+        print(f"[3/3] 下载 {len(songs)} 张封面...")
+        statuses = dict(zip(songs, executor.map(fetch, list(songs))))
+    
+    results = []
+    first_link: dict[str, str] = {}
+    for link in links:
+        song_mid = link_mids[link]
+        info = infos.get(song_mid, {}) if song_mid else {}
+        result = {
+            'link': link,
+            'song_mid': song_mid,
+            'title': info.get('title'),
+            'artist': info.get('artist'),
+            'cover_path': str(cover_paths[song_mid]) if song_mid in cover_paths else None,
+        }
+        
+        if song_mid is None:
+            result['status'] = 'invalid_link'
+        elif song_mid not in songs:
+            result['status'] = 'not_found'
+        elif song_mid in first_link:
+            result['status'] = 'duplicate'
+            result['duplicate_of'] = first_link[song_mid]
+        else:
+            result['status'] = statuses[song_mid]
+            first_link[song_mid] = link
+        
+        results.append(result)
+    
+    return results
+
+
+def write_report(results: list[dict], report_path: Path, seconds: float) -> dict:
+    """
+    写入批量下载报告
+    
+    Args:
+        results: download_batch 返回的处理结果
+        report_path: 报告文件路径
+        seconds: 总耗时（秒）
+    
+    Returns:
+        按状态统计的汇总信息
+    """
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    
+    summary = {
+        'links': len(results),
+        'songs': len({r['song_mid'] for r in results if r['song_mid']}),
+        'seconds': round(seconds, 3),
+        'status': counts,
+    }
+    
+    ensure_directory(report_path.parent)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'results': results}, f, ensure_ascii=False, indent=2)
+    
+    return summary
+
+
+def main():
+    args = parse_args()
+    
+    if args.input is None:
+        download_single(args.link, args.save_path)
+        return
+    
+    try:
+        links = read_links(args.input)
+    except OSError as e:
+        print(f"[错误] 无法读取链接列表: {e}")
+        sys.exit(1)
+    
+    if not links:
+        print("[完成] 未找到分享链接")
+        return
+    
+    output_dir = ensure_directory(Path(args.output_dir).resolve())
+    report_path = Path(args.report) if args.report else output_dir / REPORT_NAME
+    
+    from api.cache import SearchCache
+    from api.cover_index import CoverIndex
+    from api.qq_music import QQMusicAPI, configure_api
+    from api.transport import Transport
+    
+    # 所有工作线程共享缓存、封面索引和传输策略
+    cache = SearchCache(Path(args.cache_dir).expanduser(), ttl=DEFAULT_TTL_DAYS * 86400, refresh=args.refresh)
+    cover_index = CoverIndex(output_dir)
+    transport = Transport(
+        rate_limit=args.rate_limit or None,
+        max_concurrency=args.workers,
+        max_retries=args.max_retries,
+        classify=QQMusicAPI.endpoint_name,
+    )
+    configure_api(cache=cache, cover_index=cover_index, refresh_covers=args.refresh_covers,
+                  transport=transport)
+    
+    print(f"封面目录: {output_dir}")
+    print("-" * 50)
+    
+    start = time.perf_counter()
+    results = download_batch(links, output_dir, args.workers)
+    cover_index.save()
+    summary = write_report(results, report_path, time.perf_counter() - start)
+    
+    print("-" * 50)
+    print(f"[完成] {summary['links']} 个链接，{summary['songs']} 首歌曲，耗时 {summary['seconds']:.1f}s")
+    for status, count in sorted(summary['status'].items()):
+        print(f"       {status}: {count}")
+    print(f"       歌曲详情缓存: 命中 {cache.hits} 次，未命中 {cache.misses} 次")
+    print(f"       报告文件: {report_path}")
+    cache.close()
+    
+    if summary['status'].get('failed') or summary['status'].get('invalid_link') or summary['status'].get('not_found'):
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,4 @@
+"""
+单元测试
+使用标准库 unittest 编写，运行: uv run python -m unittest
+"""
@@ -0,0 +1,53 @@
+"""离线曲库测试"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from api.catalog import CatalogIndex, NormalizerMismatch
+
+
+RECORDS = [
+    {'title': '後來的我們', 'artist': '五月天', 'album_mid': 'm1'},
+    {'title': '愛情轉移', 'artist': '陳奕迅', 'album_mid': None},
+]
+
+
+class CatalogNormalizerTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'catalog.sqlite3'
+        with CatalogIndex(self.path, readonly=False) as index:
+            index.import_records(RECORDS)
+    
+    def test_lookup_with_same_normalizer(self):
+        with CatalogIndex(self.path) as index:
+            self.assertEqual(index.lookup('后来的我们')['artist'], '五月天')
+            self.assertEqual(index.lookup('愛情轉移')['album_mid'], None)
+    
+    def test_readonly_open_refuses_other_normalizer(self):
+        # 模拟导入后安装了 opencc
+        with mock.patch('api.catalog.title_normalizer', return_value='v1/opencc:t2s'):
+            with self.assertRaises(NormalizerMismatch):
+                CatalogIndex(self.path)
+    
+    def test_writable_open_rebuilds_keys(self):
+        def upper_title(title: str) -> str:
+            return title.upper()
+        
+        with mock.patch('api.catalog.title_normalizer', return_value='v2/test'), \
+                mock.patch('api.catalog.normalize_title', upper_title):
+            with CatalogIndex(self.path, readonly=False) as index:
+                self.assertEqual(index.rebuilt, 2)
+            with CatalogIndex(self.path) as index:
+                self.assertEqual(index.lookup('後來的我們')['artist'], '五月天')
+                self.assertIsNone(index.lookup('后来的我们'))
+            with CatalogIndex(self.path, readonly=False) as index:
+                self.assertEqual(index.rebuilt, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
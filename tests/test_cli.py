@@ -0,0 +1,57 @@
+"""命令行处理流程测试"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from api.qq_music import SearchFailed
+from cli import process_all_songs, process_song
+from core.records import SongPair
+
+
+class FailingResolver:
+    """搜索总是失败的解析器"""
+    
+    def resolve(self, song_name: str) -> dict:
+        raise SearchFailed(song_name)
+
+
+class FixedResolver:
+    """返回固定歌手、没有封面的解析器"""
+    
+    def resolve(self, song_name: str) -> dict:
+        return {'artist': '安与骑兵', 'cover_url': None}
+
+
+class ProcessSongTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.covers = Path(tmp.name)
+        self.pair = SongPair(Path(tmp.name), '【星瞳】《红山果》.mp3', '红山果')
+    
+    def test_failed_lookup_is_not_resolved(self):
+        song, messages, status, resolved = process_song(self.pair, '2024-01-02', self.covers, FailingResolver())
+        self.assertFalse(resolved)
+        self.assertIsNone(status)
+        self.assertEqual((song.subtitle, song.date), ('', '2024-01-02'))
+    
+    def test_successful_lookup_is_resolved(self):
+        song, _, _, resolved = process_song(self.pair, '2024-01-02', self.covers, FixedResolver())
+        self.assertTrue(resolved)
+        self.assertEqual(song.subtitle, '安与骑兵')
+    
+    def test_skipped_lookup_is_not_resolved(self):
+        _, _, _, resolved = process_song(self.pair, '2024-01-02', self.covers, None)
+        self.assertFalse(resolved)
+    
+    def test_process_all_songs_keeps_order(self):
+        pairs = [self.pair, SongPair(self.pair.directory, '【星瞳】《晴天》.mp3', '晴天')]
+        songs, resolved = process_all_songs(pairs, ['', ''], self.covers, FailingResolver(), workers=2)
+        self.assertEqual([song.title for song in songs], ['红山果', '晴天'])
+        self.assertEqual(resolved, [False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""封面存储测试"""
+
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from api.cover_store import CoverStore
+
+
+COVER = b'\xff\xd8\xff\xe0cover'
+
+
+class FakeAPI:
+    """按预设结果依次响应 download_to 的假API"""
+    
+    def __init__(self, *failures: bool):
+        self.failures = list(failures)
+        self.calls = 0
+    
+    def download_to(self, url, save_file, validators=None):
+        self.calls += 1
+        if self.failures and self.failures.pop(0):
+            raise requests.ConnectionError('连接被重置')
+        save_file.parent.mkdir(parents=True, exist_ok=True)
+        save_file.write_bytes(COVER)
+        return {'digest': hashlib.sha256(COVER).hexdigest(), 'etag': None, 'last_modified': None}
+
+
+class CoverStoreTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.covers = Path(tmp.name) / 'covers'
+    
+    def make_store(self, api: FakeAPI, **options) -> CoverStore:
+        return CoverStore(self.covers, api_factory=lambda: api, **options)
+    
+    def test_failed_album_is_retried(self):
+        api = FakeAPI(True)
+        store = self.make_store(api)
+        self.assertEqual(store.get('A1', 'http://x/A1.jpg'), (None, 'failed'))
+        path, status = store.get('A1', 'http://x/A1.jpg')
+        self.assertEqual((status, path.read_bytes()), ('downloaded', COVER))
+        self.assertEqual(api.calls, 2)
+    
+    def test_album_is_fetched_once_per_run(self):
+        api = FakeAPI()
+        store = self.make_store(api, refresh=True)
+        store.get('A1', 'http://x/A1.jpg')
+        self.assertEqual(store.get('A1', 'http://x/A1.jpg')[1], 'skipped')
+        self.assertEqual(api.calls, 1)
+        
+        # 监视模式的下一次处理重新检查
+        store.clear()
+        store.get('A1', 'http://x/A1.jpg')
+        self.assertEqual(api.calls, 2)
+    
+    def test_place_failure_is_reported(self):
+        store = self.make_store(FakeAPI())
+        dest = self.covers / '红山果.jpg'
+        with mock.patch('api.cover_store.place_file', side_effect=OSError(28, '磁盘空间不足')):
+            self.assertEqual(store.place('A1', 'http://x/A1.jpg', dest), (None, 'failed'))
+        self.assertEqual(store.place('A1', 'http://x/A1.jpg', dest), (None, 'skipped'))
+        self.assertEqual(dest.read_bytes(), COVER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""封面变体测试"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from core.cover_variants import CoverVariants
+
+
+@unittest.skipIf(Image is None, '需要 Pillow')
+class CoverVariantsTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.covers = Path(tmp.name) / 'covers'
+        self.covers.mkdir()
+        self.small = self.make_cover('红山果.jpg', (100, 50), 'red')
+        self.wide = self.make_cover('晴天.jpg', (400, 200), 'blue')
+    
+    def make_cover(self, name: str, size: tuple[int, int], color: str) -> Path:
+        path = self.covers / name
+        Image.new('RGB', size, color).save(path, 'JPEG')
+        return path
+    
+    def widths(self, result, cover: Path) -> list[tuple[str, int]]:
+        return [(variant.format, variant.width) for variant in result[cover]]
+    
+    def test_width_is_rendered_width(self):
+        variants = CoverVariants(self.covers, [64, 300], ['webp', 'jpeg'], workers=1)
+        result = variants.process([self.small, self.wide])
+        variants.save()
+        self.assertEqual(variants.generated, 8)
+        self.assertEqual(self.widths(result, self.small),
+                         [('webp', 64), ('jpeg', 64), ('webp', 100), ('jpeg', 100)])
+        self.assertEqual(self.widths(result, self.wide),
+                         [('webp', 64), ('jpeg', 64), ('webp', 300), ('jpeg', 300)])
+        
+        # 已存在的变体从索引中取得宽度
+        again = CoverVariants(self.covers, [64, 300], ['webp', 'jpeg'], workers=1)
+        self.assertEqual(again.process([self.small, self.wide]), result)
+        self.assertEqual((again.generated, again.skipped), (0, 8))
+    
+    def test_width_of_variants_from_old_index(self):
+        variants = CoverVariants(self.covers, [300], ['webp'], workers=1)
+        variants.process([self.small])
+        variants.save()
+        # 版本1的索引只有源封面指纹
+        index = json.loads(variants.index_path.read_text(encoding='utf-8'))
+        variants.index_path.write_text(json.dumps(index['covers']), encoding='utf-8')
+        
+        again = CoverVariants(self.covers, [300], ['webp'], workers=1)
+        self.assertEqual(self.widths(again.process([self.small]), self.small), [('webp', 100)])
+        self.assertEqual(again.skipped, 1)
+    
+    def test_prune_removes_stale_variants(self):
+        variants = CoverVariants(self.covers, [64, 300], ['webp'], workers=1)
+        variants.process([self.small, self.wide])
+        variants.save()
+        
+        self.wide.unlink()
+        self.make_cover('红山果.jpg', (120, 60), 'green')
+        again = CoverVariants(self.covers, [64], ['webp'], workers=1)
+        result = again.process([self.small])
+        self.assertEqual(again.prune(), 4)
+        again.save()
+        
+        files = sorted(path for path in again.root.rglob('*') if path.is_file() and path != again.index_path)
+        self.assertEqual(files, [self.covers / variant.src.removeprefix('/covers/') for variant in result[self.small]])
+        index = json.loads(again.index_path.read_text(encoding='utf-8'))
+        self.assertEqual(list(index['covers']), [str(self.small.resolve())])
+        self.assertEqual(len(index['widths']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
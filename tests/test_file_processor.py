@@ -0,0 +1,130 @@
+"""源目录扫描与文件暂存测试"""
+
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.file_processor import _kernel_copy, scan_source_directory, stage_file
+from core.id3 import song_frames, write_tags
+
+
+# 最小的 MPEG 音频帧头，后接填充字节
+MP3_DATA = b'\xff\xfb\x90\x64' + bytes(range(256)) * 16
+
+
+def sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class ScanSourceTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+    
+    def scan(self, *names: str) -> dict[str, str | None]:
+        for name in names:
+            (self.root / name).write_bytes(b'')
+        return {pair.song_name: pair.json_name for pair in scan_source_directory(self.root)}
+    
+    def test_json_matching_order(self):
+        pairs = self.scan(
+            '【星瞳】《红山果》.mp3', '【星瞳】《红山果》.json',
+            '【星瞳】《晴天》.mp3', '【星瞳】《晴天》BW.json',
+            '【星瞳】《稻香》.mp3', '稻香 2024-01-02.json',
+            '【星瞳】《七里香》.mp3',
+        )
+        self.assertEqual(pairs, {
+            '红山果': '【星瞳】《红山果》.json',
+            '晴天': '【星瞳】《晴天》BW.json',
+            '稻香': '稻香 2024-01-02.json',
+            '七里香': None,
+        })
+    
+    def test_json_with_different_title_still_pairs(self):
+        # JSON 中《》内的标题带有后缀或全角标点，按包含歌曲名匹配
+        pairs = self.scan(
+            '【星瞳】《红山果》.mp3', '【星瞳】《红山果(Live)》.json',
+            '【星瞳】《晴天》.mp3', '【星瞳】《晴天！》.json',
+        )
+        self.assertEqual(pairs, {'红山果': '【星瞳】《红山果(Live)》.json', '晴天': '【星瞳】《晴天！》.json'})
+
+
+class StageFileTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / 'source.mp3'
+        self.src.write_bytes(MP3_DATA)
+        self.dst = self.root / 'out' / '歌名.mp3'
+        self.dst.parent.mkdir()
+    
+    def test_copy_skips_up_to_date_target(self):
+        self.assertEqual(stage_file(self.src, self.dst, 'copy'), 'copy')
+        self.assertEqual(stage_file(self.src, self.dst, 'copy'), 'skipped')
+        self.assertEqual(self.dst.read_bytes(), MP3_DATA)
+    
+    def test_reserve_tag_skips_tagged_copy(self):
+        self.assertEqual(stage_file(self.src, self.dst, reserve_tag=True), 'tag_copy')
+        self.assertEqual(stage_file(self.src, self.dst, reserve_tag=True), 'skipped')
+    
+    def test_reserve_tag_recopies_hardlinked_target(self):
+        # 之前以 hardlink 暂存，目标与源文件是同一文件
+        self.assertEqual(stage_file(self.src, self.dst, 'hardlink'), 'hardlink')
+        self.assertTrue(os.path.samefile(self.src, self.dst))
+        before = sha256(self.src)
+        
+        self.assertEqual(stage_file(self.src, self.dst, reserve_tag=True), 'tag_copy')
+        self.assertFalse(os.path.samefile(self.src, self.dst))
+        self.assertEqual(write_tags(self.dst, song_frames(title='歌名', artist='歌手')), 'in_place')
+        
+        self.assertEqual(sha256(self.src), before)
+        self.assertEqual(self.src.stat().st_nlink, 1)
+    
+    def test_reserve_tag_recopies_target_with_other_links(self):
+        stage_file(self.src, self.dst, reserve_tag=True)
+        os.link(self.dst, self.root / 'other.mp3')
+        self.assertEqual(stage_file(self.src, self.dst, reserve_tag=True), 'tag_copy')
+        self.assertEqual(self.dst.stat().st_nlink, 1)
+
+
+class KernelCopyTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / 'source.mp3'
+        self.src.write_bytes(MP3_DATA)
+        self.dst = self.root / 'target.mp3'
+    
+    @unittest.skipUnless(hasattr(os, 'sendfile'), '需要 os.sendfile')
+    def test_copy_file_range_returning_zero_falls_back_to_sendfile(self):
+        with mock.patch('os.copy_file_range', return_value=0, create=True):
+            _kernel_copy(self.src, self.dst)
+        self.assertEqual(self.dst.read_bytes(), MP3_DATA)
+    
+    def test_no_progress_raises_instead_of_truncating(self):
+        with mock.patch('os.copy_file_range', return_value=0, create=True), \
+                mock.patch('os.sendfile', return_value=0, create=True):
+            with self.assertRaises(OSError):
+                _kernel_copy(self.src, self.dst)
+    
+    def test_unsupported_platform_falls_back_to_copy(self):
+        # 模拟 Windows：没有 fcntl、copy_file_range、sendfile，也不支持硬链接
+        with mock.patch.dict('sys.modules', {'fcntl': None}), \
+                mock.patch.object(os, 'copy_file_range', None, create=True), \
+                mock.patch.object(os, 'sendfile', None, create=True), \
+                mock.patch('os.link', side_effect=OSError('不支持硬链接')):
+            self.assertEqual(stage_file(self.src, self.dst, 'auto'), 'copy')
+        self.assertEqual(self.dst.read_bytes(), MP3_DATA)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""ID3v2 标签测试"""
+
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.id3 import (
+    build_tag,
+    copy_with_tag,
+    read_tag,
+    same_audio,
+    song_frames,
+    text_frame,
+    write_tags,
+)
+
+
+AUDIO = b'\xff\xfb\x90\x64' + bytes(range(256)) * 16
+
+
+def v23_tag(frames: list[tuple[str, bytes]]) -> bytes:
+    """构造 ID3v2.3 标签（帧大小为普通大端整数）"""
+    body = b''.join(frame_id.encode('ascii') + len(data).to_bytes(4, 'big') + b'\x00\x00' + data
+                    for frame_id, data in frames)
+    size = bytes(((len(body) >> shift) & 0x7F) for shift in (21, 14, 7, 0))
+    return b'ID3\x03\x00\x00' + size + body
+
+
+class TagRoundTripTest(unittest.TestCase):
+    
+    def test_build_then_read(self):
+        frames = list(song_frames('红山果', '安与骑兵', '2024-01-02', b'\xff\xd8cover').items())
+        tag = build_tag(frames, padding=100)
+        parsed = read_tag(io.BytesIO(tag + AUDIO))
+        self.assertEqual(parsed.version, 4)
+        self.assertEqual(parsed.size, len(tag))
+        self.assertEqual(parsed.frames, frames)
+    
+    def test_fixed_size(self):
+        frames = [('TIT2', text_frame('晴天'))]
+        tag = build_tag(frames, size=64)
+        self.assertEqual(len(tag), 64)
+        self.assertEqual(read_tag(io.BytesIO(tag)).frames, frames)
+        with self.assertRaises(ValueError):
+            build_tag(frames, size=16)
+    
+    def test_v23_drops_obsolete_frames(self):
+        tag = v23_tag([('TIT2', text_frame('稻香')), ('TYER', text_frame('2008'))])
+        parsed = read_tag(io.BytesIO(tag + AUDIO))
+        self.assertEqual((parsed.version, parsed.size), (3, len(tag)))
+        self.assertEqual(parsed.frames, [('TIT2', text_frame('稻香'))])
+    
+    def test_no_tag(self):
+        self.assertIsNone(read_tag(io.BytesIO(AUDIO)))
+
+
+class WriteTagsTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / 'src.mp3'
+        self.src.write_bytes(v23_tag([('TIT2', text_frame('旧标题')), ('COMM', b'\x03eng\x00keep')]) + AUDIO)
+        self.dst = self.root / 'dst.mp3'
+    
+    def read_frames(self, path: Path) -> dict[str, bytes]:
+        with open(path, 'rb') as f:
+            return dict(read_tag(f).frames)
+    
+    def test_copy_keeps_foreign_frames_and_audio(self):
+        copy_with_tag(self.src, self.dst, song_frames('红山果', '安与骑兵'), padding=1024)
+        frames = self.read_frames(self.dst)
+        self.assertEqual(frames['TIT2'], text_frame('红山果'))
+        self.assertEqual(frames['COMM'], b'\x03eng\x00keep')
+        self.assertTrue(self.dst.read_bytes().endswith(AUDIO))
+        self.assertTrue(same_audio(self.src, self.dst))
+    
+    def test_in_place_then_rewritten(self):
+        copy_with_tag(self.src, self.dst, padding=1024)
+        size = self.dst.stat().st_size
+        
+        self.assertEqual(write_tags(self.dst, song_frames(date='2024-01-02')), 'in_place')
+        self.assertEqual(self.dst.stat().st_size, size)
+        self.assertEqual(self.read_frames(self.dst)['TDRC'], text_frame('2024-01-02'))
+        
+        self.assertEqual(write_tags(self.dst, song_frames(cover=b'\xff\xd8' * 2048), padding=0), 'rewritten')
+        frames = self.read_frames(self.dst)
+        self.assertEqual((frames['TDRC'], frames['COMM']), (text_frame('2024-01-02'), b'\x03eng\x00keep'))
+        self.assertTrue(same_audio(self.src, self.dst))
+        self.assertEqual(sorted(path.name for path in self.root.iterdir()), ['dst.mp3', 'src.mp3'])
+    
+    def test_copy_file_range_returning_zero_falls_back(self):
+        with mock.patch.object(os, 'copy_file_range', return_value=0, create=True):
+            copy_with_tag(self.src, self.dst, padding=1024)
+        self.assertTrue(self.dst.read_bytes().endswith(AUDIO))
+        self.assertTrue(same_audio(self.src, self.dst))
+    
+    def test_stalled_copy_file_range_raises(self):
+        with mock.patch.object(os, 'copy_file_range', side_effect=[100, 0], create=True):
+            with self.assertRaises(OSError):
+                copy_with_tag(self.src, self.dst, padding=1024)
+    
+    def test_unsupported_tag_is_kept(self):
+        # ID3v2.3 非同步化标签：帧无法逐帧保留
+        original = b'ID3\x03\x00\x80' + bytes([0, 0, 0, 20]) + b'APIC' + bytes(16) + AUDIO
+        self.src.write_bytes(original)
+        self.assertEqual(write_tags(self.src, song_frames('红山果')), 'unsupported')
+        self.assertEqual(self.src.read_bytes(), original)
+        
+        copy_with_tag(self.src, self.dst, song_frames('红山果'))
+        self.assertEqual(self.dst.read_bytes(), original)
+
+
+if __name__ == '__main__':
+    unittest.main()
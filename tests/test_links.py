@@ -0,0 +1,52 @@
+"""文件链接测试"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils.links import place_file
+
+
+class PlaceFileTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / 'site' / 'covers' / 'store' / 'ab' / 'abcdef.jpg'
+        self.src.parent.mkdir(parents=True)
+        self.src.write_bytes(b'\xff\xd8cover')
+        self.dst = self.root / 'site' / 'covers' / '红山果.jpg'
+    
+    def test_symlink_is_relative_and_survives_move(self):
+        self.assertEqual(place_file(self.src, self.dst, 'symlink'), 'symlink')
+        self.assertEqual(os.readlink(self.dst), os.path.join('store', 'ab', 'abcdef.jpg'))
+        
+        moved = self.root / 'moved'
+        shutil.move(self.root / 'site', moved)
+        self.assertEqual((moved / 'covers' / '红山果.jpg').read_bytes(), b'\xff\xd8cover')
+    
+    def test_up_to_date_target_is_skipped(self):
+        for mode in ('symlink', 'hardlink', 'copy'):
+            with self.subTest(mode=mode):
+                self.dst.unlink(missing_ok=True)
+                self.assertEqual(place_file(self.src, self.dst, mode), mode)
+                self.assertEqual(place_file(self.src, self.dst, mode), 'skipped')
+    
+    def test_absolute_symlink_is_replaced(self):
+        os.symlink(self.src.resolve(), self.dst)
+        self.assertEqual(place_file(self.src, self.dst, 'symlink'), 'symlink')
+        self.assertFalse(os.path.isabs(os.readlink(self.dst)))
+    
+    def test_falls_back_to_copy(self):
+        with mock.patch.dict('utils.links._PLACERS', {'hardlink': mock.Mock(side_effect=OSError('不支持硬链接'))}):
+            self.assertEqual(place_file(self.src, self.dst, 'hardlink'), 'copy')
+        self.assertFalse(os.path.samefile(self.src, self.dst))
+        self.assertEqual(self.dst.read_bytes(), b'\xff\xd8cover')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""源文件清单测试"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.manifest import Manifest
+from core.records import Song, SongPair
+
+
+class ManifestApiTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / '【星瞳】《红山果》.mp3').write_bytes(b'audio')
+        self.pair = SongPair(self.root, '【星瞳】《红山果》.mp3', '红山果')
+        self.manifest = Manifest(self.root / 'manifest.json')
+    
+    def test_failed_lookup_is_queried_again(self):
+        self.manifest.update(self.pair, Song('红山果', date='2024-01-02'), api=False)
+        self.assertTrue(self.manifest.is_unchanged(self.pair, need_api=False))
+        self.assertFalse(self.manifest.is_unchanged(self.pair, need_api=True))
+    
+    def test_resolved_lookup_is_reused(self):
+        self.manifest.update(self.pair, Song('红山果', '安与骑兵', '2024-01-02'), api=True)
+        self.assertTrue(self.manifest.is_unchanged(self.pair, need_api=True))
+
+
+class ManifestChangeTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.mp3 = self.root / '【星瞳】《红山果》.mp3'
+        self.mp3.write_bytes(b'audio')
+        self.json = self.root / '【星瞳】《红山果》.json'
+        self.json.write_text('{"date": "2024-01-02"}', encoding='utf-8')
+        self.pair = SongPair(self.root, self.mp3.name, '红山果', self.json.name)
+        self.manifest = Manifest(self.root / 'manifest.json')
+        self.manifest.update(self.pair, Song('红山果', date='2024-01-02'), api=False)
+    
+    def touch(self, path: Path, offset_ns: int = 10 ** 9) -> int:
+        mtime_ns = path.stat().st_mtime_ns + offset_ns
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return mtime_ns
+    
+    def test_touch_keeps_entry_and_records_mtime(self):
+        mtime_ns = self.touch(self.mp3)
+        self.assertTrue(self.manifest.is_unchanged(self.pair, need_api=False))
+        self.assertEqual(self.manifest.entries[Manifest.key(self.pair)]['mp3']['mtime_ns'], mtime_ns)
+    
+    def test_content_change_is_detected(self):
+        for path in (self.mp3, self.json):
+            with self.subTest(path=path.name):
+                original = path.read_bytes()
+                # 大小不变、只改内容
+                path.write_bytes(original[:-1] + b'X')
+                self.touch(path)
+                self.assertFalse(self.manifest.is_unchanged(self.pair, need_api=False))
+                path.write_bytes(original)
+    
+    def test_added_or_removed_json_is_a_change(self):
+        without_json = SongPair(self.root, self.mp3.name, '红山果')
+        self.assertFalse(self.manifest.is_unchanged(without_json, need_api=False))
+        
+        self.manifest.update(without_json, Song('红山果'), api=False)
+        self.assertFalse(self.manifest.is_unchanged(self.pair, need_api=False))
+    
+    def test_output_options_change_is_a_change(self):
+        options = {'link_mode': 'copy', 'cover_store': 'off'}
+        manifest = Manifest.load(self.root, options)
+        manifest.update(self.pair, Song('红山果', date='2024-01-02'), api=False)
+        manifest.save()
+        
+        reordered = dict(reversed(options.items()))
+        self.assertTrue(Manifest.load(self.root, reordered).is_unchanged(self.pair, need_api=False))
+        changed = Manifest.load(self.root, {**options, 'cover_store': 'hardlink'})
+        self.assertFalse(changed.is_unchanged(self.pair, need_api=False))
+    
+    def test_missing_tags_are_a_change(self):
+        self.assertFalse(self.manifest.is_unchanged(self.pair, need_api=False, need_tags=True))
+        self.manifest.update(self.pair, Song('红山果'), api=False, tagged=True)
+        self.assertTrue(self.manifest.is_unchanged(self.pair, need_api=False, need_tags=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""元数据合并测试"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.metadata_generator import create_song_metadata, format_metadata
+from core.metadata_merge import load_metadata, merge_metadata, parse_metadata_js
+
+
+# 手工维护的网站元数据：含生成器不认识的字段，且有的歌曲缺少部分字段
+EXISTING_JS = """export const songs = [
+  {
+    title: '晴天',
+    subtitle: '周杰伦',
+    artist: '星瞳',
+    date: '2023-05-01',
+    cover: '/covers/晴天.jpg',
+    audio: '/audio/晴天.mp3',
+    tags: ['翻唱'],
+    lyrics: 'It\\'s a sunny day\\n故事的小黄花',
+    'play-count': 12,
+    featured: true,
+    links: { bilibili: "BV1xx411c7mD", clips: [1, 2.5, null] },
+  },
+  {
+    title: '稻香',
+    date: '2023-06-01',
+  },
+];"""
+
+
+class ParseMetadataJsTest(unittest.TestCase):
+    
+    def test_generated_js_round_trip(self):
+        metadata = [
+            create_song_metadata('It\'s "晴天"\\\n</script>\u2028', '周杰伦', '2023-05-01', tags=['翻唱', 'a\tb']),
+            create_song_metadata('红山果', '', ''),
+        ]
+        text = format_metadata(metadata, 'js')
+        self.assertEqual(parse_metadata_js(text), [item.to_dict() for item in metadata])
+    
+    def test_hand_edited_literals(self):
+        text = """// 网站元数据
+export const songs = [
+  /* 置顶 */ { "title": "稻香", n: -1.5e2, count: 3, ok: false, gone: undefined, esc: '\\u4e2d\\x41\\'', },
+];"""
+        self.assertEqual(parse_metadata_js(text),
+                         [{'title': '稻香', 'n': -150.0, 'count': 3, 'ok': False, 'gone': None, 'esc': "中A'"}])
+    
+    def test_invalid(self):
+        for text in ('export const songs = {};', 'export const songs = [`模板`];', 'export const songs = [1];'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_metadata_js(text)
+
+
+class MergeJsTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'songs_metadata.js'
+        self.path.write_text(EXISTING_JS, encoding='utf-8')
+    
+    def test_unknown_and_missing_keys_survive_merge(self):
+        before = load_metadata(self.path)
+        new = create_song_metadata('红山果', '安与骑兵', '2024-01-02')
+        _, stats, total = merge_metadata([new], self.path)
+        self.assertEqual((stats['added'], total), (1, 3))
+        
+        after = {item['title']: item for item in load_metadata(self.path)}
+        self.assertEqual(after['晴天'], before[0])
+        self.assertEqual(after['稻香'], before[1])
+        self.assertEqual(after['红山果'], new.to_dict())
+    
+    def test_update_keeps_hand_added_fields(self):
+        before = {item['title']: item for item in load_metadata(self.path)}
+        updated = [
+            create_song_metadata('晴天', '周杰伦', '2023-05-02'),
+            create_song_metadata('稻香', '周杰伦', '2023-06-02'),
+        ]
+        _, stats, total = merge_metadata(updated, self.path)
+        self.assertEqual((stats['updated'], total), (2, 2))
+        
+        after = {item['title']: item for item in load_metadata(self.path)}
+        self.assertEqual(after['晴天'], {**before['晴天'], 'date': '2023-05-02', 'tags': ['翻唱']})
+        self.assertEqual(after['稻香'], {'title': '稻香', 'date': '2023-06-02'})
+        
+        # 再次合并相同内容时不视为更新
+        _, stats, _ = merge_metadata(updated, self.path)
+        self.assertEqual(stats['unchanged'], 2)
+    
+    def test_unchanged_merge_keeps_file(self):
+        items = load_metadata(self.path)
+        merge_metadata([], self.path)
+        self.assertEqual(load_metadata(self.path), items)
+        text = self.path.read_text(encoding='utf-8')
+        merge_metadata([], self.path)
+        self.assertEqual(self.path.read_text(encoding='utf-8'), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
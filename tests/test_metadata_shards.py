@@ -0,0 +1,47 @@
+"""分片元数据测试"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.metadata_generator import create_song_metadata
+from core.metadata_shards import export_shards, split_shards
+
+
+def make_songs(year: int, count: int) -> list:
+    return [
+        create_song_metadata(f"{year}-{i:03d}", '星瞳', f"{year}-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+        for i in range(count)
+    ]
+
+
+class SplitShardsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.songs = make_songs(2022, 5) + make_songs(2023, 7) + make_songs(2024, 3)
+    
+    def test_shards_do_not_cross_years(self):
+        shards = split_shards(self.songs, 'size', 3)
+        self.assertEqual([(key, len(items)) for key, items in shards],
+                         [('2022-000', 3), ('2022-001', 2), ('2023-000', 3), ('2023-001', 3),
+                          ('2023-002', 1), ('2024-000', 3)])
+        self.assertEqual([key for key, _ in split_shards(self.songs, 'year')], ['2022', '2023', '2024'])
+    
+    def test_backfill_only_rewrites_its_year(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        output = Path(tmp.name)
+        
+        export_shards(self.songs, output, shard_size=3)
+        before = {path.name for path in output.glob('songs.*')}
+        backfill = create_song_metadata('补录', '星瞳', '2022-01-01')
+        report = export_shards(self.songs + [backfill], output, shard_size=3)
+        after = {path.name for path in output.glob('songs.*')}
+        
+        self.assertEqual(report['written'], 2)
+        new = sorted(name.split('.')[1] for name in after - before)
+        self.assertEqual(new, ['2022-000', '2022-001'])
+
+
+if __name__ == '__main__':
+    unittest.main()
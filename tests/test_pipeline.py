@@ -0,0 +1,42 @@
+"""流水线测试"""
+
+import threading
+import unittest
+
+from core.pipeline import Pipeline
+
+
+class PipelineBatchTest(unittest.TestCase):
+    
+    def test_batches_keep_every_item(self):
+        batches = []
+        lock = threading.Lock()
+        
+        def double(items: list[int]) -> list[int]:
+            with lock:
+                batches.append(len(items))
+            return [item * 2 for item in items]
+        
+        pipeline = (
+            Pipeline(queue_size=8)
+            .add_stage('inc', lambda item: item + 1, workers=2)
+            .add_stage('double', double, workers=3, batch_size=5)
+        )
+        results = dict(pipeline.run(range(100)))
+        
+        self.assertEqual(results, {i: (i + 1) * 2 for i in range(100)})
+        self.assertEqual(sum(batches), 100)
+        self.assertLessEqual(max(batches), 5)
+        self.assertEqual(pipeline.stats()['double']['items'], 100)
+    
+    def test_error_in_batch_stops_pipeline(self):
+        def fail(items: list[int]) -> list[int]:
+            raise ValueError('解析失败')
+        
+        pipeline = Pipeline().add_stage('fail', fail, workers=2, batch_size=4)
+        with self.assertRaises(ValueError):
+            list(pipeline.run(range(20)))
+
+
+if __name__ == '__main__':
+    unittest.main()
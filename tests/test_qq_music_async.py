@@ -0,0 +1,61 @@
+"""QQ音乐异步API测试（使用 benchmarks.stub_server 模拟服务）"""
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from api.qq_music_async import AsyncQQMusicAPI
+except ImportError:
+    AsyncQQMusicAPI = None
+
+from benchmarks.stub_server import StubServer
+
+
+@unittest.skipIf(AsyncQQMusicAPI is None, '需要 aiohttp')
+class AsyncQQMusicAPITest(unittest.TestCase):
+    
+    def test_search_json_and_jsonp(self):
+        async def lookup():
+            async with AsyncQQMusicAPI(concurrency=4) as api:
+                return await api.get_many_song_info(['红山果', '晴天'])
+        
+        for jsonp in (False, True):
+            with self.subTest(jsonp=jsonp), StubServer(jsonp=jsonp) as stub:
+                infos = asyncio.run(lookup())
+                self.assertEqual([info['artist'] for info in infos], ['周杰伦', '周杰伦'])
+                self.assertEqual(infos[0]['album_mid'], stub.album_mid('红山果'))
+                self.assertEqual(infos[0]['cover_url'], f"{stub.base_url}/cover/{stub.album_mid('红山果')}.jpg")
+    
+    def test_failed_search_is_none(self):
+        async def lookup():
+            async with AsyncQQMusicAPI() as api:
+                return await api.get_many_song_info(['红山果'])
+        
+        with StubServer(error_rate=1.0):
+            self.assertEqual(asyncio.run(lookup()), [None])
+    
+    def test_download_cover_replaces_atomically(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        save_path = Path(tmp.name) / 'covers' / '红山果.jpg'
+        
+        async def download(url):
+            async with AsyncQQMusicAPI() as api:
+                return await api.download_cover(url, save_path)
+        
+        with StubServer(cover_size=1024) as stub:
+            url = f"{stub.base_url}/cover/A00000001.jpg"
+            self.assertTrue(asyncio.run(download(url)))
+            self.assertEqual(save_path.read_bytes(), stub.cover_bytes('A00000001'))
+            
+            # 下载失败时保留原有封面，不留下临时文件
+            stub.error_rate = 1.0
+            self.assertFalse(asyncio.run(download(url)))
+            self.assertEqual(save_path.read_bytes(), stub.cover_bytes('A00000001'))
+            self.assertEqual(list(save_path.parent.iterdir()), [save_path])
+
+
+if __name__ == '__main__':
+    unittest.main()
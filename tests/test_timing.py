@@ -0,0 +1,34 @@
+"""阶段计时测试"""
+
+import unittest
+from unittest import mock
+
+from utils.timing import NullTimer, StageTimer
+
+
+class TimerTest(unittest.TestCase):
+    
+    def test_stage_timer_records_stages(self):
+        timer = StageTimer()
+        with mock.patch('utils.timing._reset_peak_rss') as reset:
+            timer.begin('scan')
+            timer.begin('export')
+            stages = timer.finish()
+        self.assertEqual(reset.call_count, 2)
+        self.assertEqual(list(stages), ['scan', 'export'])
+        self.assertEqual(set(stages['scan']), {'seconds', 'cpu_seconds', 'peak_rss'})
+    
+    def test_null_timer_has_no_side_effects(self):
+        timer = NullTimer()
+        with mock.patch('utils.timing._reset_peak_rss') as reset, \
+                mock.patch('utils.timing.cpu_time') as cpu, mock.patch('utils.timing.peak_rss') as rss:
+            timer.begin('scan')
+            timer.begin('export')
+            self.assertEqual(timer.finish(), {})
+        for function in (reset, cpu, rss):
+            function.assert_not_called()
+        self.assertGreaterEqual(timer.total_seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
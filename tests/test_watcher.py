@@ -0,0 +1,74 @@
+"""监视模式测试"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.records import SongPair
+from core.watcher import FileSettler
+
+
+class FileSettlerTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.mp3 = self.root / '【星瞳】《红山果》.mp3'
+        self.mp3.write_bytes(b'audio')
+        self.json = self.root / '【星瞳】《红山果》.json'
+        self.json.write_text('{}', encoding='utf-8')
+        self.pair = SongPair(self.root, self.mp3.name, '红山果', self.json.name)
+        
+        self.now = 1000.0
+        patcher = mock.patch('core.watcher.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.settler = FileSettler(settle_seconds=2, pair_wait_seconds=10)
+    
+    def test_ready_after_settling(self):
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.now += 1
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.now += 1
+        self.assertTrue(self.settler.is_ready(self.pair))
+        self.assertEqual(self.settler.pending, 0)
+    
+    def test_growing_file_restarts_wait(self):
+        self.settler.is_ready(self.pair)
+        self.now += 1.5
+        with open(self.mp3, 'ab') as f:
+            f.write(b'more')
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.now += 1.5
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.now += 0.5
+        self.assertTrue(self.settler.is_ready(self.pair))
+    
+    def test_json_must_settle_too(self):
+        self.settler.is_ready(self.pair)
+        self.now += 2
+        self.json.write_text('{"date": "2024-01-02"}', encoding='utf-8')
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.now += 2
+        self.assertTrue(self.settler.is_ready(self.pair))
+    
+    def test_waits_for_json_before_processing_alone(self):
+        pair = SongPair(self.root, self.mp3.name, '红山果')
+        self.settler.is_ready(pair)
+        self.now += 2
+        self.assertFalse(self.settler.is_ready(pair))
+        self.now += 8
+        self.assertTrue(self.settler.is_ready(pair))
+    
+    def test_missing_file_is_not_ready(self):
+        self.settler.is_ready(self.pair)
+        self.mp3.unlink()
+        self.now += 2
+        self.assertFalse(self.settler.is_ready(self.pair))
+        self.assertEqual(self.settler.pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+繁简转换模块
+将繁体中文转换为简体，用于歌曲名比较；安装了 opencc 时使用其完整转换表，
+否则使用内置的常用字对照表
+"""
+
+import hashlib
+
+try:
+    import opencc
+except ImportError:
+    opencc = None
+
+
+# 内置的常用繁体字 -> 简体字对照（覆盖歌曲名与歌手名中的常见字）
+_TRADITIONAL = (
+    '愛與們時說開為來會個東過還這對長門問間聽見覺親語話請讓誰歲夢戀憶憂傷淚邊遠風飛雲'
+    '陽雙後從鳥魚龍鳳華國歡樂樹葉燈紅綠藍黃無憐絲線結給經緣纏別燒鐘錯鏡隨難離雖電頭願'
+    '顏餘馬驚體麗點壓廣張當應戰擁拋掛數斷晝暫曉書條極歸氣漢滿漸濕灣煙熱爺獨現畫發盡眾'
+    '禮種節簡紀約純細終網總繼續義習聲聖臉興舊艷莊蒼蘇蟲術衛裝規視記訴詩該認謝證識讀變'
+    '貝負買費賣贏趕跡蹤軟輕輪轉辦達遲遺選鄉釋銀鋼錄鎖閃閉閒關陣陰隊際險雞雜霧靈靜韻響'
+    '順須領題類顧飄飯館驗髮鬆鬥鬧鮮鳴麥齊萬寫實寶將專尋導塵壞夠學孫寧層屬嶺幾廳彈強復'
+    '憑態慣懷懶戲揚換揮搖擊擔擇擺敗敵陳勝勞勢動務區單賽嚴團園圓圖場塊報處備傳優億價兒'
+    '內兩凍剛劇劍參叢吳員嗎嘆嘗嘩裡裏麼衝週遊鬱傑倫鄧蕭劉楊趙鄭馮羅韓許錢盧譚僅隻聯戶'
+)
+_SIMPLIFIED = (
+    '爱与们时说开为来会个东过还这对长门问间听见觉亲语话请让谁岁梦恋忆忧伤泪边远风飞云'
+    '阳双后从鸟鱼龙凤华国欢乐树叶灯红绿蓝黄无怜丝线结给经缘缠别烧钟错镜随难离虽电头愿'
+    '颜余马惊体丽点压广张当应战拥抛挂数断昼暂晓书条极归气汉满渐湿湾烟热爷独现画发尽众'
+    '礼种节简纪约纯细终网总继续义习声圣脸兴旧艳庄苍苏虫术卫装规视记诉诗该认谢证识读变'
+    '贝负买费卖赢赶迹踪软轻轮转办达迟遗选乡释银钢录锁闪闭闲关阵阴队际险鸡杂雾灵静韵响'
+    '顺须领题类顾飘饭馆验发松斗闹鲜鸣麦齐万写实宝将专寻导尘坏够学孙宁层属岭几厅弹强复'
+    '凭态惯怀懒戏扬换挥摇击担择摆败敌陈胜劳势动务区单赛严团园圆图场块报处备传优亿价儿'
+    '内两冻刚剧剑参丛吴员吗叹尝哗里里么冲周游郁杰伦邓萧刘杨赵郑冯罗韩许钱卢谭仅只联户'
+)
+_TABLE = str.maketrans(_TRADITIONAL, _SIMPLIFIED)
+
+_converter = None
+_converter_config = None
+
+
+def _opencc_converter():
+    """创建 opencc 繁转简转换器，未安装或配置不可用时返回None"""
+    global _converter, _converter_config
+    if _converter is None:
+        _converter = False
+        if opencc is not None:
+            for config in ('t2s', 't2s.json'):
+                try:
+                    _converter = opencc.OpenCC(config)
+                    _converter_config = config
+                    break
+                except Exception:
+                    continue
+    return _converter or None
+
+
+def converter_name() -> str:
+    """
+    当前使用的繁简转换方式
+    
+    转换结果随方式不同而不同，按转换后的文本建立的索引需记录该名称，
+    以便在安装或卸载 opencc 后发现索引键已不一致。
+    
+    Returns:
+        如 'opencc:t2s'，或内置对照表 'builtin:<对照表摘要>'
+    """
+    if _opencc_converter() is not None:
+        return f"opencc:{_converter_config}"
+    digest = hashlib.sha256((_TRADITIONAL + _SIMPLIFIED).encode('utf-8')).hexdigest()[:12]
+    return f"builtin:{digest}"
+
+
+def to_simplified(text: str) -> str:
+    """
+    将文本中的繁体字转换为简体字
+    
+    Args:
+        text: 原始文本
+    
+    Returns:
+        转换后的文本，如 "後來的我們" -> "后来的我们"
+    """
+    converter = _opencc_converter()
+    if converter is not None:
+        return converter.convert(text)
+    return text.translate(_TABLE)
@@ -3,10 +3,18 @@
 提供通用的辅助功能：日期转换、文件名提取等
 """
 
+import hashlib
 import re
+import unicodedata
 from datetime import datetime
 from pathlib import Path
 
+from utils.chinese import converter_name, to_simplified
+
+
+# normalize_title 的规则版本，规则改变（结果随之改变）时递增
+TITLE_NORMALIZER_VERSION = 1
+
 
 def extract_song_name(filename: str) -> str | None:
     """
@@ -23,6 +31,55 @@ def extract_song_name(filename: str) -> str | None:
     return match.group(1) if match else None
 
 
+def normalize_song_name(name: str) -> str:
+    """
+    规范化歌曲名，用于缓存键和去重比较
+    
+    统一全角/半角（NFKC）、忽略大小写并合并多余空白。
+    
+    Args:
+        name: 原始歌曲名
+    
+    Returns:
+        规范化后的歌曲名，如 " Love  Story " -> "love story"
+    """
+    name = unicodedata.normalize('NFKC', name)
+    return ' '.join(name.split()).casefold()
+
+
+def normalize_title(name: str) -> str:
+    """
+    规范化歌曲标题，用于离线曲库的匹配
+    
+    在 normalize_song_name 的基础上统一繁简体，并忽略标点、符号和空白；
+    标题仅由标点组成时退回 normalize_song_name 的结果。
+    
+    Args:
+        name: 原始歌曲名
+    
+    Returns:
+        规范化后的标题，如 "後來的我們（Live）" -> "后来的我们live"
+    """
+    name = to_simplified(normalize_song_name(name))
+    stripped = ''.join(
+        ch for ch in name
+        if not ch.isspace() and unicodedata.category(ch)[0] not in 'PS'
+    )
+    return stripped or name
+
+
+def title_normalizer() -> str:
+    """
+    normalize_title 的标识（规则版本与繁简转换方式）
+    
+    标识相同时同一标题的规范化结果相同，可用于判断按规范化标题建立的索引是否仍然适用。
+    
+    Returns:
+        如 'v1/opencc:t2s'
+    """
+    return f"v{TITLE_NORMALIZER_VERSION}/{converter_name()}"
+
+
 def timestamp_to_date(timestamp: int | float) -> str:
     """
     将Unix时间戳转换为 YYYY-MM-DD 格式的日期字符串
@@ -52,6 +109,20 @@ def ensure_directory(path: str | Path) -> Path:
     return p
 
 
+def file_digest(path: str | Path) -> str:
+    """
+    计算文件内容的SHA-256摘要
+    
+    Args:
+        path: 文件路径
+    
+    Returns:
+        十六进制摘要字符串
+    """
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
 def safe_filename(name: str) -> str:
     """
     清理文件名中的非法字符
@@ -65,3 +136,32 @@ def safe_filename(name: str) -> str:
     # Windows 文件名非法字符
     illegal_chars = r'[<>:"/\\|?*]'
     return re.sub(illegal_chars, '', name)
+
+
+def format_size(num_bytes: int | float) -> str:
+    """
+    将字节数格式化为 MB 字符串
+    
+    Args:
+        num_bytes: 字节数
+    
+    Returns:
+        如 "12.3 MB"
+    """
+    return f"{num_bytes / 1024 / 1024:.1f} MB"
+
+
+def format_rate(num_bytes: int | float, seconds: float) -> str:
+    """
+    计算并格式化传输速率
+    
+    Args:
+        num_bytes: 字节数
+        seconds: 耗时（秒）
+    
+    Returns:
+        如 "85.2 MB/s"，耗时为0时返回 "-"
+    """
+    if seconds <= 0:
+        return "-"
+    return f"{num_bytes / 1024 / 1024 / seconds:.1f} MB/s"
@@ -0,0 +1,136 @@
+"""
+文件链接模块
+提供相对符号链接、内容比较以及以链接方式原子地放置文件等辅助功能，
+供音频暂存（core）和封面存储（api）共用
+"""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from utils.helpers import file_digest
+
+
+def symlink_target(src: str | Path, dst: str | Path) -> str:
+    """
+    指向 src 的符号链接 dst 应保存的目标路径
+    
+    使用相对于链接所在目录的路径，源目录与输出目录一起移动或挂载到其他位置后链接仍然有效；
+    无法表示为相对路径时（如 Windows 上位于不同盘符）使用绝对路径。
+    
+    Args:
+        src: 链接指向的文件
+        dst: 链接路径
+    
+    Returns:
+        链接目标
+    """
+    src = Path(src).resolve()
+    try:
+        return os.path.relpath(src, Path(dst).parent.resolve())
+    except ValueError:
+        return str(src)
+
+
+def relative_symlink(src: str | Path, dst: str | Path) -> None:
+    """创建指向 src 的相对符号链接 dst（见 symlink_target）"""
+    os.symlink(symlink_target(src, dst), dst)
+
+
+def is_same_content(src: str | Path, dst: str | Path) -> bool:
+    """
+    判断目标文件是否已与源文件内容一致
+    
+    先比较是否为同一文件及文件大小，大小一致时才计算摘要。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+    
+    Returns:
+        内容是否一致
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return True
+        if os.stat(src).st_size != os.stat(dst).st_size:
+            return False
+    except OSError:
+        return False
+    return file_digest(src) == file_digest(dst)
+
+
+def is_placed(src: str | Path, dst: str | Path, mode: str) -> bool:
+    """
+    目标是否已按指定方式指向或复制了源文件
+    
+    符号链接方式要求目标是目标路径与 symlink_target 一致的符号链接，
+    其他方式要求目标不是符号链接且内容一致。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标路径
+        mode: 放置方式（symlink 或其他）
+    
+    Returns:
+        是否可以跳过
+    """
+    dst = Path(dst)
+    if not dst.exists():
+        return False
+    if mode == 'symlink':
+        return dst.is_symlink() and os.readlink(dst) == symlink_target(src, dst) and os.path.samefile(src, dst)
+    return not dst.is_symlink() and is_same_content(src, dst)
+
+
+# 放置方式 -> 实现
+_PLACERS = {
+    'hardlink': os.link,
+    'symlink': relative_symlink,
+    'copy': shutil.copy2,
+}
+
+
+def place_file(src: str | Path, dst: str | Path, mode: str = 'hardlink') -> str:
+    """
+    以硬链接、相对符号链接或复制的方式将 src 放置到 dst
+    
+    目标已是最新时跳过。先在同目录下创建临时文件再替换，失败时不会留下不完整的目标；
+    文件系统不支持链接时退回普通复制。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标路径
+        mode: hardlink / symlink / copy
+    
+    Returns:
+        实际使用的方式，目标已是最新时返回 'skipped'
+    
+    Raises:
+        ValueError: mode 无效
+        OSError: 复制失败
+    """
+    if mode not in _PLACERS:
+        raise ValueError(f"无效的放置方式: {mode}")
+    
+    src = Path(src)
+    dst = Path(dst)
+    if is_placed(src, dst, mode):
+        return 'skipped'
+    
+    # 临时文件名唯一，避免并发放置同名目标时互相覆盖
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    for name in dict.fromkeys((mode, 'copy')):
+        tmp.unlink(missing_ok=True)
+        try:
+            _PLACERS[name](src, tmp)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            if name == 'copy':
+                raise
+            continue
+        os.replace(tmp, dst)
+        return name
+    
+    raise OSError(f"无法放置文件: {src}")
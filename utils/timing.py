@@ -0,0 +1,193 @@
+"""
+阶段计时模块
+记录处理流程中各阶段的耗时、CPU时间与内存峰值，可选按阶段输出性能分析结果
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+
+# 性能分析结果中输出的内存分配位置数
+PROFILE_TOP_ALLOCATIONS = 30
+
+# Linux 下可重置进程的内存峰值（VmHWM），从而得到每个阶段各自的峰值
+_CLEAR_REFS = Path('/proc/self/clear_refs')
+_STATUS = Path('/proc/self/status')
+
+
+def _reset_peak_rss() -> bool:
+    """重置进程内存峰值，不支持时返回False"""
+    try:
+        _CLEAR_REFS.write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+def cpu_time() -> float:
+    """当前进程及已结束子进程（如解析JSON的进程池）的CPU时间总和（秒）"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def peak_rss() -> int:
+    """
+    获取进程的内存峰值（字节）
+    
+    优先读取 /proc/self/status 中的 VmHWM，其他平台使用 getrusage；
+    两者都不可用时（如 Windows）返回0。
+    """
+    try:
+        for line in _STATUS.read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    
+    try:
+        import resource
+    except ImportError:
+        # Windows 没有 resource 模块，无法获取内存峰值
+        return 0
+    
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位为字节，Linux 为KB
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+class StageTimer:
+    """
+    按顺序记录各阶段的耗时和内存峰值
+    
+    调用 begin() 开始新阶段时自动结束上一阶段，最后调用 finish() 结束。
+    每个阶段记录:
+        seconds: 耗时（秒）
+        cpu_seconds: CPU时间（秒，包含所有线程及已结束的子进程）
+        peak_rss: 阶段内的进程内存峰值（字节；不支持重置峰值的平台为截至该阶段的峰值）
+        peak_traced: 阶段内Python对象分配峰值（字节，仅启用 tracemalloc 时记录）
+    
+    指定 profile_dir 时，每个阶段在主线程运行 cProfile，并在该目录下写入
+    <阶段名>.prof（可用 pstats/snakeviz 查看）和 <阶段名>.memory.txt（阶段内内存增长最多的位置）。
+    """
+    
+    def __init__(self, trace_memory: bool = False, profile_dir: str | Path | None = None):
+        """
+        Args:
+            trace_memory: 为True时使用 tracemalloc 记录Python内存分配峰值（有明显性能开销）
+            profile_dir: 可选，按阶段输出性能分析结果的目录（隐含 trace_memory）
+        """
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.trace_memory = trace_memory or self.profile_dir is not None
+        self.stages: dict[str, dict] = {}
+        self._current: str | None = None
+        self._started = 0.0
+        self._cpu_started = 0.0
+        self._profiler = None
+        self._snapshot = None
+        self._created = time.perf_counter()
+        
+        # cProfile / tracemalloc 只在启用时导入，普通运行无需承担其导入开销
+        self._tracemalloc = None
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+        if self.trace_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+    
+    def begin(self, name: str) -> None:
+        """
+        开始新阶段（并结束上一阶段）
+        
+        Args:
+            name: 阶段名
+        """
+        self._end_current()
+        self._current = name
+        _reset_peak_rss()
+        if self.trace_memory:
+            self._tracemalloc.reset_peak()
+        if self.profile_dir is not None:
+            import cProfile
+            self._snapshot = self._take_snapshot()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._cpu_started = cpu_time()
+        self._started = time.perf_counter()
+    
+    def finish(self) -> dict[str, dict]:
+        """
+        结束当前阶段
+        
+        Returns:
+            各阶段的记录
+        """
+        self._end_current()
+        if self.trace_memory and self._tracemalloc.is_tracing():
+            self._tracemalloc.stop()
+        return self.stages
+    
+    def _end_current(self) -> None:
+        if self._current is None:
+            return
+        
+        record = {
+            'seconds': time.perf_counter() - self._started,
+            'cpu_seconds': cpu_time() - self._cpu_started,
+            'peak_rss': peak_rss(),
+        }
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.trace_memory and self._tracemalloc.is_tracing():
+            record['peak_traced'] = self._tracemalloc.get_traced_memory()[1]
+        
+        if self.profile_dir is not None:
+            self._dump_profile(self._current)
+        
+        self.stages[self._current] = record
+        self._current = None
+    
+    def _take_snapshot(self):
+        import cProfile
+        
+        tracemalloc = self._tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ))
+    
+    def _dump_profile(self, name: str) -> None:
+        """写入当前阶段的 cProfile 结果和内存增长统计"""
+        self._profiler.dump_stats(self.profile_dir / f"{name}.prof")
+        self._profiler = None
+        
+        stats = self._take_snapshot().compare_to(self._snapshot, 'lineno')
+        self._snapshot = None
+        lines = [str(stat) for stat in stats[:PROFILE_TOP_ALLOCATIONS]]
+        (self.profile_dir / f"{name}.memory.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    
+    @property
+    def total_seconds(self) -> float:
+        """自创建以来的总耗时"""
+        return time.perf_counter() - self._created
+
+
+class NullTimer(StageTimer):
+    """
+    不记录阶段的计时器，未要求输出指标或性能分析时使用
+    
+    begin() / finish() 不读取CPU时间和内存峰值，也不重置 /proc/self/clear_refs，
+    普通运行没有额外的系统调用和副作用；stages 始终为空。
+    """
+    
+    def __init__(self):
+        super().__init__()
+    
+    def begin(self, name: str) -> None:
+        pass
+    
+    def finish(self) -> dict[str, dict]:
+        return self.stages